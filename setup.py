@@ -33,12 +33,13 @@ setup(
     package_dir={"": "src"},
     entry_points={
         "console_scripts": [
-            "slurmtui = slurmtui.main:entry_point",
-            "slurmui = slurmtui.main:entry_point",
-            "sui = slurmtui.main:entry_point",
+            "slurmtui = slurmtui.cli:entry_point",
+            "slurmui = slurmtui.cli:entry_point",
+            "sui = slurmtui.cli:entry_point",
         ],
     },
     install_requires=requirements,
+    extras_require={"fast": ["msgspec"]},
     package_data={
         "slurmtui": ["css/*"],
     },
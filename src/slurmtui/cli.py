@@ -0,0 +1,119 @@
+"""Command-line entry point of SlurmTUI.
+
+Parses the arguments into the settings, then starts either the TUI, the
+headless watcher (``--watch``) or the export (``--export``). Textual is only
+imported to start the TUI, so the other modes stay small.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .export import FORMATS
+from .utils import settings
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="SlurmTUI")
+    parser.add_argument(
+        "--update_interval", type=int, help="Update interval", default=None
+    )
+    parser.add_argument("--mock", action="store_true", help="Mock mode", default=None)
+    parser.add_argument(
+        "--check_all_jobs", action="store_true", help="Check all jobs", default=None
+    )
+    parser.add_argument(
+        "--shared_fetch",
+        action="store_true",
+        help="Share all-jobs snapshots with other instances on this host",
+        default=None,
+    )
+    parser.add_argument(
+        "--debug_squeue_json_path", help="Fake queue JSON path", default=None
+    )
+    parser.add_argument(
+        "--acc",
+        help="comma-seperated account list to filter by since squeue --json has a bug on version < 24.05.1.",
+        default=None,
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Print the changes of your jobs instead of starting the TUI",
+    )
+    parser.add_argument(
+        "--hook",
+        help="With --watch, command run on each notification (overrides NOTIFY_COMMAND)",
+        default=None,
+    )
+    parser.add_argument(
+        "--export",
+        choices=FORMATS,
+        help="Write the jobs to stdout in this format instead of starting the TUI",
+        default=None,
+    )
+    parser.add_argument(
+        "--old",
+        action="store_true",
+        help="With --export, export the old jobs from sacct",
+    )
+    parser.add_argument(
+        "--start_time",
+        help="Start time of the old jobs (sacct time format)",
+        default=None,
+    )
+    parser.add_argument(
+        "--end_time", help="End time of the old jobs (sacct time format)", default=None
+    )
+    return parser
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line and apply it to the settings.
+
+    Unknown arguments are passed on to squeue.
+    """
+    args, remaining_args = build_parser().parse_known_args(argv)
+
+    if args.update_interval is not None:
+        settings.UPDATE_INTERVAL = args.update_interval
+    if args.mock is not None:
+        settings.MOCK = args.mock
+    if args.check_all_jobs is not None:
+        settings.CHECK_ALL_JOBS = args.check_all_jobs
+    if args.shared_fetch is not None:
+        settings.SHARED_FETCH = args.shared_fetch
+    if args.debug_squeue_json_path:
+        settings.DEBUG_SQUEUE_JSON_PATH = args.debug_squeue_json_path
+    if remaining_args:
+        settings.SQUEUE_ARGS = remaining_args
+    if args.acc:
+        settings.ACCOUNTS = args.acc.split(",")
+    if args.hook:
+        settings.NOTIFY_COMMAND = args.hook
+    if args.start_time:
+        settings.OLD_JOBS_START_TIME = args.start_time
+    if args.end_time:
+        settings.OLD_JOBS_END_TIME = args.end_time
+    settings.apply_system_settings()
+    return args
+
+
+def entry_point():
+    args = parse_arguments()
+    if args.export:
+        from .export import export
+
+        sys.exit(export(settings, args.export, old=args.old))
+    if args.watch:
+        from .watch import watch
+
+        sys.exit(watch(settings))
+
+    from .main import run
+
+    run()
+
+
+if __name__ == "__main__":
+    entry_point()
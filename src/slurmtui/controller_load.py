@@ -0,0 +1,83 @@
+"""Tracks how loaded slurmctld looks and derives a polling backoff factor.
+
+Two signals are used: the response time of the squeue/sacct/sinfo calls the
+app makes anyway (smoothed with an exponential moving average), and the RPC
+load reported by ``sdiag`` when it is sampled. While either one is above its
+threshold the factor doubles on every observation, up to
+``BACKOFF_MAX_FACTOR``; once the controller looks healthy again it halves back
+down to 1. All the refresh timers multiply their interval by this factor.
+"""
+
+import threading
+from typing import Dict, Optional
+
+from .utils import SETTINGS
+
+# Weight of the newest latency sample in the moving average
+_LATENCY_ALPHA = 0.3
+# Calls whose latency says something about the controller's load
+_POLLING_COMMANDS = ("squeue", "sacct", "sinfo")
+
+
+class ControllerLoadMonitor:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latency: Optional[float] = None
+        self.server_threads: Optional[int] = None
+        self.agent_queue: Optional[int] = None
+        self.factor = 1
+
+    def observe_call(self, command: str, duration: float, settings: SETTINGS) -> None:
+        if command not in _POLLING_COMMANDS:
+            return
+        with self._lock:
+            if self.latency is None:
+                self.latency = duration
+            else:
+                self.latency += _LATENCY_ALPHA * (duration - self.latency)
+            self._evaluate(settings)
+
+    def observe_sdiag(self, stats: Dict[str, int], settings: SETTINGS) -> None:
+        with self._lock:
+            self.server_threads = stats.get("server_thread_count")
+            self.agent_queue = stats.get("agent_queue_size")
+            self._evaluate(settings)
+
+    def is_overloaded(self, settings: SETTINGS) -> bool:
+        if (
+            self.latency is not None
+            and self.latency > settings.BACKOFF_LATENCY_THRESHOLD
+        ):
+            return True
+        rpc_load = max(self.server_threads or 0, self.agent_queue or 0)
+        return rpc_load > settings.BACKOFF_RPC_THRESHOLD
+
+    def _evaluate(self, settings: SETTINGS) -> None:
+        if self.is_overloaded(settings):
+            self.factor = min(settings.BACKOFF_MAX_FACTOR, self.factor * 2)
+        else:
+            self.factor = max(1, self.factor // 2)
+
+    def backoff_factor(self, settings: SETTINGS) -> int:
+        """Multiplier to apply to every polling interval."""
+        if not settings.CONTROLLER_BACKOFF:
+            return 1
+        return self.factor
+
+    def status(self, settings: SETTINGS) -> str:
+        """Short description for the header, empty while not backing off."""
+        factor = self.backoff_factor(settings)
+        if factor <= 1:
+            return ""
+        details = []
+        if self.latency is not None:
+            details.append(f"{self.latency:.1f}s latency")
+        if self.server_threads is not None:
+            details.append(f"{self.server_threads} RPC threads")
+        if self.agent_queue:
+            details.append(f"{self.agent_queue} queued")
+        suffix = f" ({', '.join(details)})" if details else ""
+        return f"slurmctld busy, polling x{factor} slower{suffix}"
+
+
+controller_monitor = ControllerLoadMonitor()
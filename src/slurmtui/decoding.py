@@ -0,0 +1,122 @@
+"""JSON decoding of the Slurm command outputs.
+
+Uses msgspec or orjson when one of them is installed and falls back to the
+standard library otherwise. Every decoder takes the raw ``bytes`` from the
+subprocess, so the output is never copied into a ``str`` first.
+
+With msgspec, squeue and sacct payloads can be decoded against schemas that
+list only the job fields the app reads (``PROJECT_JOB_FIELDS``): the other
+fields are skipped by the parser and never materialized. The schemas are
+TypedDicts, so jobs are still plain dicts for the rest of the app. Their
+values are typed ``Any`` because their shape changes between Slurm versions.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, TypedDict, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if msgspec is not None:
+    BACKEND = "msgspec"
+elif orjson is not None:
+    BACKEND = "orjson"
+else:
+    BACKEND = "json"
+
+
+class SqueueJob(TypedDict, total=False):
+    job_id: Any
+    array_job_id: Any
+    array_task_id: Any
+    array_task_string: Any
+    name: Any
+    nodes: Any
+    batch_host: Any
+    partition: Any
+    account: Any
+    user_name: Any
+    job_state: Any
+    state_reason: Any
+    submit_time: Any
+    start_time: Any
+    end_time: Any
+    standard_output: Any
+    standard_error: Any
+    job_resources: Any
+    tres_alloc_str: Any
+    tres_req_str: Any
+
+
+class SacctJob(TypedDict, total=False):
+    job_id: Any
+    array: Any
+    name: Any
+    nodes: Any
+    partition: Any
+    account: Any
+    user: Any
+    state: Any
+    time: Any
+    stdout_expanded: Any
+    stderr_expanded: Any
+
+
+class SqueueResponse(TypedDict, total=False):
+    meta: Any
+    jobs: List[SqueueJob]
+
+
+class SacctResponse(TypedDict, total=False):
+    meta: Any
+    jobs: List[SacctJob]
+
+
+_SCHEMAS = {"squeue": SqueueResponse, "sacct": SacctResponse}
+
+# Job fields kept by the schemas, by command
+JOB_FIELDS = {
+    "squeue": tuple(SqueueJob.__annotations__),
+    "sacct": tuple(SacctJob.__annotations__),
+}
+
+
+@lru_cache(maxsize=None)
+def _decoder(schema: Any = Any) -> "msgspec.json.Decoder":
+    return msgspec.json.Decoder(schema)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document. Raises ``ValueError`` on invalid input."""
+    if msgspec is not None:
+        try:
+            return _decoder().decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def loads_jobs(data: Union[bytes, str], command: str, project: bool) -> Dict:
+    """Decode squeue or sacct output (``command``), keeping only the job fields
+    the app uses when ``project`` is set and msgspec is available."""
+    if msgspec is None or not project:
+        return loads(data)
+    try:
+        return _decoder(_SCHEMAS[command]).decode(data)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+
+def project_job(job: Dict, command: str) -> Dict:
+    """Copy of ``job`` with only the fields of the ``command`` schema."""
+    return {key: job[key] for key in JOB_FIELDS[command] if key in job}
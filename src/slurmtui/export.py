@@ -0,0 +1,176 @@
+"""Non-interactive export started by ``sui --export {jsonl,csv,tsv}``.
+
+Writes the current jobs (squeue), or the old jobs (sacct) with ``--old``,
+to stdout with the same settings as the TUI: ``ACCOUNTS``, ``SQUEUE_ARGS``,
+``CHECK_ALL_JOBS`` and the ``OLD_JOBS_*_TIME`` window. Each job is written as
+soon as its record is built, so no table of rows is ever held in memory
+besides the decoded Slurm output itself. Textual is not imported.
+"""
+
+import csv
+import datetime
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterator, List, TextIO
+
+from .schemas import JobSnapshot, SacctFields, SqueueFields
+from .slurm_utils import (
+    CommandNotFoundError,
+    SlurmCommandError,
+    fetch_old_jobs,
+    fetch_running_jobs,
+)
+from .utils import SETTINGS
+
+FORMATS = ("jsonl", "csv", "tsv")
+
+SQUEUE_COLUMNS = [
+    "job_id",
+    "array_job_id",
+    "array_task_id",
+    "name",
+    "user",
+    "partition",
+    "account",
+    "state",
+    "state_reason",
+    "nodes",
+    "submit_time",
+    "start_time",
+    "end_time",
+]
+
+SACCT_COLUMNS = [
+    "job_id",
+    "array_job_id",
+    "array_task_id",
+    "name",
+    "user",
+    "partition",
+    "account",
+    "state",
+    "nodes",
+    "submit_time",
+    "start_time",
+    "end_time",
+    "stdout",
+    "stderr",
+]
+
+
+def _iso(timestamp: int) -> str:
+    if not timestamp:
+        return ""
+    return datetime.datetime.fromtimestamp(timestamp).isoformat()
+
+
+def squeue_record(job: Dict, fields: SqueueFields) -> Dict[str, Any]:
+    """Flat record of a squeue job, with ``SQUEUE_COLUMNS`` as keys."""
+    return {
+        "job_id": job["job_id"],
+        "array_job_id": fields.array_job_id(job),
+        "array_task_id": fields.array_task_id(job),
+        "name": job.get("name", ""),
+        "user": job.get("user_name", ""),
+        "partition": job.get("partition", ""),
+        "account": job.get("account", ""),
+        "state": "+".join(fields.states(job)),
+        "state_reason": job.get("state_reason", ""),
+        "nodes": job.get("nodes", ""),
+        "submit_time": _iso(fields.submit_time(job)),
+        "start_time": _iso(fields.start_time(job)),
+        "end_time": _iso(fields.end_time(job)),
+    }
+
+
+def sacct_record(job: Dict, fields: SacctFields) -> Dict[str, Any]:
+    """Flat record of a sacct job, with ``SACCT_COLUMNS`` as keys."""
+    return {
+        "job_id": job["job_id"],
+        "array_job_id": fields.array_job_id(job),
+        "array_task_id": fields.array_task_id(job),
+        "name": job.get("name", ""),
+        "user": job.get("user", ""),
+        "partition": job.get("partition", ""),
+        "account": job.get("account", ""),
+        "state": "+".join(fields.states(job)),
+        "nodes": job.get("nodes", ""),
+        "submit_time": _iso(fields.submit_time(job)),
+        "start_time": _iso(fields.start_time(job)),
+        "end_time": _iso(fields.end_time(job)),
+        "stdout": fields.stdout(job),
+        "stderr": fields.stderr(job),
+    }
+
+
+def _jsonl_writer(stream: TextIO) -> Callable[[Dict], None]:
+    def write(record: Dict) -> None:
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write("\n")
+
+    return write
+
+
+def _csv_writer(
+    stream: TextIO, columns: List[str], **options: Any
+) -> Callable[[Dict], None]:
+    writer = csv.writer(stream, lineterminator="\n", **options)
+    writer.writerow(columns)
+
+    def write(record: Dict) -> None:
+        writer.writerow(
+            ["" if record[column] is None else record[column] for column in columns]
+        )
+
+    return write
+
+
+def _writer(fmt: str, stream: TextIO, columns: List[str]) -> Callable[[Dict], None]:
+    if fmt == "jsonl":
+        return _jsonl_writer(stream)
+    if fmt == "tsv":
+        return _csv_writer(
+            stream, columns, delimiter="\t", quoting=csv.QUOTE_NONE, escapechar="\\"
+        )
+    return _csv_writer(stream, columns)
+
+
+def iter_records(settings: SETTINGS, old: bool = False) -> Iterator[Dict[str, Any]]:
+    """Records of the current jobs, or of the old ones with ``old``.
+
+    The decoded jobs are walked in the order Slurm listed them, without
+    building a snapshot by id. Raises the ``CommandNotFoundError`` or
+    ``SlurmCommandError`` of a failed fetch.
+    """
+    result = fetch_old_jobs(settings) if old else fetch_running_jobs(settings)
+    if isinstance(result, (CommandNotFoundError, SlurmCommandError)):
+        raise result
+    if isinstance(result, JobSnapshot):
+        # Throttled, the cached snapshot is all there is
+        fields, jobs = result.fields, result.values()
+    else:
+        fields, jobs = result[0], result[1]
+    record = sacct_record if old else squeue_record
+    return (record(job, fields) for job in jobs)
+
+
+def export(
+    settings: SETTINGS, fmt: str, old: bool = False, stream: TextIO = sys.stdout
+) -> int:
+    """Write the jobs to ``stream`` in ``fmt``. Returns the exit code."""
+    try:
+        records = iter_records(settings, old)
+    except (CommandNotFoundError, SlurmCommandError) as e:
+        print(e.message, file=sys.stderr)
+        return 1
+    write = _writer(fmt, stream, SACCT_COLUMNS if old else SQUEUE_COLUMNS)
+    try:
+        for record in records:
+            write(record)
+        stream.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`), stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, stream.fileno())
+    return 0
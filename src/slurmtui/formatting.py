@@ -0,0 +1,146 @@
+"""Cell renderers for the job tables.
+
+A refresh formats thousands of rows but only a handful of distinct states,
+partitions and accounts, so their ``rich.text.Text`` cells are built once and
+shared between rows (DataTable renders Text cells as they are, without parsing
+markup again). Timestamps go through an LRU cache, and "now" is read once per
+refresh by creating a new ``CellFormatter``.
+"""
+
+import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from rich.text import Text
+
+from .schemas import SacctFields, SqueueFields, squeue_fields
+from .slurm_utils import format_time_string, get_datetime_now, get_rich_state
+from .utils import SETTINGS
+
+TIME_FORMAT = "%y-%m-%d %H:%M:%S"
+TO_BE_DELETED = Text.from_markup(" [red](To be Deleted)[/red]")
+
+
+@lru_cache(maxsize=65536)
+def format_timestamp(timestamp: int) -> str:
+    return datetime.datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT)
+
+
+def _as_key(state: Union[str, Iterable[str]]) -> Union[str, Tuple[str, ...]]:
+    return state if isinstance(state, str) else tuple(state)
+
+
+@lru_cache(maxsize=1024)
+def _state_text(state: Union[str, Tuple[str, ...]], to_be_deleted: bool) -> Text:
+    markup = get_rich_state(state if isinstance(state, str) else list(state))
+    text = Text.from_markup(markup)
+    if to_be_deleted:
+        text.append_text(TO_BE_DELETED)
+    return text
+
+
+def state_text(state: Union[str, Iterable[str]], to_be_deleted: bool = False) -> Text:
+    """Coloured state cell; ``state`` may be a single state or a list of them."""
+    return _state_text(_as_key(state), to_be_deleted)
+
+
+@lru_cache(maxsize=4096)
+def label_text(value: str) -> Text:
+    """Plain cell for repeated values (partition, account, user)."""
+    return Text(value)
+
+
+def _relative(seconds: float) -> str:
+    return format_time_string(datetime.timedelta(seconds=seconds))
+
+
+class CellFormatter:
+    """Formats the time cells of one refresh against a single "now".
+
+    ``fields`` are the extractors of the squeue snapshot being shown.
+    """
+
+    def __init__(
+        self, settings: SETTINGS, fields: Optional[SqueueFields] = None
+    ) -> None:
+        self.now = get_datetime_now(settings).timestamp()
+        self.fields = fields or squeue_fields(None)
+
+    def start_and_end(self, job: Dict[str, Any]) -> Tuple[str, str]:
+        """Start and end cells of a queued job, with the time left until them."""
+        fields = self.fields
+        submit_time = fields.submit_time(job)
+        start_time = fields.start_time(job)
+        end_time = fields.end_time(job)
+
+        submit_time_string = format_timestamp(submit_time) if submit_time else ""
+        start_time_string = format_timestamp(start_time) if start_time else ""
+        end_time_string = format_timestamp(end_time) if end_time else ""
+
+        pending = "PENDING" in fields.states(job)
+        if not pending and end_time and end_time >= self.now:
+            formatted_time_remaining = _relative(end_time - self.now)
+            end_time_string += (
+                " (in " + formatted_time_remaining + ")"
+                if formatted_time_remaining
+                else " (Instant)"
+            )
+
+        if pending:
+            if start_time:
+                if start_time >= self.now:
+                    formatted_time_till_start = _relative(start_time - self.now)
+                    start_time_string += (
+                        " (in " + formatted_time_till_start + ")"
+                        if formatted_time_till_start
+                        else " (Instant)"
+                    )
+            elif submit_time and self.now >= submit_time:
+                formatted_time_since_submit = _relative(self.now - submit_time)
+                submit_time_string += (
+                    (" (sub. " + formatted_time_since_submit + " ago)")
+                    if formatted_time_since_submit
+                    else " (just now)"
+                )
+                start_time_string = submit_time_string
+
+        return start_time_string, end_time_string
+
+    @staticmethod
+    def old_job_times(job: Dict[str, Any], fields: SacctFields) -> Tuple[str, str, str]:
+        """Submit, start and end cells of a finished job from sacct."""
+        submit_time = fields.submit_time(job)
+        start_time = fields.start_time(job)
+        end_time = fields.end_time(job)
+
+        submit_time_string = format_timestamp(submit_time) if submit_time else ""
+        start_time_string = ""
+        end_time_string = ""
+
+        if start_time:
+            start_time_string = (
+                f"{format_timestamp(start_time)} +{_relative(start_time - submit_time)}"
+            )
+
+        if end_time:
+            end_time_string = format_timestamp(end_time)
+            if end_time > start_time:
+                end_time_string += f" +{_relative(end_time - start_time)}"
+            else:
+                end_time_string += " (Instant)"
+
+        return (
+            submit_time_string,
+            start_time_string,
+            end_time_string,
+        )
+
+    @staticmethod
+    def start_range(min_start_time: int, max_start_time: int) -> str:
+        """Start cell of an array summary: first and last task start."""
+        if not min_start_time:
+            return ""
+        start_time_string = format_timestamp(min_start_time)
+        if max_start_time != min_start_time:
+            start_time_string += " → " + format_timestamp(max_start_time)
+        return start_time_string
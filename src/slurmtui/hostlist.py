@@ -0,0 +1,241 @@
+"""Compressed Slurm hostlists.
+
+A hostlist such as ``r1i0n[0-35],r2i0n[0-35]`` is kept as a tuple of segments
+(prefix, numeric ranges with their zero-padding width, suffix) instead of one
+string per node. Counting, membership tests and intersections work directly on
+the ranges; node names are only generated when iterating, and ``expand`` caches
+them on the (memoized) instance so identical strings are expanded only once.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# (low, high, width): numbers low..high, zero-padded to width digits
+NumberRange = Tuple[int, int, int]
+
+_BRACKET_RE = re.compile(r"^(.*?)\[([^\]]+)\](.*)$")
+
+
+def _merge_ranges(ranges: Iterable[NumberRange]) -> Tuple[NumberRange, ...]:
+    """Sorted, non-overlapping ranges naming each number of ``ranges`` once.
+
+    Numbers long enough to need no padding print the same at any width, so
+    that part of a range is moved to width 1 before merging.
+    """
+    canonical = []
+    for lo, hi, width in ranges:
+        unpadded = max(lo, 10 ** (width - 1)) if width > 1 else lo
+        if lo < unpadded:
+            canonical.append((width, lo, min(hi, unpadded - 1)))
+        if unpadded <= hi:
+            canonical.append((1, unpadded, hi))
+    merged: List[NumberRange] = []
+    for width, lo, hi in sorted(canonical):
+        if merged and merged[-1][2] == width and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi), width)
+        else:
+            merged.append((lo, hi, width))
+    return tuple(merged)
+
+
+class RangeSegment:
+    """``prefix[ranges]suffix``, e.g. ``node[01-03,05]``."""
+
+    __slots__ = ("prefix", "suffix", "ranges")
+
+    def __init__(self, prefix: str, suffix: str, ranges: Tuple[NumberRange, ...]):
+        self.prefix = prefix
+        self.suffix = suffix
+        self.ranges = ranges
+
+    def __len__(self) -> int:
+        return sum(hi - lo + 1 for lo, hi, _ in self.ranges)
+
+    def __iter__(self) -> Iterator[str]:
+        for lo, hi, width in self.ranges:
+            for i in range(lo, hi + 1):
+                yield f"{self.prefix}{str(i).zfill(width)}{self.suffix}"
+
+    def _number(self, name: str) -> Optional[str]:
+        """The digits between prefix and suffix, or None if ``name`` cannot match."""
+        if not name.startswith(self.prefix) or not name.endswith(self.suffix):
+            return None
+        end = len(name) - len(self.suffix)
+        digits = name[len(self.prefix) : end]
+        if not digits.isdigit():
+            return None
+        return digits
+
+    def __contains__(self, name: str) -> bool:
+        digits = self._number(name)
+        if digits is None:
+            return False
+        number = int(digits)
+        return any(
+            lo <= number <= hi and str(number).zfill(width) == digits
+            for lo, hi, width in self.ranges
+        )
+
+    def intersect(self, other: "RangeSegment") -> Optional["RangeSegment"]:
+        """Intersect two segments sharing prefix and suffix, range by range."""
+        ranges = []
+        for lo, hi, width in self.ranges:
+            for other_lo, other_hi, other_width in other.ranges:
+                new_lo, new_hi = max(lo, other_lo), min(hi, other_hi)
+                new_width = max(width, other_width)
+                if width != other_width:
+                    # Only numbers long enough to need no padding print the same
+                    new_lo = max(new_lo, 10 ** (new_width - 1))
+                if new_lo <= new_hi:
+                    ranges.append((new_lo, new_hi, new_width))
+        if not ranges:
+            return None
+        return RangeSegment(self.prefix, self.suffix, tuple(ranges))
+
+    def __repr__(self) -> str:
+        return f"RangeSegment({self.prefix!r}, {self.suffix!r}, {self.ranges!r})"
+
+
+Segment = Union[str, RangeSegment]
+
+
+class Hostlist:
+    """An immutable, compressed list of node names."""
+
+    __slots__ = ("segments", "_names", "_literals")
+
+    def __init__(self, segments: Tuple[Segment, ...]) -> None:
+        self.segments = segments
+        self._names: Optional[Tuple[str, ...]] = None
+        self._literals = frozenset(s for s in segments if isinstance(s, str))
+
+    def __len__(self) -> int:
+        return sum(1 if isinstance(s, str) else len(s) for s in self.segments)
+
+    def __bool__(self) -> bool:
+        return bool(self.segments)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._names is not None:
+            return iter(self._names)
+        return self._iter_names()
+
+    def _iter_names(self) -> Iterator[str]:
+        for segment in self.segments:
+            if isinstance(segment, str):
+                yield segment
+            else:
+                yield from segment
+
+    def __contains__(self, name: str) -> bool:
+        if name in self._literals:
+            return True
+        return any(
+            name in segment
+            for segment in self.segments
+            if isinstance(segment, RangeSegment)
+        )
+
+    def expand(self) -> Tuple[str, ...]:
+        """All node names, generated once and kept on the instance."""
+        if self._names is None:
+            self._names = tuple(self._iter_names())
+        return self._names
+
+    def intersection(self, other: "Hostlist") -> "Hostlist":
+        """Nodes present in both hostlists, each of them once.
+
+        Segments with the same prefix and suffix are intersected numerically
+        and their ranges merged; anything else falls back to membership tests
+        on the smaller side.
+        """
+        ranges: Dict[Tuple[str, str], List[NumberRange]] = {}
+        # Ordered set of the names matched one by one
+        names: Dict[str, None] = {}
+        for segment in self.segments:
+            if isinstance(segment, str):
+                if segment in other:
+                    names[segment] = None
+                continue
+            for other_segment in other.segments:
+                if (
+                    isinstance(other_segment, RangeSegment)
+                    and other_segment.prefix == segment.prefix
+                    and other_segment.suffix == segment.suffix
+                ):
+                    common = segment.intersect(other_segment)
+                    if common is not None:
+                        key = (segment.prefix, segment.suffix)
+                        ranges.setdefault(key, []).extend(common.ranges)
+                elif isinstance(other_segment, str):
+                    if other_segment in segment:
+                        names[other_segment] = None
+                else:
+                    small, large = sorted((segment, other_segment), key=len)
+                    names.update((name, None) for name in small if name in large)
+        segments: List[Segment] = [
+            RangeSegment(prefix, suffix, _merge_ranges(number_ranges))
+            for (prefix, suffix), number_ranges in ranges.items()
+        ]
+        covered = Hostlist(tuple(segments))
+        segments.extend(name for name in names if name not in covered)
+        return Hostlist(tuple(segments))
+
+    __and__ = intersection
+
+    def __repr__(self) -> str:
+        return f"Hostlist({self.segments!r})"
+
+
+def _split_tokens(hostlist: str) -> List[str]:
+    """Split on the commas that are NOT inside brackets."""
+    tokens = []
+    depth = 0
+    current = []
+    for ch in hostlist:
+        if ch == "[":
+            depth += 1
+            current.append(ch)
+        elif ch == "]":
+            depth -= 1
+            current.append(ch)
+        elif ch == "," and depth == 0:
+            tokens.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        tokens.append("".join(current))
+    return tokens
+
+
+@lru_cache(maxsize=4096)
+def parse_hostlist(hostlist: str) -> Hostlist:
+    """Parse a Slurm compressed hostlist like ``node[1-3,5]``.
+
+    Handles formats: 'node1', 'node[1-3]', 'node[01-03,05]', 'r1i0n[0-35],r2i0n[0-35]',
+    and comma-separated bare names like 'node1,node2'. Results are memoized, so
+    the same string seen on every refresh is parsed (and expanded) only once.
+    """
+    if not hostlist or not hostlist.strip():
+        return Hostlist(())
+
+    segments: List[Segment] = []
+    for token in _split_tokens(hostlist):
+        m = _BRACKET_RE.match(token)
+        if not m:
+            segments.append(token)
+            continue
+        prefix, range_spec, suffix = m.group(1), m.group(2), m.group(3)
+        ranges: List[NumberRange] = []
+        for part in range_spec.split(","):
+            lo, _, hi = part.partition("-")
+            if not lo.isdigit() or (hi and not hi.isdigit()):
+                # Not numeric, keep the name verbatim
+                segments.append(f"{prefix}{part}{suffix}")
+                continue
+            ranges.append((int(lo), int(hi or lo), len(lo)))
+        if ranges:
+            segments.append(RangeSegment(prefix, suffix, tuple(ranges)))
+    return Hostlist(tuple(segments))
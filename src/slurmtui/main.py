@@ -1,11 +1,14 @@
-import argparse
 import datetime
 import os
+import shlex
 import sys
+import time
 import urllib.request
-from typing import Any, Callable, Dict, Iterable
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
 
 from rich import print_json
+from rich.text import Text
 from textual import on, work
 from textual.app import App, ComposeResult, SystemCommand
 from textual.binding import Binding
@@ -13,27 +16,51 @@ from textual.coordinate import Coordinate
 from textual.css.query import NoMatches
 from textual.screen import Screen
 from textual.timer import Timer
-from textual.widgets import Footer, Header
-
+from textual.widgets import Footer, Header, Input
+from textual.worker import get_current_worker
+
+from . import offload
+from .cli import parse_arguments
+from .controller_load import controller_monitor
+from .formatting import TO_BE_DELETED, CellFormatter, label_text, state_text
+from .notifications import JobNotifier, Notification, command_sink
+from .schemas import squeue_fields_of
 from .screens import (
+    FilterBar,
+    GroupByScreen,
     InfoScreen,
     LogPeekScreen,
     OldJobsScreen,
+    PollingCoordinator,
     ResourcesScreen,
     SettingsScreen,
     SortableDataTable,
     get_confirm_screen,
 )
-from .screens.utils import ColumnManager
+from .screens.utils import ColumnManager, add_sized_columns
+from .search import JobSearchIndex
 from .slurm_utils import (
+    ARRAY_ROW_PREFIX,
     CommandNotFoundError,
+    JobEvent,
+    JobEventKind,
+    JobQuery,
+    JobTableStats,
+    SlurmCommandError,
     SlurmTUIReturn,
-    check_for_any_job_array,
-    check_for_job_state_reason,
+    SnapshotMerger,
+    array_row_key,
+    cancel_job,
     check_for_state,
-    get_rich_state,
+    compute_job_stats,
+    diff_snapshots,
+    get_controller_stats,
     get_running_jobs,
-    get_start_and_end_time_string,
+    job_queries,
+    retry_backoff,
+    stale_marker,
+    summarize_array_jobs,
+    task_job_spec,
 )
 from .utils import get_last_update_check, set_last_update_check, settings
 
@@ -74,6 +101,7 @@ class SlurmTUI(App[SlurmTUIReturn]):
         Binding("ctrl+r", "force_refresh", "Force Refresh", key_display="Ctrl+R", show=False),
         Binding("ctrl+l", "logs_out_less", "Less of Logs (STDOUT)", key_display="Ctrl+L", show=False),
         Binding("ctrl+e", "logs_err_less", "Less of Logs (STDERR)", key_display="Ctrl+E", show=False),
+        Binding("slash", "filter", "Filter", key_display="/"),
         Binding("space", "peek_stdout", "Peek STDOUT", key_display="Space"),
         Binding("ctrl+space", "peek_stderr", "Peek STDERR", key_display="Ctrl+Space", show=False),
         Binding("c", "connect", "Connect to Node (ssh)", key_display="C"),
@@ -81,25 +109,106 @@ class SlurmTUI(App[SlurmTUIReturn]):
         Binding("d", "delete", "Delete", key_display="D"),
         Binding("o", "old_jobs", "Old Jobs", key_display="O"),
         Binding("r", "resources", "Resources", key_display="R"),
+        Binding("g", "group_by", "Group By", key_display="G"),
         Binding("s", "settings", "Settings", key_display="S"),
         Binding("q", "quit", "Quit", key_display="Q"),
         # fmt: on
     ]
 
     job_table = None
+    running_jobs_dict = None
     jobs_to_be_deleted = []
-    _update_timer: Timer = None
+    # Array summaries of the last render and the arrays the user expanded
+    _array_summaries: Dict[int, Dict[str, Any]] = {}
+    _expanded_arrays: set = None
+    _show_user = False
+    polling: PollingCoordinator = None
+    _main_screen: Screen = None
+    _controller_timer: Timer = None
+    # The job table merges one snapshot per query, each polled on its own
+    # interval (own jobs often, the whole queue less often)
+    _queries: List[JobQuery] = []
+    _merger: SnapshotMerger = None
+    # Stale-while-revalidate: the last good snapshot stays on screen after errors
+    _title_base = "SlurmTUI"
+    _last_success: float = None
+    _fetch_errors: Dict[str, SlurmCommandError] = {}
+    _fetch_failures: Dict[str, int] = {}
+    _notifier: JobNotifier = None
+    # Text of the filter bar and the index of the jobs, updated with each snapshot
+    _filter_query = ""
+    _search_index: JobSearchIndex = None
+    # What the table shows of the snapshot: the jobs matching the filter, how
+    # many tasks of each collapsed array and how many jobs in each state
+    _shown_jobs: Set[int] = set()
+    _shown_tasks: Dict[int, int] = {}
+    _shown_states: Dict[str, int] = {}
+    # Row order of an unsorted table, and what new rows are built with
+    _row_order: Dict[str, int] = {}
+    _stats: JobTableStats = None
+    _cells: CellFormatter = None
+
+    def _effective_update_interval(self, query: JobQuery) -> int:
+        return query.interval * controller_monitor.backoff_factor(settings)
+
+    def _next_update_delay(self, query: JobQuery) -> int:
+        return self._effective_update_interval(query) * retry_backoff(
+            self._fetch_failures.get(query.name, 0), settings
+        )
+
+    def _update_sub_title(self) -> None:
+        status = [controller_monitor.status(settings)]
+        if len(self._queries) > 1:
+            # Each part of the merged table is refreshed on its own interval
+            status.append("updated " + self._merger.freshness(self._queries))
+        self.sub_title = " | ".join(part for part in status if part)
+
+    def _start_controller_sampling(self) -> None:
+        if self._controller_timer is not None:
+            self._controller_timer.stop()
+            self._controller_timer = None
+        if settings.CONTROLLER_BACKOFF and settings.CONTROLLER_SAMPLE_INTERVAL > 0:
+            self._controller_timer = self.set_interval(
+                settings.CONTROLLER_SAMPLE_INTERVAL, self._sample_controller_load
+            )
+        self._update_sub_title()
 
-    def _effective_update_interval(self) -> int:
-        return settings.UPDATE_INTERVAL * (5 if settings.CHECK_ALL_JOBS else 1)
+    @work(thread=True, exclusive=True, group="sdiag")
+    def _sample_controller_load(self) -> None:
+        stats = get_controller_stats(settings)
+        if stats:
+            controller_monitor.observe_sdiag(stats, settings)
+        self.call_from_thread(self._update_sub_title)
 
     def _get_selected_job(self, job_table: SortableDataTable) -> Dict[str, Any] | None:
-        """Get the selected job using the row key, which is stable across sorts."""
+        """Get the selected job using the row key, which is stable across sorts.
+
+        On a collapsed array row this is one of its tasks, preferably a running
+        one, so logs and ssh still work without expanding the array.
+        """
+        summary = self._get_selected_array(job_table)
+        if summary is not None:
+            tasks = [self.running_jobs_dict[j] for j in summary["job_ids"]]
+            running = [t for t in tasks if check_for_state(t["job_state"], "RUNNING")]
+            return (running or tasks)[0]
         coord = job_table.cursor_coordinate
         cell_key = job_table.coordinate_to_cell_key(coord)
         row_key = cell_key.row_key.value
+        if row_key is None:
+            # The "No jobs ..." placeholder row
+            return None
         return self.running_jobs_dict.get(int(row_key))
 
+    def _get_selected_array(
+        self, job_table: SortableDataTable
+    ) -> Dict[str, Any] | None:
+        """The array summary under the cursor, None on a regular job row."""
+        coord = job_table.cursor_coordinate
+        row_key = job_table.coordinate_to_cell_key(coord).row_key.value
+        if not row_key or not row_key.startswith(ARRAY_ROW_PREFIX):
+            return None
+        return self._array_summaries.get(int(row_key[len(ARRAY_ROW_PREFIX) :]))
+
     def _display_job_table(self) -> None:
         try:
             job_table = self.query_one(SortableDataTable)
@@ -108,154 +217,397 @@ class SlurmTUI(App[SlurmTUIReturn]):
             job_table = self.job_table
 
         old_cursor = job_table.cursor_coordinate
-        self.running_jobs_dict = get_running_jobs(settings=settings)
-        if isinstance(self.running_jobs_dict, CommandNotFoundError):
-            self.exit(
-                SlurmTUIReturn(
-                    "print", {"string_to_print": self.running_jobs_dict.message}
-                ),
-                return_code=1,
-            )
-            return
 
-        job_array_exists = check_for_any_job_array(self.running_jobs_dict)
-        job_reason_exists = check_for_job_state_reason(self.running_jobs_dict)
+        # The columns fit every job of the snapshot, so that filtering only
+        # adds and removes rows
+        jobs = self.running_jobs_dict
+        stats = compute_job_stats(jobs)
+        self._show_user = settings.CHECK_ALL_JOBS and stats.users_vary
 
         job_table.clear(columns=True)
         column_manager = ColumnManager(DEFAULT_COLUMNS)
         job_table.cursor_type = "row"
-        if settings.CHECK_ALL_JOBS:
+        if self._show_user:
             column_manager.enable_column("User")
         else:
             column_manager.disable_column("User")
-        if job_array_exists:
+        if stats.has_arrays:
             column_manager.enable_column("Arr. ID")
             column_manager.enable_column("Arr. Idx")
         else:
             column_manager.disable_column("Arr. ID")
             column_manager.disable_column("Arr. Idx")
-        if job_reason_exists:
+        if stats.has_reasons:
             column_manager.enable_column("State Reason")
         else:
             column_manager.disable_column("State Reason")
 
-        job_table.add_columns(*column_manager.get_enabled_columns())
-
-        # if a job has been deleted, remove it from jobs_to_be_deleted
-        if (
-            self.jobs_to_be_deleted is not None
-            and self.running_jobs_dict is not None
-            and len(self.jobs_to_be_deleted) > 0
-            and len(self.running_jobs_dict) > 0
-        ):
-            for job in self.jobs_to_be_deleted.copy():
-                if job not in self.running_jobs_dict:
-                    self.jobs_to_be_deleted.remove(job)
-
-        if self.running_jobs_dict is None or len(self.running_jobs_dict) == 0:
-            _columns = ["No jobs running"] + (
-                len(column_manager.get_enabled_columns()) - 1
-            ) * [""]
-            job_table.add_row(*_columns)
+        add_sized_columns(
+            job_table, column_manager.get_enabled_columns(), stats.max_widths
+        )
+
+        self._shown_jobs = set()
+        self._shown_tasks = {}
+        self._shown_states = {}
+        if jobs is None or len(jobs) == 0:
+            if self._last_success is not None:
+                message = "No jobs running"
+            elif self._fetch_errors:
+                message = "Could not fetch jobs"
+            else:
+                message = "Loading jobs..."
+            self._add_placeholder_row(job_table, message)
             return
 
-        for idx, (k, v) in enumerate(self.running_jobs_dict.items()):
-            # if any(x["type"] == "FRAG_JOB_REQUEST" for x in v["events"]):
-            #     if k not in self.jobs_to_be_deleted:
-            #         self.jobs_to_be_deleted.append(k)
-            job_state = (
-                str(v["job_state"]) + " (To be Deleted)"
-                if k in self.jobs_to_be_deleted
-                else str(v["job_state"])
-            )
-            start_time_string, end_time_string = get_start_and_end_time_string(
-                v["submit_time"],
-                v["start_time"],
-                v["end_time"],
-                v["job_state"],
-                settings,
+        # Array jobs are shown as one summary row; the rows of their tasks are
+        # only built once the array is expanded
+        array_summaries = (
+            summarize_array_jobs(jobs)
+            if settings.COLLAPSE_ARRAY_JOBS and stats.has_arrays
+            else {}
+        )
+        self._array_summaries = array_summaries
+        self._expanded_arrays &= array_summaries.keys()
+        fields = squeue_fields_of(jobs)
+        self._stats = stats
+        self._cells = CellFormatter(settings, fields)
+        # Position of every row in job id order, for rows added by the filter
+        self._row_order = {}
+        for k, v in jobs.items():
+            array_job_id = fields.array_job_id(v) if array_summaries else None
+            if array_job_id in array_summaries:
+                self._row_order.setdefault(
+                    array_row_key(array_job_id), len(self._row_order)
+                )
+            self._row_order[str(k)] = len(self._row_order)
+
+        matches = self._search_index.search(self._filter_query)
+        self._show_jobs(
+            job_table, jobs if matches is None else (k for k in jobs if k in matches)
+        )
+        if not self._shown_jobs:
+            self._add_placeholder_row(
+                job_table, f"No jobs matching '{self._filter_query}'"
             )
+        self._update_title_base()
 
-            _columns = [str(v["job_id"])]
-            if job_array_exists:
-                _columns.extend(
-                    [
-                        str(
-                            v["array_job_id"]["number"]
-                            if v["array_job_id"]["set"]
-                            and v["array_job_id"]["number"] != 0
-                            else ""
-                        ),
-                        str(
-                            v["array_task_id"]["number"]
-                            if v["array_task_id"]["set"]
-                            else ""
+        job_table.restore_sort()
+        self._update_sub_title()
+
+        job_table.cursor_coordinate = (
+            old_cursor
+            if old_cursor.row < job_table.row_count
+            else Coordinate(row=job_table.row_count - 1, column=0)
+        )
+
+    @staticmethod
+    def _add_placeholder_row(job_table: SortableDataTable, message: str) -> None:
+        """Keyless row telling why the table is empty."""
+        job_table.add_row(message, *(len(job_table.columns) - 1) * [""])
+
+    def _show_jobs(self, job_table: SortableDataTable, job_ids: Iterable[int]) -> None:
+        """Add the rows of ``job_ids``, and the summary row of their array when
+        it is the first of its tasks to be shown."""
+        jobs = self.running_jobs_dict
+        fields = self._cells.fields
+        for k in job_ids:
+            v = jobs[k]
+            self._shown_jobs.add(k)
+            for state in fields.states(v):
+                self._shown_states[state] = self._shown_states.get(state, 0) + 1
+            array_job_id = fields.array_job_id(v) if self._array_summaries else None
+            if array_job_id in self._array_summaries:
+                shown_tasks = self._shown_tasks.get(array_job_id, 0)
+                self._shown_tasks[array_job_id] = shown_tasks + 1
+                if not shown_tasks:
+                    job_table.add_row(
+                        *self._array_row(
+                            self._array_summaries[array_job_id],
+                            self._stats,
+                            self._cells,
                         ),
-                    ]
-                )
+                        key=array_row_key(array_job_id),
+                    )
+                if array_job_id not in self._expanded_arrays:
+                    continue
+            job_table.add_row(
+                *self._job_row(k, v, self._stats, self._cells), key=str(k)
+            )
+
+    def _hide_jobs(self, job_table: SortableDataTable, job_ids: Iterable[int]) -> None:
+        """Remove the rows of ``job_ids``, and the summary row of their array
+        once none of its tasks is shown."""
+        jobs = self.running_jobs_dict
+        fields = self._cells.fields
+        for k in job_ids:
+            v = jobs[k]
+            self._shown_jobs.discard(k)
+            for state in fields.states(v):
+                self._shown_states[state] -= 1
+            array_job_id = fields.array_job_id(v) if self._array_summaries else None
+            if array_job_id in self._array_summaries:
+                shown_tasks = self._shown_tasks.pop(array_job_id) - 1
+                if shown_tasks:
+                    self._shown_tasks[array_job_id] = shown_tasks
+                else:
+                    job_table.remove_row(array_row_key(array_job_id))
+                if array_job_id not in self._expanded_arrays:
+                    continue
+            job_table.remove_row(str(k))
+
+    def _update_title_base(self) -> None:
+        """Count the shown jobs in the title."""
+        if self._filter_query.strip() and not self._shown_jobs:
+            self._title_base = f"SlurmTUI: 0 jobs matching '{self._filter_query}'"
+            self._update_title()
+            return
+        running = self._shown_states.get("RUNNING", 0)
+        pending = self._shown_states.get("PENDING", 0)
+        self._title_base = f"SlurmTUI: {len(self._shown_jobs)} jobs ({running} running"
+        if pending > 0:
+            self._title_base += f", {pending} pending"
+        if self.jobs_to_be_deleted:
+            self._title_base += f", {len(self.jobs_to_be_deleted)} to be deleted"
+        self._title_base += ")"
+        if self._filter_query.strip():
+            self._title_base += f" matching '{self._filter_query}'"
+        self._update_title()
+
+    def _job_row(
+        self, k: int, v: Dict[str, Any], stats: JobTableStats, cells: CellFormatter
+    ) -> List[Any]:
+        # if any(x["type"] == "FRAG_JOB_REQUEST" for x in v["events"]):
+        #     if k not in self.jobs_to_be_deleted:
+        #         self.jobs_to_be_deleted.append(k)
+        fields = cells.fields
+        start_time_string, end_time_string = cells.start_and_end(v)
+
+        _columns = [str(v["job_id"])]
+        if stats.has_arrays:
+            array_job_id = fields.array_job_id(v)
+            array_task_id = fields.array_task_id(v)
             _columns.extend(
                 [
-                    str(v["name"])[0:50],
-                    str(v.get("nodes", ""))[0:25],
-                    str(v["partition"]),
-                    start_time_string,
-                    end_time_string,
-                    get_rich_state(job_state),
+                    str(array_job_id) if array_job_id is not None else "",
+                    str(array_task_id) if array_task_id is not None else "",
                 ]
             )
-            if job_reason_exists:
-                _columns.append(
-                    str(v["state_reason"]) if v["state_reason"] != "None" else ""
-                )
-            _columns.append(str(v["account"]))
-
-            if settings.CHECK_ALL_JOBS:
-                _columns.append(str(v["user_name"]))
-            job_table.add_row(*_columns, key=str(k))
-
-        total_jobs = len(self.running_jobs_dict)
-        running_jobs = len(
+        _columns.extend(
             [
-                x
-                for x in self.running_jobs_dict.values()
-                if check_for_state(x["job_state"], "RUNNING")
+                Text(str(v["name"])[0:50]),
+                Text(str(v.get("nodes", ""))[0:25]),
+                label_text(str(v["partition"])),
+                start_time_string,
+                end_time_string,
+                state_text(fields.states(v), k in self.jobs_to_be_deleted),
             ]
         )
-        to_be_deleted_jobs = len(self.jobs_to_be_deleted)
+        if stats.has_reasons:
+            _columns.append(
+                Text(str(v["state_reason"])) if v["state_reason"] != "None" else ""
+            )
+        _columns.append(label_text(str(v["account"])))
+
+        if self._show_user:
+            _columns.append(label_text(str(v["user_name"])))
+        return _columns
+
+    def _array_row(
+        self, summary: Dict[str, Any], stats: JobTableStats, cells: CellFormatter
+    ) -> List[Any]:
+        """Summary row of a collapsed (or expanded) array job."""
+        array_job_id = summary["array_job_id"]
+        marker = "▾" if array_job_id in self._expanded_arrays else "▸"
+        states = Text(" · ").join(
+            state_text(state) + Text(f" {count}")
+            for state, count in summary["state_counts"].items()
+        )
+        if all(j in self.jobs_to_be_deleted for j in summary["job_ids"]):
+            states.append_text(TO_BE_DELETED)
+        _columns = [
+            f"{marker} {array_job_id}",
+            str(array_job_id),
+            summary["task_ids"][0:25],
+            Text(str(summary["name"])[0:50]),
+            f"{summary['tasks']} tasks",
+            label_text(str(summary["partition"])),
+            cells.start_range(summary["min_start_time"], summary["max_start_time"]),
+            "",
+            states,
+        ]
+        if stats.has_reasons:
+            _columns.append("")
+        _columns.append(label_text(str(summary["account"])))
+        if self._show_user:
+            _columns.append(label_text(str(summary["user_name"])))
+        return _columns
+
+    @on(SortableDataTable.RowSelected, "#job_table")
+    def _toggle_array(self, event: SortableDataTable.RowSelected) -> None:
+        """Enter on an array summary row expands or collapses its tasks."""
+        row_key = event.row_key.value
+        if not row_key or not row_key.startswith(ARRAY_ROW_PREFIX):
+            return
+        array_job_id = int(row_key[len(ARRAY_ROW_PREFIX) :])
+        if array_job_id in self._expanded_arrays:
+            self._expanded_arrays.discard(array_job_id)
+        else:
+            self._expanded_arrays.add(array_job_id)
+        self._display_job_table()
 
-        self.title = f"SlurmTUI: {total_jobs} jobs ({running_jobs} running"
+    def _stale_query(self) -> Optional[JobQuery]:
+        """The first query whose last refresh failed, if any."""
+        for query in self._queries:
+            if query.name in self._fetch_errors:
+                return query
+        return None
+
+    def _update_title(self) -> None:
+        title = self._title_base
+        query = self._stale_query()
+        if query is not None:
+            title += " " + stale_marker(
+                self._merger.refreshed_at(query.name), self._fetch_errors[query.name]
+            )
+        self.title = title
 
-        if to_be_deleted_jobs > 0:
-            self.title += f", {to_be_deleted_jobs} to be deleted"
-        self.title += ")"
+    def _tick_stale_marker(self) -> None:
+        """Keep the ages in the staleness marker and the sub-title current."""
+        if self.polling.is_suspended(self._main_screen):
+            return
+        if self._fetch_errors:
+            self._update_title()
+        if len(self._queries) > 1:
+            self._update_sub_title()
+
+    def _update_job_table(self, query: JobQuery) -> None:
+        # One exclusive worker group per query: a forced refresh of one tier
+        # does not cancel the fetch of the other
+        self.run_worker(
+            partial(self._refresh_jobs, query),
+            group=f"jobs:{query.name}",
+            exclusive=True,
+            thread=True,
+        )
 
-        job_table.restore_sort()
+    def _refresh_jobs(self, query: JobQuery) -> None:
+        result = offload.run_fetch(get_running_jobs, settings, query)
+        if not get_current_worker().is_cancelled:
+            self.call_from_thread(self._apply_jobs_result, query, result)
 
-        job_table.cursor_coordinate = (
-            old_cursor
-            if old_cursor.row < len(self.running_jobs_dict)
-            else Coordinate(row=len(self.running_jobs_dict) - 1, column=0)
+    def _apply_jobs_result(self, query: JobQuery, result) -> None:
+        if query.name not in {q.name for q in self._queries}:
+            # The query was dropped by a settings change while it ran
+            return
+        if isinstance(result, CommandNotFoundError):
+            self.exit(
+                SlurmTUIReturn("print", {"string_to_print": result.message}),
+                return_code=1,
+            )
+            return
+        if isinstance(result, SlurmCommandError):
+            # Keep the previous snapshot on screen and retry with a backoff
+            self._fetch_errors[query.name] = result
+            self._fetch_failures[query.name] = (
+                self._fetch_failures.get(query.name, 0) + 1
+            )
+            if self._last_success is None:
+                self._display_job_table()
+            self._update_title()
+        else:
+            self._merger.update(query, result)
+            self._set_jobs(self._merger.merged())
+            self._last_success = time.time()
+            self._fetch_errors.pop(query.name, None)
+            self._fetch_failures.pop(query.name, None)
+            self._display_job_table()
+        self._schedule_update(query)
+
+    def _set_jobs(self, jobs: Optional[Dict[int, Dict]]) -> None:
+        """Show a new merged snapshot and act on what changed since the last."""
+        events = diff_snapshots(self.running_jobs_dict, jobs)
+        self.running_jobs_dict = jobs
+        if jobs is not None:
+            self._search_index.update(jobs)
+        self._on_job_events(events)
+
+    def _build_notifier(self) -> JobNotifier:
+        sinks = [self._notify_job]
+        if settings.NOTIFY_BELL:
+            sinks.append(lambda notification: self.bell())
+        if settings.NOTIFY_COMMAND:
+            sinks.append(command_sink(settings.NOTIFY_COMMAND))
+        return JobNotifier(settings, sinks)
+
+    def _notify_job(self, notification: Notification) -> None:
+        self.notify(
+            notification.message,
+            title="Job update",
+            severity="error" if notification.failed else "information",
+            markup=False,
         )
 
-    def _update_job_table(self) -> None:
-        self._display_job_table()
-        self._update_timer = self.set_timer(
-            self._effective_update_interval(), self._update_job_table
-        )
+    def _on_job_events(self, events: List[JobEvent]) -> None:
+        self._notifier.handle(events)
+        for event in events:
+            # A deleted job is gone once Slurm reports it ended
+            if (
+                event.kind in (JobEventKind.FINISHED, JobEventKind.VANISHED)
+                and event.job_id in self.jobs_to_be_deleted
+            ):
+                self.jobs_to_be_deleted.remove(event.job_id)
+
+    def _schedule_update(self, query: JobQuery) -> None:
+        self.polling.schedule(self._main_screen, query.name)
+
+    def _register_job_pollers(self) -> None:
+        """Start one poller per job query, replacing those of older settings."""
+        self.polling.unregister(self._main_screen)
+        self._queries = job_queries(settings)
+        self._merger.retain(self._queries)
+        names = {query.name for query in self._queries}
+        for errors in (self._fetch_errors, self._fetch_failures):
+            for name in list(errors):
+                if name not in names:
+                    del errors[name]
+        for query in self._queries:
+            self.polling.register(
+                self._main_screen,
+                partial(self._update_job_table, query),
+                partial(self._next_update_delay, query),
+                on_resume=self._update_title,
+                name=query.name,
+            )
 
     def action_force_refresh(self) -> None:
         """Force an immediate refresh of the jobs table and reset the timer."""
         self.notify("Refreshing jobs...", severity="information", timeout=1.5)
-        if self._update_timer is not None:
-            self._update_timer.stop()
-        self._update_job_table()
+        self.polling.refresh_now(self._main_screen)
 
-    def on_mount(self) -> None:
+    def _apply_theme(self) -> None:
+        if settings.THEME not in self.available_themes:
+            self.notify(
+                f"Invalid theme '{settings.THEME}', reverting to 'textual-dark'",
+                severity="warning",
+            )
+            settings.THEME = "textual-dark"
         self.theme = settings.THEME
+
+    def on_mount(self) -> None:
+        self._apply_theme()
+        self._expanded_arrays = set()
+        self.polling = PollingCoordinator(self)
+        self._main_screen = self.screen
+        self._merger = SnapshotMerger()
+        self._fetch_errors = {}
+        self._fetch_failures = {}
+        self._notifier = self._build_notifier()
+        self._search_index = JobSearchIndex()
+        self._register_job_pollers()
         self._display_job_table()
-        self._update_timer = self.set_timer(
-            self._effective_update_interval(), self._update_job_table
-        )
+        self.polling.refresh_now(self._main_screen)
+        self.set_interval(1, self._tick_stale_marker)
+        self._start_controller_sampling()
         last_check = get_last_update_check()
         if last_check is None or (datetime.date.today() - last_check).days >= 30:
             self._check_for_update()
@@ -283,14 +635,69 @@ class SlurmTUI(App[SlurmTUIReturn]):
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
+        yield FilterBar(
+            placeholder="Filter by id, name, partition, account, user, node or state",
+            id="job_filter",
+        )
         yield SortableDataTable(zebra_stripes=True, name="job_table", id="job_table")
         yield Footer()
 
+    def action_filter(self) -> None:
+        self.query_one(FilterBar).open()
+
+    @on(Input.Changed, "#job_filter")
+    def _filter_changed(self, event: Input.Changed) -> None:
+        """Only add and remove the rows whose job started or stopped matching."""
+        self._filter_query = event.value
+        jobs = self.running_jobs_dict
+        if not jobs:
+            return
+        job_table = self.query_one("#job_table", SortableDataTable)
+        cursor_key = job_table.coordinate_to_cell_key(
+            job_table.cursor_coordinate
+        ).row_key
+
+        matches = self._search_index.search(self._filter_query)
+        shown = jobs.keys() if matches is None else matches
+        if not self._shown_jobs:
+            for row_key in [key for key in job_table.rows if key.value is None]:
+                job_table.remove_row(row_key)
+        self._hide_jobs(job_table, self._shown_jobs - shown)
+        self._show_jobs(job_table, shown - self._shown_jobs)
+        if not self._shown_jobs:
+            self._add_placeholder_row(
+                job_table, f"No jobs matching '{self._filter_query}'"
+            )
+        elif job_table.sort_column.key is None:
+            # Back in job id order, like a full render
+            job_table.order_rows(lambda row_key: self._row_order[row_key.value])
+        else:
+            job_table.resort()
+        self._update_title_base()
+
+        if cursor_key in job_table.rows:
+            job_table.move_cursor(row=job_table.get_row_index(cursor_key))
+
+    @on(Input.Submitted, "#job_filter")
+    def _filter_submitted(self, event: Input.Submitted) -> None:
+        if not event.value.strip():
+            event.input.action_clear_filter()
+        self.query_one(SortableDataTable).focus()
+
     def _check_no_jobs(self) -> bool:
-        if self.running_jobs_dict is None or len(self.running_jobs_dict) == 0:
+        """Warn when the table shows no job, e.g. the filter matches none."""
+        try:
+            job_table = self.query_one(SortableDataTable)
+        except NoMatches:
+            job_table = self.job_table
+        # Only the placeholder row ("No jobs running", ...) has no key
+        if any(row_key.value is not None for row_key in job_table.rows):
+            return False
+        if self.running_jobs_dict:
+            self.notify(f"No jobs matching '{self._filter_query}'", severity="warning")
+        else:
             self.notify("No jobs running", severity="warning")
-            return True
-        return False
+        return True
 
     def _get_log_screen(self, is_primary: bool, is_std_out: bool) -> None:
         """Show the logs (STDOUT)."""
@@ -336,11 +743,11 @@ class SlurmTUI(App[SlurmTUIReturn]):
                 text_util_cmd = settings.SECONDARY_TEXT_UTIL_CMD
 
             if text_util_cmd.lower() == "tail":
-                cmd = f"tail -n {settings.TAIL_LINES} -f {log_path}"
+                cmd = f"tail -n {settings.TAIL_LINES} -f {shlex.quote(log_path)}"
             elif text_util_cmd.lower() == "less":
-                cmd = f"less +F {log_path}"
+                cmd = f"less +F {shlex.quote(log_path)}"
             else:
-                cmd = text_util_cmd.format(log_path=log_path)
+                cmd = text_util_cmd.format(log_path=shlex.quote(log_path))
 
             os.system(cmd)
             if not any(
@@ -441,27 +848,41 @@ class SlurmTUI(App[SlurmTUIReturn]):
         )
 
     def _delete_job(self, selected_job: Dict[str, Any], delete_array=False) -> None:
+        fields = squeue_fields_of(self.running_jobs_dict)
+        array_job_id = fields.array_job_id(selected_job)
         if delete_array:
             self.jobs_to_be_deleted.extend(
                 [
                     job["job_id"]
                     for job in self.running_jobs_dict.values()
-                    if job["array_job_id"]["number"]
-                    == selected_job["array_job_id"]["number"]
+                    if fields.array_job_id(job) == array_job_id
                 ]
             )
         else:
             self.jobs_to_be_deleted.append(selected_job["job_id"])
-        if not settings.MOCK:
-            if delete_array:
-                os.system(f"scancel {selected_job['array_job_id']['number']}")
-            else:
-                if selected_job["array_job_id"]["number"] == selected_job["job_id"]:
-                    os.system(
-                        f"scancel {selected_job['job_id']}_{selected_job['array_task_id']['number']}"
-                    )
-                else:
-                    os.system(f"scancel {selected_job['job_id']}")
+        if delete_array:
+            job_spec = str(array_job_id)
+        elif array_job_id == selected_job["job_id"]:
+            # The job id of an array is also the id of its pending remainder
+            job_spec = task_job_spec(selected_job, fields)
+            if job_spec is None:
+                self.jobs_to_be_deleted.remove(selected_job["job_id"])
+                self.notify(
+                    f"Cannot tell which tasks of array {array_job_id} to cancel,"
+                    " delete the whole array instead",
+                    severity="warning",
+                )
+                return
+        else:
+            job_spec = str(selected_job["job_id"])
+        self._cancel_job(job_spec)
+
+    @work(thread=True, group="scancel")
+    def _cancel_job(self, job_spec: str) -> None:
+        if not cancel_job(job_spec, settings):
+            self.call_from_thread(
+                self.notify, f"scancel {job_spec} failed", severity="error"
+            )
 
     def _check_job_is_array(self, selected_job: Dict[str, Any]) -> bool:
         """Check if the selected job is an array job."""
@@ -475,7 +896,8 @@ class SlurmTUI(App[SlurmTUIReturn]):
         #     return True
 
         # return False
-        return selected_job["array_job_id"]["number"] != 0
+        fields = squeue_fields_of(self.running_jobs_dict)
+        return fields.array_job_id(selected_job) is not None
 
     def action_delete(self) -> None:
         """Delete the job."""
@@ -488,6 +910,11 @@ class SlurmTUI(App[SlurmTUIReturn]):
         except NoMatches:
             job_table = self.job_table
 
+        summary = self._get_selected_array(job_table)
+        if summary is not None:
+            self._delete_array(summary)
+            return
+
         selected_job = self._get_selected_job(job_table)
         if selected_job is None:
             return
@@ -530,17 +957,46 @@ class SlurmTUI(App[SlurmTUIReturn]):
         confirm_screen = get_confirm_screen(self.BINDINGS)
         self.push_screen(confirm_screen(delete_message), check_confirm)
 
+    def _delete_array(self, summary: Dict[str, Any]) -> None:
+        """Confirm and cancel every task of a collapsed array job."""
+        if all(j in self.jobs_to_be_deleted for j in summary["job_ids"]):
+            self.notify(
+                f"Array {summary['array_job_id']} is already in the queue to be deleted!!",
+                severity="warning",
+            )
+            return
+
+        def check_confirm(confirm: bool) -> None:
+            if confirm:
+                selected_job = self.running_jobs_dict.get(summary["job_ids"][0])
+                if selected_job is not None:
+                    self._delete_job(selected_job, delete_array=True)
+
+        delete_message = "\nAre you sure you want to delete this array job?\n\n"
+        delete_message += f"Array Job ID: {summary['array_job_id']}\n"
+        delete_message += f"Job Name: {summary['name']}\n"
+        delete_message += f"Tasks: {summary['tasks']} ({summary['task_ids']})\n"
+        confirm_screen = get_confirm_screen(self.BINDINGS)
+        self.push_screen(confirm_screen(delete_message), check_confirm)
+
     def action_settings(self) -> None:
         """Show the settings."""
 
         def apply_settings(saved: bool) -> None:
             if saved:
-                self.theme = settings.THEME
-                if self._update_timer is not None:
-                    self._update_timer.stop()
-                self._update_timer = self.set_timer(
-                    self._effective_update_interval(), self._update_job_table
-                )
+                self._apply_theme()
+                self._notifier = self._build_notifier()
+                self._register_job_pollers()
+                if self.running_jobs_dict is not None:
+                    self._set_jobs(self._merger.merged())
+                self._display_job_table()
+                for query in self._queries:
+                    if self._merger.refreshed_at(query.name) is None:
+                        # e.g. Check All Jobs was just enabled
+                        self.polling.refresh_now(self._main_screen, query.name)
+                    else:
+                        self._schedule_update(query)
+                self._start_controller_sampling()
 
         self.push_screen(SettingsScreen(), apply_settings)
 
@@ -555,9 +1011,16 @@ class SlurmTUI(App[SlurmTUIReturn]):
         except NoMatches:
             job_table = self.job_table
 
-        selected_job = self._get_selected_job(job_table)
+        # On an array row the info is the array summary
+        summary = self._get_selected_array(job_table)
+        selected_job = summary or self._get_selected_job(job_table)
         if selected_job is None:
             return
+        details = (
+            None
+            if summary is not None
+            else offload.job_details_loader(settings, selected_job)
+        )
 
         def print_cli(string_to_print: str) -> None:
             """Print the string to the CLI."""
@@ -565,27 +1028,19 @@ class SlurmTUI(App[SlurmTUIReturn]):
                 SlurmTUIReturn("print_json", {"string_to_print": string_to_print})
             )
 
-        self.push_screen(InfoScreen(selected_job), print_cli)
+        self.push_screen(InfoScreen(selected_job, details), print_cli)
 
-    @work
-    async def action_old_jobs(self) -> None:
+    def action_old_jobs(self) -> None:
         """Show the old jobs."""
-        if self._update_timer is not None:
-            self._update_timer.stop()
-        await self.push_screen_wait(OldJobsScreen(settings=settings))
-        self._update_timer = self.set_timer(
-            self._effective_update_interval(), self._update_job_table
-        )
+        self.push_screen(OldJobsScreen(settings=settings))
 
-    @work
-    async def action_resources(self) -> None:
+    def action_resources(self) -> None:
         """Show cluster resources."""
-        if self._update_timer is not None:
-            self._update_timer.stop()
-        await self.push_screen_wait(ResourcesScreen(settings=settings))
-        self._update_timer = self.set_timer(
-            self._effective_update_interval(), self._update_job_table
-        )
+        self.push_screen(ResourcesScreen(settings=settings))
+
+    def action_group_by(self) -> None:
+        """Show the jobs grouped by user, account, partition or state."""
+        self.push_screen(GroupByScreen(settings, self.running_jobs_dict))
 
     def action_quit(self) -> None:
         """Quit the application."""
@@ -638,12 +1093,13 @@ class SlurmTUI(App[SlurmTUIReturn]):
 
 def slurmcommand_executor(slurm_return: SlurmTUIReturn, mock=settings.MOCK) -> None:
     if slurm_return.action == "connect":
+        cmd = "ssh -o StrictHostKeyChecking=no " + shlex.quote(
+            str(slurm_return.extra["batch_host"])
+        )
         if mock:
-            print(f"ssh -o StrictHostKeyChecking=no {slurm_return.extra['batch_host']}")
+            print(cmd)
         else:
-            os.system(
-                f"ssh -o StrictHostKeyChecking=no {slurm_return.extra['batch_host']}"
-            )
+            os.system(cmd)
     elif slurm_return.action == "print_json":
         print_json(slurm_return.extra["string_to_print"])
     elif slurm_return.action == "print":
@@ -655,43 +1111,21 @@ def slurmcommand_executor(slurm_return: SlurmTUIReturn, mock=settings.MOCK) -> N
         raise Exception("Not implemented yet")
 
 
+def run() -> None:
+    """Run the TUI, and the Slurm commands it asks for, until the user quits."""
+    try:
+        while True:
+            app = SlurmTUI()
+            reply = app.run()
+            if reply:
+                slurmcommand_executor(reply)
+    finally:
+        offload.shutdown()
+
+
 def main():
-    parser = argparse.ArgumentParser(description="SlurmTUI")
-    parser.add_argument(
-        "--update_interval", type=int, help="Update interval", default=None
-    )
-    parser.add_argument("--mock", action="store_true", help="Mock mode", default=None)
-    parser.add_argument(
-        "--check_all_jobs", action="store_true", help="Check all jobs", default=None
-    )
-    parser.add_argument(
-        "--debug_squeue_json_path", help="Fake queue JSON path", default=None
-    )
-    parser.add_argument(
-        "--acc",
-        help="comma-seperated account list to filter by since squeue --json has a bug on version < 24.05.1.",
-        default=None,
-    )
-    args, remaining_args = parser.parse_known_args()
-
-    if args.update_interval is not None:
-        settings.UPDATE_INTERVAL = args.update_interval
-    if args.mock is not None:
-        settings.MOCK = args.mock
-    if args.check_all_jobs is not None:
-        settings.CHECK_ALL_JOBS = args.check_all_jobs
-    if args.debug_squeue_json_path:
-        settings.DEBUG_SQUEUE_JSON_PATH = args.debug_squeue_json_path
-    if remaining_args:
-        settings.SQUEUE_ARGS = remaining_args
-    if args.acc:
-        settings.ACCOUNTS = args.acc.split(",")
-
-    while True:
-        app = SlurmTUI()
-        reply = app.run()
-        if reply:
-            slurmcommand_executor(reply)
+    parse_arguments()
+    run()
 
 
 def entry_point():
@@ -0,0 +1,172 @@
+"""Usage counters for the Slurm commands issued by SlurmTUI.
+
+Every squeue/sacct/sinfo/scancel call made through ``slurm_utils`` is recorded
+here. The counters can be written as a Prometheus textfile (for the node
+exporter textfile collector) and/or appended to a JSON-lines file, so admins
+can aggregate controller load without running any network service.
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class CommandStats:
+    calls: int = 0
+    duration_seconds: float = 0.0
+    bytes_read: int = 0
+    records: int = 0
+    last_call: float = 0.0
+    # exit status ("0", "1", ..., "not_found") -> number of calls
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+class SlurmMetrics:
+    """Process-wide, thread-safe counters keyed by command name."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.commands: Dict[str, CommandStats] = {}
+
+    def record(
+        self,
+        command: str,
+        duration: float,
+        status: str,
+        bytes_read: int,
+        records: int,
+    ) -> None:
+        with self._lock:
+            stats = self.commands.setdefault(command, CommandStats())
+            stats.calls += 1
+            stats.duration_seconds += duration
+            stats.bytes_read += bytes_read
+            stats.records += records
+            stats.last_call = time.time()
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def to_prometheus(self, user: str) -> str:
+        lines: List[str] = []
+
+        def _metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            items = sorted(self.commands.items())
+
+            _metric(
+                "slurmtui_slurm_calls_total",
+                "counter",
+                "Slurm commands executed by SlurmTUI, by exit status.",
+            )
+            for command, stats in items:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'slurmtui_slurm_calls_total{{command="{command}",'
+                        f'status="{status}",user="{user}"}} {count}'
+                    )
+
+            for name, attr, help_text in (
+                (
+                    "slurmtui_slurm_call_duration_seconds_total",
+                    "duration_seconds",
+                    "Wall time spent waiting for Slurm commands.",
+                ),
+                (
+                    "slurmtui_slurm_bytes_read_total",
+                    "bytes_read",
+                    "Bytes read from the output of Slurm commands.",
+                ),
+                (
+                    "slurmtui_slurm_records_total",
+                    "records",
+                    "Records (jobs, sinfo entries, ...) returned by Slurm commands.",
+                ),
+            ):
+                _metric(name, "counter", help_text)
+                for command, stats in items:
+                    lines.append(
+                        f'{name}{{command="{command}",user="{user}"}} '
+                        f"{getattr(stats, attr)}"
+                    )
+
+            _metric(
+                "slurmtui_slurm_last_call_timestamp_seconds",
+                "gauge",
+                "Unix time of the last call of each Slurm command.",
+            )
+            for command, stats in items:
+                lines.append(
+                    f'slurmtui_slurm_last_call_timestamp_seconds{{command="{command}",'
+                    f'user="{user}"}} {stats.last_call:.3f}'
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = SlurmMetrics()
+
+
+def expand_metrics_path(path: str, user: str) -> str:
+    """Expand ``~`` and the ``{user}``/``{pid}``/``{host}`` placeholders."""
+    return os.path.expanduser(
+        path.format(user=user, pid=os.getpid(), host=socket.gethostname())
+    )
+
+
+def write_prometheus_textfile(path: str, user: str) -> None:
+    """Atomically (re)write the Prometheus textfile with the current counters."""
+    path = expand_metrics_path(path, user)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    # The textfile collector may read at any time, never expose a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".slurmtui-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(metrics.to_prometheus(user))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def append_jsonl_event(path: str, user: str, event: Dict) -> None:
+    """Append a single call event to the JSON-lines file."""
+    path = expand_metrics_path(path, user)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = json.dumps(event, separators=(",", ":")) + "\n"
+    # One write() per line so concurrent appenders do not interleave
+    with open(path, "a") as f:
+        f.write(line)
+
+
+def export_call(
+    jsonl_path: Optional[str],
+    prometheus_path: Optional[str],
+    user: str,
+    event: Dict,
+) -> None:
+    """Write one finished call to the configured sinks, never raising."""
+    if jsonl_path:
+        try:
+            append_jsonl_event(jsonl_path, user, event)
+        except OSError:
+            pass
+    if prometheus_path:
+        try:
+            write_prometheus_textfile(prometheus_path, user)
+        except OSError:
+            pass
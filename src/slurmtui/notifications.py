@@ -0,0 +1,184 @@
+"""Notifications about state transitions of the user's own jobs.
+
+Transitions are taken from the ``JobEvent`` list that ``diff_snapshots``
+computes between two consecutive squeue snapshots, so notifying costs no
+Slurm call. A ``JobNotifier`` keeps the events matching the configured
+transitions (``NOTIFY_TRANSITIONS``, e.g. ``PENDING>RUNNING`` or ``*>FAILED``)
+and filters, and passes each resulting ``Notification`` to its sinks.
+
+Nothing here imports Textual: the TUI adds a sink that shows a toast, the
+headless watcher prints to stdout.
+"""
+
+import fnmatch
+import shlex
+import subprocess
+import sys
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from .slurm_utils import JobEvent, JobEventKind, get_user
+from .utils import SETTINGS
+
+# Events that change the state of a job
+_STATE_EVENTS = (
+    JobEventKind.SUBMITTED,
+    JobEventKind.STARTED,
+    JobEventKind.STATE_CHANGED,
+    JobEventKind.FINISHED,
+)
+
+_FAILED_STATES = ("BOOT_FAIL", "FAILED", "NODE_FAIL", "OUT_OF_MEMORY", "TIMEOUT")
+
+
+class Notification(NamedTuple):
+    job_id: int
+    name: str
+    partition: str
+    account: str
+    old_state: str
+    new_state: str
+
+    @property
+    def message(self) -> str:
+        old_state = self.old_state or "submitted"
+        return f"Job {self.job_id} ({self.name}): {old_state} → {self.new_state}"
+
+    @property
+    def failed(self) -> bool:
+        return any(state in _FAILED_STATES for state in self.new_state.split("+"))
+
+
+Sink = Callable[[Notification], None]
+
+
+def parse_transitions(specs: Optional[Iterable[str]]) -> List[Tuple[str, str]]:
+    """``FROM>TO`` strings as (from, to) pairs, upper-cased. Invalid ones are
+    skipped."""
+    transitions = []
+    for spec in specs or ():
+        old, separator, new = spec.partition(">")
+        old, new = old.strip().upper(), new.strip().upper()
+        if separator and old and new:
+            transitions.append((old, new))
+    return transitions
+
+
+def _format_states(states: Optional[Tuple[str, ...]]) -> str:
+    return "+".join(states or ())
+
+
+class JobNotifier:
+    """Turns job events into notifications for the configured sinks."""
+
+    def __init__(self, settings: SETTINGS, sinks: List[Sink]) -> None:
+        self.transitions = parse_transitions(settings.NOTIFY_TRANSITIONS)
+        self.name_pattern = settings.NOTIFY_JOB_NAME
+        self.partitions = set(settings.NOTIFY_PARTITIONS or ())
+        self.accounts = set(settings.NOTIFY_ACCOUNTS or ())
+        self.sinks = sinks
+        self.user = get_user()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.transitions and self.sinks)
+
+    def _wanted(self, job: Dict) -> bool:
+        if job.get("user_name") != self.user:
+            return False
+        if self.partitions and job.get("partition") not in self.partitions:
+            return False
+        if self.accounts and job.get("account") not in self.accounts:
+            return False
+        return self.name_pattern is None or fnmatch.fnmatchcase(
+            str(job.get("name", "")), self.name_pattern
+        )
+
+    def _matches(self, old: Tuple[str, ...], new: Tuple[str, ...]) -> bool:
+        for old_state, new_state in self.transitions:
+            if (old_state == "*" or old_state in old) and (
+                new_state == "*" or new_state in new
+            ):
+                return True
+        return False
+
+    def notifications(self, events: Iterable[JobEvent]) -> List[Notification]:
+        """The notifications ``events`` give, in order."""
+        if not self.transitions:
+            return []
+        notifications = []
+        for event in events:
+            if event.kind not in _STATE_EVENTS:
+                continue
+            if event.old is None and event.kind is not JobEventKind.SUBMITTED:
+                # A job first seen past PENDING counts as submitted straight
+                # into its state, so only its SUBMITTED event is used
+                continue
+            old, new = event.old or (), event.new
+            if not self._matches(old, new) or not self._wanted(event.job):
+                continue
+            notifications.append(
+                Notification(
+                    event.job_id,
+                    str(event.job.get("name", "")),
+                    str(event.job.get("partition", "")),
+                    str(event.job.get("account", "")),
+                    _format_states(old),
+                    _format_states(new),
+                )
+            )
+        return notifications
+
+    def handle(self, events: Iterable[JobEvent]) -> List[Notification]:
+        """Send the notifications of ``events`` to every sink."""
+        if not self.enabled:
+            return []
+        notifications = self.notifications(events)
+        for notification in notifications:
+            for sink in self.sinks:
+                sink(notification)
+        return notifications
+
+
+def bell_sink(stream: TextIO = sys.stdout) -> Sink:
+    """Rings the terminal bell on ``stream``."""
+
+    def ring(notification: Notification) -> None:
+        stream.write("\a")
+        stream.flush()
+
+    return ring
+
+
+def command_sink(template: str) -> Sink:
+    """Runs ``template`` for each notification, without waiting for it.
+
+    The placeholders are filled in each argument after splitting, so job
+    names are never interpreted by a shell.
+    """
+    args = shlex.split(template)
+
+    def run(notification: Notification) -> None:
+        values = notification._asdict()
+        try:
+            cmd = [arg.format(**values) for arg in args]
+            subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except (KeyError, IndexError, ValueError, OSError):
+            # A broken command must not stop the watching
+            pass
+
+    return run
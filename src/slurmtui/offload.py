@@ -0,0 +1,139 @@
+"""Running the Slurm fetches in separate parse processes.
+
+Decoding a very large ``squeue --json`` holds the GIL for seconds even in a
+worker thread, which makes the UI stutter. With ``PARSE_IN_SUBPROCESS`` the
+fetch-and-parse step runs in a small pool of long-lived worker processes
+instead, so fetches started side by side (e.g. sinfo and squeue on the
+resources screen) still run concurrently. A worker always reduces the jobs to
+the fields the tables use before sending the result back, so the full payload
+is neither pickled nor unpickled in the UI process. The Info view fetches the
+full job on demand instead (``job_details_loader``).
+
+Calls made by the worker are not recorded there. They are sent back with the
+result and recorded in the UI process, so the metrics exports and the
+controller backoff still see every call.
+"""
+
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import resource_tracker
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import slurm_utils
+from .decoding import msgspec, project_job
+from .schemas import JobSnapshot, SacctFields
+from .utils import SETTINGS
+
+# One worker per fetch that can run at the same time: the job table polls up
+# to four queries (own and all jobs, each split into running and pending), the
+# resources screens fetch sinfo and squeue side by side. Workers are only
+# started when every running one is busy.
+MAX_WORKERS = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    slurm_utils.deferred_calls = []
+
+
+def _project(result: Any) -> Any:
+    if not isinstance(result, JobSnapshot):
+        return result
+    command = "sacct" if isinstance(result.fields, SacctFields) else "squeue"
+    projected = JobSnapshot(
+        result.fields,
+        ((job_id, project_job(job, command)) for job_id, job in result.items()),
+    )
+    projected.fetched_at = result.fetched_at
+    return projected
+
+
+def _run_in_worker(
+    function: Callable[..., Any], settings: SETTINGS, args: Tuple
+) -> Tuple[Any, List[Dict]]:
+    calls = slurm_utils.deferred_calls
+    del calls[:]
+    result = function(settings, *args)
+    # msgspec already dropped the other fields while decoding
+    if not (settings.PROJECT_JOB_FIELDS and msgspec is not None):
+        result = _project(result)
+    return result, list(calls)
+
+
+def _start_resource_tracker() -> None:
+    # The tracker inherits sys.stderr, which Textual replaces with an object
+    # that has no usable file descriptor while the app runs
+    stderr = sys.stderr
+    sys.stderr = sys.__stderr__
+    try:
+        resource_tracker.ensure_running()
+    finally:
+        sys.stderr = stderr
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _start_resource_tracker()
+            # Never fork the threaded UI process
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def run_fetch(function: Callable[..., Any], settings: SETTINGS, *args: Any) -> Any:
+    """Call ``function(settings, *args)``, in the parse process if enabled.
+
+    ``function`` is one of the ``slurm_utils`` fetches. If the worker process
+    died, it is restarted on the next call and this one runs in-process.
+    """
+    if not settings.PARSE_IN_SUBPROCESS:
+        return function(settings, *args)
+    pool = _get_pool()
+    try:
+        result, calls = pool.submit(_run_in_worker, function, settings, args).result()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return function(settings, *args)
+    for event in calls:
+        slurm_utils.record_call(event, settings)
+    return result
+
+
+def job_details_loader(
+    settings: SETTINGS, job: Dict, command: str = "squeue"
+) -> Optional[Callable[[], Optional[Dict]]]:
+    """Loader of every field of ``job`` for the Info view, None when the
+    fetched jobs are not reduced to the fields the tables use."""
+    if not settings.PARSE_IN_SUBPROCESS and not (
+        settings.PROJECT_JOB_FIELDS and msgspec is not None
+    ):
+        return None
+    return partial(slurm_utils.get_job_details, settings, job["job_id"], command)
+
+
+def shutdown() -> None:
+    """Stop the parse processes, without waiting for a fetch in flight."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
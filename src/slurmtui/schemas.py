@@ -0,0 +1,303 @@
+"""Field extractors for the JSON schemas of the Slurm data_parser versions.
+
+The shape of squeue and sacct output changes between data_parser versions:
+
+- up to v0.0.38 (Slurm 23.02) numbers are plain integers and states strings;
+- v0.0.39 wraps numbers as ``{"set": ..., "infinite": ..., "number": ...}``;
+- from v0.0.40 (Slurm 23.11) job states are lists of flags;
+- from v0.0.41 (Slurm 24.05) sacct reports expanded stdout/stderr paths.
+
+The version is read once per payload from its ``meta`` block and selects a
+set of extractor functions written for that shape, so the loops building the
+tables do no type checks per field. Payloads without a recognizable version
+get extractors that inspect every value instead.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+_VERSION_RE = re.compile(r"v0\.0\.(\d+)")
+
+Job = Dict[str, Any]
+
+
+class SqueueFields(NamedTuple):
+    version: Optional[int]
+    submit_time: Callable[[Job], int]
+    start_time: Callable[[Job], int]
+    end_time: Callable[[Job], int]
+    # None when the job is not part of an array
+    array_job_id: Callable[[Job], Optional[int]]
+    array_task_id: Callable[[Job], Optional[int]]
+    states: Callable[[Job], Tuple[str, ...]]
+
+
+class SacctFields(NamedTuple):
+    version: Optional[int]
+    submit_time: Callable[[Job], int]
+    start_time: Callable[[Job], int]
+    end_time: Callable[[Job], int]
+    array_job_id: Callable[[Job], Optional[int]]
+    array_task_id: Callable[[Job], Optional[int]]
+    states: Callable[[Job], Tuple[str, ...]]
+    # Whether stdout/stderr are reported at all (Slurm 24.05 and later)
+    has_output_paths: bool
+    stdout: Callable[[Job], str]
+    stderr: Callable[[Job], str]
+
+
+def data_parser_version(payload: Any) -> Optional[int]:
+    """Minor data_parser version of a payload (40 for ``data_parser/v0.0.40``).
+
+    Older releases only name the OpenAPI plugin (``openapi/v0.0.38``).
+    """
+    try:
+        plugin = payload["meta"]["plugin"]
+    except (KeyError, TypeError):
+        return None
+    for key in ("data_parser", "type"):
+        match = _VERSION_RE.search(str(plugin.get(key) or ""))
+        if match:
+            return int(match.group(1))
+    return None
+
+
+class JobSnapshot(dict):
+    """Jobs by id, together with the extractors for the schema they came in
+    and, when known, when the data was fetched (``fetched_at``)."""
+
+    __slots__ = ("fields", "fetched_at")
+
+    def __init__(self, fields: Any, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.fields = fields
+        self.fetched_at: Optional[float] = None
+
+    def __reduce__(self) -> Tuple:
+        # The extractors are closures, pickle the version they were built for
+        kind = "sacct" if isinstance(self.fields, SacctFields) else "squeue"
+        return (
+            _restore_snapshot,
+            (kind, self.fields.version, dict(self), self.fetched_at),
+        )
+
+
+# Plain values (v0.0.38 and older)
+
+
+def _flat(key: str) -> Callable[[Job], int]:
+    def get(job: Job) -> int:
+        return job[key] or 0
+
+    return get
+
+
+def _flat_optional(key: str) -> Callable[[Job], Optional[int]]:
+    def get(job: Job) -> Optional[int]:
+        return job.get(key)
+
+    return get
+
+
+def _flat_array_job_id(job: Job) -> Optional[int]:
+    return job["array_job_id"] or None
+
+
+def _state_string(key: str) -> Callable[[Job], Tuple[str, ...]]:
+    def get(job: Job) -> Tuple[str, ...]:
+        return (job[key],)
+
+    return get
+
+
+# Wrapped numbers (v0.0.39 and later)
+
+
+def _wrapped(key: str) -> Callable[[Job], int]:
+    def get(job: Job) -> int:
+        return job[key]["number"]
+
+    return get
+
+
+def _wrapped_optional(key: str) -> Callable[[Job], Optional[int]]:
+    def get(job: Job) -> Optional[int]:
+        value = job[key]
+        return value["number"] if value["set"] else None
+
+    return get
+
+
+def _wrapped_array_job_id(job: Job) -> Optional[int]:
+    value = job["array_job_id"]
+    return value["number"] if value["set"] and value["number"] else None
+
+
+def _state_list(key: str) -> Callable[[Job], Tuple[str, ...]]:
+    def get(job: Job) -> Tuple[str, ...]:
+        return tuple(job[key])
+
+    return get
+
+
+# Unknown version: inspect every value
+
+
+def _any_number(value: Any) -> Optional[int]:
+    if isinstance(value, dict):
+        return value["number"] if value.get("set", True) else None
+    return value
+
+
+def _sniff(key: str) -> Callable[[Job], int]:
+    def get(job: Job) -> int:
+        return _any_number(job.get(key)) or 0
+
+    return get
+
+
+def _sniff_optional(key: str) -> Callable[[Job], Optional[int]]:
+    def get(job: Job) -> Optional[int]:
+        return _any_number(job.get(key))
+
+    return get
+
+
+def _sniff_array_job_id(job: Job) -> Optional[int]:
+    return _any_number(job.get("array_job_id")) or None
+
+
+def _sniff_states(value: Any) -> Tuple[str, ...]:
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+# sacct
+
+
+def _sacct_time(key: str) -> Callable[[Job], int]:
+    def get(job: Job) -> int:
+        return job["time"][key] or 0
+
+    return get
+
+
+def _sacct_array_job_id(job: Job) -> Optional[int]:
+    return job["array"]["job_id"] or None
+
+
+def _sacct_state_string(job: Job) -> Tuple[str, ...]:
+    return (job["state"]["current"],)
+
+
+def _sacct_state_list(job: Job) -> Tuple[str, ...]:
+    return tuple(job["state"]["current"])
+
+
+def _sacct_flat_task_id(job: Job) -> Optional[int]:
+    return job["array"].get("task_id")
+
+
+def _sacct_wrapped_task_id(job: Job) -> Optional[int]:
+    task_id = job["array"]["task_id"]
+    return task_id["number"] if task_id["set"] else None
+
+
+def _sacct_sniff_task_id(job: Job) -> Optional[int]:
+    return _any_number(job["array"].get("task_id"))
+
+
+def _output_path(key: str) -> Callable[[Job], str]:
+    def get(job: Job) -> str:
+        return job.get(key) or ""
+
+    return get
+
+
+def _no_output_path(job: Job) -> str:
+    return ""
+
+
+@lru_cache(maxsize=None)
+def squeue_fields(version: Optional[int]) -> SqueueFields:
+    """Extractors for squeue output of data_parser ``version`` (None if unknown)."""
+    if version is None:
+        return SqueueFields(
+            version,
+            _sniff("submit_time"),
+            _sniff("start_time"),
+            _sniff("end_time"),
+            _sniff_array_job_id,
+            _sniff_optional("array_task_id"),
+            lambda job: _sniff_states(job["job_state"]),
+        )
+    if version <= 38:
+        return SqueueFields(
+            version,
+            _flat("submit_time"),
+            _flat("start_time"),
+            _flat("end_time"),
+            _flat_array_job_id,
+            _flat_optional("array_task_id"),
+            _state_string("job_state"),
+        )
+    return SqueueFields(
+        version,
+        _wrapped("submit_time"),
+        _wrapped("start_time"),
+        _wrapped("end_time"),
+        _wrapped_array_job_id,
+        _wrapped_optional("array_task_id"),
+        _state_string("job_state") if version == 39 else _state_list("job_state"),
+    )
+
+
+@lru_cache(maxsize=None)
+def sacct_fields(version: Optional[int]) -> SacctFields:
+    """Extractors for sacct output of data_parser ``version`` (None if unknown)."""
+    if version is None:
+        states = lambda job: _sniff_states(job["state"]["current"])
+        task_id = _sacct_sniff_task_id
+    elif version <= 38:
+        states, task_id = _sacct_state_string, _sacct_flat_task_id
+    elif version == 39:
+        states, task_id = _sacct_state_string, _sacct_wrapped_task_id
+    else:
+        states, task_id = _sacct_state_list, _sacct_wrapped_task_id
+    # Unknown versions may still carry the paths, so look for them
+    has_output_paths = version is None or version >= 41
+    return SacctFields(
+        version,
+        _sacct_time("submission"),
+        _sacct_time("start"),
+        _sacct_time("end"),
+        _sacct_array_job_id,
+        task_id,
+        states,
+        has_output_paths,
+        _output_path("stdout_expanded") if has_output_paths else _no_output_path,
+        _output_path("stderr_expanded") if has_output_paths else _no_output_path,
+    )
+
+
+def _restore_snapshot(
+    kind: str, version: Optional[int], jobs: Dict, fetched_at: Optional[float] = None
+) -> JobSnapshot:
+    fields = sacct_fields(version) if kind == "sacct" else squeue_fields(version)
+    snapshot = JobSnapshot(fields, jobs)
+    snapshot.fetched_at = fetched_at
+    return snapshot
+
+
+def squeue_fields_of(jobs: Any) -> SqueueFields:
+    """Extractors of a squeue snapshot, or the inspecting ones for plain dicts."""
+    fields = getattr(jobs, "fields", None)
+    return fields if isinstance(fields, SqueueFields) else squeue_fields(None)
+
+
+def sacct_fields_of(jobs: Any) -> SacctFields:
+    """Extractors of a sacct snapshot, or the inspecting ones for plain dicts."""
+    fields = getattr(jobs, "fields", None)
+    return fields if isinstance(fields, SacctFields) else sacct_fields(None)
@@ -1,7 +1,10 @@
 from .confirm import get_confirm_screen
+from .filter_bar import FilterBar
+from .group_by import GroupByScreen
 from .info import InfoScreen
 from .log_peek import LogPeekScreen
 from .old_jobs import OldJobsScreen
+from .polling import PollingCoordinator
 from .resources import ResourcesScreen
 from .settings import SettingsScreen
 from .sortable_data_table import Sort, SortableDataTable
@@ -0,0 +1,40 @@
+from textual.binding import Binding
+from textual.widgets import Input
+
+
+class FilterBar(Input):
+    """Input filtering the job table, hidden until ``/`` is pressed.
+
+    Escape clears and hides it. Enter goes back to the table and keeps the
+    filter, which then stays shown above the table.
+    """
+
+    DEFAULT_CSS = """
+        FilterBar {
+            display: none;
+            border: none;
+            height: 1;
+            padding: 0 1;
+        }
+        FilterBar.-active {
+            display: block;
+        }
+    """
+
+    BINDINGS = [
+        Binding("escape", "clear_filter", "Clear Filter", key_display="Esc"),
+    ]
+
+    # Only focusable while shown, so the table keeps the initial focus
+    can_focus = False
+
+    def open(self) -> None:
+        self.can_focus = True
+        self.add_class("-active")
+        self.focus()
+
+    def action_clear_filter(self) -> None:
+        self.value = ""
+        self.remove_class("-active")
+        self.can_focus = False
+        self.screen.focus_next()
@@ -0,0 +1,330 @@
+import time
+from typing import Any, Dict, Optional
+
+from textual import on, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.css.query import NoMatches
+from textual.screen import ModalScreen
+from textual.widgets import Footer, Header
+from textual.worker import get_current_worker
+
+from ..controller_load import controller_monitor
+from ..formatting import label_text, state_text
+from ..offload import job_details_loader, run_fetch
+from ..schemas import SqueueFields, squeue_fields_of
+from ..slurm_utils import (
+    GROUP_BY,
+    GROUP_COLUMNS,
+    CommandNotFoundError,
+    JobGroupIndex,
+    JobQuery,
+    SlurmCommandError,
+    get_job_tres,
+    get_running_jobs,
+    retry_backoff,
+    stale_marker,
+)
+from ..utils import SETTINGS
+from .sortable_data_table import SortableDataTable
+
+JOB_COLUMNS = (
+    "Job id",
+    "Name",
+    "User",
+    "Partition",
+    "Account",
+    "State",
+    "Node Name",
+    "CPUs",
+    "GPUs",
+)
+
+
+class GroupByScreen(ModalScreen):
+    """Jobs, CPUs and GPUs of the queue grouped by user, account, partition
+    or state.
+
+    The aggregates are kept in a ``JobGroupIndex``, so a refresh only updates
+    the rows of the groups whose jobs changed. Enter lists the jobs of the
+    selected group, Esc goes back to the groups.
+    """
+
+    BINDINGS = [
+        # fmt: off
+        Binding("g", "cycle_group_by", "Group By", key_display="G"),
+        Binding("i", "info", "Job Info", key_display="I"),
+        Binding("ctrl+r", "force_refresh", "Force Refresh", key_display="Ctrl+R"),
+        Binding("escape", "back", "Go Back", key_display="Esc"),
+        Binding("q", "quit", "Quit", key_display="Q"),
+        # fmt: on
+    ]
+
+    CSS_PATH = "../css/slurmtui.css"
+
+    def __init__(
+        self,
+        settings: SETTINGS,
+        jobs: Optional[Dict[int, Dict]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.settings = settings
+        # The whole queue when CHECK_ALL_JOBS is set, like the job table
+        self._query = JobQuery(
+            "groups",
+            settings.CHECK_ALL_JOBS,
+            (
+                settings.ALL_JOBS_UPDATE_INTERVAL
+                if settings.CHECK_ALL_JOBS
+                else settings.UPDATE_INTERVAL
+            ),
+        )
+        # Snapshot of the job table, shown until the first fetch is in
+        self._jobs: Dict[int, Dict] = jobs or {}
+        self._groups = JobGroupIndex(GROUP_BY[0])
+        # Group whose jobs are listed, None while the groups are shown
+        self._drill_group: Optional[str] = None
+        self._group_columns: list = []
+        # Cells of the listed jobs, to only update the ones that changed
+        self._job_columns: list = []
+        self._job_cells: Dict[int, list] = {}
+        self._last_success: float | None = time.time() if jobs is not None else None
+        self._fetch_error: SlurmCommandError | None = None
+        self._fetch_failures = 0
+
+    def _refresh_interval(self) -> int:
+        return (
+            self._query.interval
+            * controller_monitor.backoff_factor(self.settings)
+            * retry_backoff(self._fetch_failures, self.settings)
+        )
+
+    @work(thread=True, exclusive=True, group="group_by_squeue")
+    def _fetch_jobs(self) -> None:
+        jobs = run_fetch(get_running_jobs, self.settings, self._query)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._apply_jobs, jobs)
+
+    def _apply_jobs(self, jobs) -> None:
+        if isinstance(jobs, SlurmCommandError):
+            # The table keeps the previous snapshot
+            self._fetch_error = jobs
+            self._fetch_failures += 1
+        else:
+            if isinstance(jobs, CommandNotFoundError):
+                self.notify(f"Could not refresh jobs: {jobs.message}", severity="error")
+                jobs = None
+            self._jobs = jobs or {}
+            self._last_success = time.time()
+            self._fetch_error = None
+            self._fetch_failures = 0
+            self.app.sub_title = controller_monitor.status(self.settings)
+            changed = self._groups.update(self._jobs)
+            table = self.query_one(SortableDataTable)
+            cursor_key = (
+                table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+                if table.row_count
+                else None
+            )
+            if self._drill_group is None:
+                self._update_group_rows(changed)
+            else:
+                self._update_job_rows()
+            # Keep the cursor on the same group or job
+            if cursor_key in table.rows:
+                table.move_cursor(row=table.get_row_index(cursor_key))
+        self._update_title()
+        self.app.polling.schedule(self)
+
+    def _update_title(self) -> None:
+        if self._drill_group is None:
+            title = (
+                f"SlurmTUI: {len(self._jobs)} jobs by {self._groups.by}"
+                f" ({len(self._groups.totals)} groups)"
+            )
+        else:
+            members = self._groups.members.get(self._drill_group, ())
+            title = (
+                f"SlurmTUI: {self._groups.by} {self._group_label(self._drill_group)}"
+                f" ({len(members)} jobs)"
+            )
+        if self._fetch_error is not None:
+            title += " " + stale_marker(self._last_success, self._fetch_error)
+        self.app.title = title
+
+    def _tick_stale_marker(self) -> None:
+        if self._fetch_error is not None and self.is_current:
+            self._update_title()
+
+    @staticmethod
+    def _group_label(group: str) -> str:
+        return group or "(none)"
+
+    def _group_cells(self, group: str) -> list:
+        return [str(value) for value in self._groups.totals[group]]
+
+    def _render_groups(self) -> None:
+        table = self.query_one(SortableDataTable)
+        table.clear(columns=True)
+        table.cursor_type = "row"
+        self._group_columns = table.add_columns(
+            self._groups.by.capitalize(), *GROUP_COLUMNS
+        )[1:]
+        for group in sorted(self._groups.totals):
+            table.add_row(
+                label_text(self._group_label(group)),
+                *self._group_cells(group),
+                key=group,
+            )
+        table.restore_sort()
+
+    def _update_group_rows(self, groups: set) -> None:
+        """Update, add or remove only the rows of the groups that changed."""
+        table = self.query_one(SortableDataTable)
+        for group in groups:
+            in_table = group in table.rows
+            if group not in self._groups.totals:
+                if in_table:
+                    table.remove_row(group)
+            elif in_table:
+                for key, value in zip(self._group_columns, self._group_cells(group)):
+                    table.update_cell(group, key, value)
+            else:
+                table.add_row(
+                    label_text(self._group_label(group)),
+                    *self._group_cells(group),
+                    key=group,
+                )
+        table.resort()
+
+    def _job_row(self, job_id: int, fields: SqueueFields) -> list:
+        job = self._jobs[job_id]
+        cpus, gpus, _ = get_job_tres(job)
+        return [
+            str(job_id),
+            str(job.get("name", "")),
+            label_text(job.get("user_name", "")),
+            label_text(job.get("partition", "")),
+            label_text(job.get("account", "")),
+            state_text(fields.states(job)),
+            str(job.get("nodes", "") or ""),
+            str(cpus),
+            str(gpus),
+        ]
+
+    def _render_jobs(self) -> None:
+        table = self.query_one(SortableDataTable)
+        table.clear(columns=True)
+        table.cursor_type = "row"
+        self._job_columns = table.add_columns(*JOB_COLUMNS)
+        self._job_cells = {}
+        self._update_job_rows()
+        table.restore_sort()
+
+    def _update_job_rows(self) -> None:
+        """Add, remove or update only the rows of the listed jobs that changed."""
+        table = self.query_one(SortableDataTable)
+        fields = squeue_fields_of(self._jobs)
+        members = self._groups.members.get(self._drill_group, set())
+        added = False
+        for job_id in self._job_cells.keys() - members:
+            del self._job_cells[job_id]
+            table.remove_row(str(job_id))
+        for job_id in sorted(members):
+            cells = self._job_row(job_id, fields)
+            previous = self._job_cells.get(job_id)
+            if previous is None:
+                table.add_row(*cells, key=str(job_id))
+                added = True
+            elif previous != cells:
+                for key, old, new in zip(self._job_columns, previous, cells):
+                    if old != new:
+                        table.update_cell(str(job_id), key, new)
+            self._job_cells[job_id] = cells
+        if table.sort_column.key is not None:
+            table.resort()
+        elif added:
+            # Back in job id order
+            table.order_rows(lambda row_key: int(row_key.value))
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+        yield SortableDataTable(zebra_stripes=True, id="group_by_table")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self._groups.update(self._jobs)
+        self._render_groups()
+        self._update_title()
+        self.app.polling.register(
+            self, self._fetch_jobs, self._refresh_interval, self._update_title
+        )
+        if self._last_success is None:
+            self.app.polling.refresh_now(self)
+        else:
+            self.app.polling.schedule(self)
+        self.set_interval(1, self._tick_stale_marker)
+
+    def on_unmount(self) -> None:
+        self.app.polling.unregister(self)
+
+    @on(SortableDataTable.RowSelected)
+    def _drill_down(self, event: SortableDataTable.RowSelected) -> None:
+        if self._drill_group is not None or event.row_key.value is None:
+            return
+        if event.row_key.value not in self._groups.totals:
+            return
+        self._drill_group = event.row_key.value
+        self._render_jobs()
+        self.query_one(SortableDataTable).move_cursor(row=0)
+        self._update_title()
+
+    def action_back(self) -> None:
+        if self._drill_group is None:
+            self.dismiss()
+            return
+        group = self._drill_group
+        self._drill_group = None
+        self._render_groups()
+        self._update_title()
+        table = self.query_one(SortableDataTable)
+        if group in table.rows:
+            table.move_cursor(row=table.get_row_index(group))
+
+    def action_cycle_group_by(self) -> None:
+        by = GROUP_BY[(GROUP_BY.index(self._groups.by) + 1) % len(GROUP_BY)]
+        self._groups = JobGroupIndex(by)
+        self._groups.update(self._jobs)
+        self._drill_group = None
+        self._render_groups()
+        self._update_title()
+
+    def action_force_refresh(self) -> None:
+        self.notify("Refreshing job groups...", severity="information", timeout=1.5)
+        self.app.polling.refresh_now(self)
+
+    def action_info(self) -> None:
+        """Show the info of the selected job of a group."""
+        if self._drill_group is None:
+            self.notify("Press Enter to list the jobs of a group", severity="warning")
+            return
+        try:
+            table = self.query_one(SortableDataTable)
+        except NoMatches:
+            return
+        if not table.row_count:
+            return
+        row_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        job = self._jobs.get(int(row_key.value))
+        if job is None:
+            return
+
+        from .info import InfoScreen
+
+        self.app.push_screen(InfoScreen(job, job_details_loader(self.settings, job)))
+
+    def action_quit(self) -> None:
+        from ..slurm_utils import SlurmTUIReturn
+
+        self.app.exit(SlurmTUIReturn("quit", {}))
@@ -1,7 +1,8 @@
 import json
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from rich.syntax import Syntax
+from textual import work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.screen import ModalScreen, Screen
@@ -17,9 +18,17 @@ class InfoScreen(ModalScreen[str]):
         Binding("q", "app.quit", "Quit", key_display="Q"),
     ]
 
-    def __init__(self, info: Dict[str, Any], **kwargs: Any) -> None:
+    def __init__(
+        self,
+        info: Dict[str, Any],
+        details: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """``details`` loads every field of the job when ``info`` only holds the
+        fields of the tables; ``info`` is shown until it returns."""
         super().__init__(**kwargs)
         self.info = info
+        self._details = details
         self.app.title = f"slurm Job Info: {self.info['job_id']}"
 
     def compose(self) -> ComposeResult:
@@ -34,12 +43,28 @@ class InfoScreen(ModalScreen[str]):
         yield Footer()
 
     def on_mount(self) -> None:
+        self._show_info()
+        if self._details is not None:
+            self._load_details()
+
+    def _show_info(self) -> None:
         rich_text = self.query_one(RichLog)
+        rich_text.clear()
         rich_text.write(
             Syntax(json.dumps(self.info, indent=4), "json", word_wrap=True),
             shrink=False,
         )
 
+    @work(thread=True, exclusive=True, group="job_details")
+    def _load_details(self) -> None:
+        info = self._details()
+        if info is not None:
+            self.app.call_from_thread(self._apply_details, info)
+
+    def _apply_details(self, info: Dict[str, Any]) -> None:
+        self.info = info
+        self._show_info()
+
     def action_print_cli(self) -> None:
         self.dismiss(json.dumps(self.info, indent=4))
 
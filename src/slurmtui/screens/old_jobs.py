@@ -1,29 +1,35 @@
-import datetime
 import os
-from typing import Any, Dict, List, Tuple
+import shlex
+from typing import Any, Dict, List, Optional
 
+from rich.text import Text
+from textual import work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.coordinate import Coordinate
 from textual.css.query import NoMatches
 from textual.screen import ModalScreen
 from textual.widgets import Footer, Header
+from textual.worker import get_current_worker
 
 from slurmtui.screens.info import InfoScreen
 from slurmtui.screens.log_peek import LogPeekScreen
 
+from ..formatting import CellFormatter, label_text, state_text
+from ..offload import job_details_loader, run_fetch
+from ..schemas import sacct_fields_of
 from ..slurm_utils import (
+    CommandNotFoundError,
+    SlurmCommandError,
     SlurmTUIReturn,
-    check_for_any_old_job_array,
     check_for_state,
-    format_time_string,
+    compute_old_job_stats,
     get_old_jobs,
-    get_rich_state,
 )
 from ..utils import SETTINGS, settings
 from .settings import SettingsScreen
 from .sortable_data_table import SortableDataTable
-from .utils import ColumnManager
+from .utils import ColumnManager, add_sized_columns
 
 DEFAULT_COLUMNS = {
     "Job id": True,
@@ -40,49 +46,6 @@ DEFAULT_COLUMNS = {
 }
 
 
-def get_time_strings(job: Dict[str, Any]) -> Tuple[str, str, str]:
-
-    submit_time = job["time"]["submission"]
-    start_time = job["time"]["start"]
-    end_time = job["time"]["end"]
-
-    submit_time_string = ""
-    start_time_string = ""
-    end_time_string = ""
-
-    if submit_time:
-        submit_time_string = datetime.datetime.fromtimestamp(submit_time).strftime(
-            "%y-%m-%d %H:%M:%S"
-        )
-
-    if start_time:
-        start_time_string = datetime.datetime.fromtimestamp(start_time).strftime(
-            "%y-%m-%d %H:%M:%S"
-        )
-        started_after = datetime.datetime.fromtimestamp(
-            start_time
-        ) - datetime.datetime.fromtimestamp(submit_time)
-        start_time_string += f" +{format_time_string(started_after)}"
-
-    if end_time:
-        end_time_string = datetime.datetime.fromtimestamp(end_time).strftime(
-            "%y-%m-%d %H:%M:%S"
-        )
-        ended_after = datetime.datetime.fromtimestamp(
-            end_time
-        ) - datetime.datetime.fromtimestamp(start_time)
-        if end_time > start_time:
-            end_time_string += f" +{format_time_string(ended_after)}"
-        else:
-            end_time_string += f" (Instant)"
-
-    return (
-        submit_time_string,
-        start_time_string,
-        end_time_string,
-    )
-
-
 class OldJobsScreen(ModalScreen):
 
     BINDINGS = [
@@ -109,6 +72,7 @@ class OldJobsScreen(ModalScreen):
     CSS_PATH = "../css/slurmtui.css"
 
     job_table = None
+    old_jobs = None
 
     def _get_selected_job(self, job_table: SortableDataTable) -> Dict[str, Any] | None:
         """Get the selected job using the row key, which is stable across sorts."""
@@ -126,6 +90,25 @@ class OldJobsScreen(ModalScreen):
         self.end_time = settings.OLD_JOBS_END_TIME
 
     def on_mount(self) -> None:
+        self._display_old_jobs("Loading jobs...")
+        self._load_old_jobs()
+
+    @work(thread=True, exclusive=True, group="old_jobs")
+    def _load_old_jobs(self) -> None:
+        old_jobs = run_fetch(
+            get_old_jobs, self.settings, self.start_time, self.end_time
+        )
+        if get_current_worker().is_cancelled:
+            return
+        if isinstance(old_jobs, (CommandNotFoundError, SlurmCommandError)):
+            self.app.call_from_thread(
+                self._display_old_jobs, f"Could not fetch jobs: {old_jobs.message}"
+            )
+            return
+        self.old_jobs = old_jobs
+        self.app.call_from_thread(self._display_old_jobs)
+
+    def _display_old_jobs(self, message: str = "No jobs in the past window") -> None:
         try:
             job_table = self.query_one(SortableDataTable)
             self.job_table = job_table
@@ -134,61 +117,65 @@ class OldJobsScreen(ModalScreen):
 
         old_cursor = job_table.cursor_coordinate
 
-        self.old_jobs = get_old_jobs(self.settings, self.start_time, self.end_time)
-        job_array_exists = check_for_any_old_job_array(self.old_jobs)
+        stats = compute_old_job_stats(self.old_jobs)
 
-        job_table.clear()
+        job_table.clear(columns=True)
         column_manager = ColumnManager(DEFAULT_COLUMNS)
         job_table.cursor_type = "row"
-        if job_array_exists:
+        if stats.has_arrays:
             column_manager.enable_column("Arr. ID")
             column_manager.enable_column("Arr. Idx")
         else:
             column_manager.disable_column("Arr. ID")
             column_manager.disable_column("Arr. Idx")
 
-        job_table.add_columns(*column_manager.get_enabled_columns())
+        add_sized_columns(
+            job_table, column_manager.get_enabled_columns(), stats.max_widths
+        )
 
         if self.old_jobs is None or len(self.old_jobs) == 0:
-            _columns = ["No jobs in the past window"] + (
-                len(column_manager.get_enabled_columns()) - 1
-            ) * [""]
+            _columns = [message] + (len(column_manager.get_enabled_columns()) - 1) * [
+                ""
+            ]
             job_table.add_row(*_columns)
             return
 
+        fields = sacct_fields_of(self.old_jobs)
         for idx, (k, v) in enumerate(self.old_jobs.items()):
-            submit_time_string, start_time_string, end_time_string = get_time_strings(v)
+            submit_time_string, start_time_string, end_time_string = (
+                CellFormatter.old_job_times(v, fields)
+            )
 
             _columns = [str(v["job_id"])]
-            if job_array_exists:
+            if stats.has_arrays:
+                array_job_id = fields.array_job_id(v)
+                array_task_id = fields.array_task_id(v)
                 _columns.extend(
                     [
-                        str(v["array"]["job_id"]) if v["array"]["job_id"] else "",
-                        (
-                            str(v["array"]["task_id"]["number"])
-                            if v["array"]["task_id"]["set"]
-                            else ""
-                        ),
+                        str(array_job_id) if array_job_id is not None else "",
+                        str(array_task_id) if array_task_id is not None else "",
                     ]
                 )
             _columns.extend(
                 [
-                    str(v["name"])[0:50],
-                    str(v.get("nodes", ""))[0:25],
-                    str(v["partition"]),
+                    Text(str(v["name"])[0:50]),
+                    Text(str(v.get("nodes", ""))[0:25]),
+                    label_text(str(v["partition"])),
                     submit_time_string,
                     start_time_string,
                     end_time_string,
-                    get_rich_state(v["state"]["current"]),
-                    str(v["account"]),
+                    state_text(fields.states(v)),
+                    label_text(str(v["account"])),
                 ]
             )
 
             job_table.add_row(*_columns, key=str(k))
 
-        total_jobs = len(self.old_jobs)
-
-        self.title = f"SlurmTUI: {total_jobs} jobs"
+        title = f"SlurmTUI: {stats.total} jobs"
+        failed = stats.count("FAILED") + stats.count("TIMEOUT")
+        if failed:
+            title += f" ({failed} failed)"
+        self.title = title
 
         job_table.cursor_coordinate = (
             old_cursor
@@ -209,6 +196,25 @@ class OldJobsScreen(ModalScreen):
             return True
         return False
 
+    def _get_log_path(
+        self, selected_job: Dict[str, Any], is_std_out: bool
+    ) -> Optional[str]:
+        """Expanded stdout/stderr path of a job, or None (after warning) if sacct
+        did not report it."""
+        fields = sacct_fields_of(self.old_jobs)
+        log_path = (fields.stdout if is_std_out else fields.stderr)(selected_job)
+        if log_path:
+            return log_path
+        stream = "standard output" if is_std_out else "standard error"
+        if not fields.has_output_paths:
+            message = f"Log paths of old jobs require Slurm 24.05 or later, no {stream} for job {selected_job['job_id']}"
+        elif fields.version is None:
+            message = f"Job {selected_job['job_id']} has no {stream}!. This may be due to slurm version being < 24.05"
+        else:
+            message = f"Job {selected_job['job_id']} has no {stream}!"
+        self.notify(message, severity="warning")
+        return None
+
     def _get_log_screen(self, is_primary: bool, is_std_out: bool) -> None:
         """Show the logs (STDOUT)."""
         # get the id of the selected job
@@ -232,25 +238,9 @@ class OldJobsScreen(ModalScreen):
             )
             return
 
-        # check if standard output or standard error in the selected job
-        if is_std_out:
-            if not selected_job.get("stdout_expanded", ""):
-                self.notify(
-                    f"Job {selected_job['job_id']} has no standard output!. This may be due to slurm version being < 24.05",
-                    severity="warning",
-                )
-                return
-        else:
-            if not selected_job.get("stderr_expanded", ""):
-                self.notify(
-                    f"Job {selected_job['job_id']} has no standard error!. This may be due to slurm version being < 24.05",
-                    severity="warning",
-                )
-                return
-
-        log_path = os.path.join(
-            selected_job["stdout_expanded" if is_std_out else "stderr_expanded"],
-        )
+        log_path = self._get_log_path(selected_job, is_std_out)
+        if log_path is None:
+            return
 
         # check if the log file exists
         if not os.path.isfile(log_path):
@@ -269,11 +259,11 @@ class OldJobsScreen(ModalScreen):
                 text_util_cmd = settings.SECONDARY_TEXT_UTIL_CMD
 
             if text_util_cmd.lower() == "tail":
-                cmd = f"tail -n {settings.TAIL_LINES} -f {log_path}"
+                cmd = f"tail -n {settings.TAIL_LINES} -f {shlex.quote(log_path)}"
             elif text_util_cmd.lower() == "less":
-                cmd = f"less {log_path}"
+                cmd = f"less {shlex.quote(log_path)}"
             else:
-                cmd = text_util_cmd.format(log_path=log_path)
+                cmd = text_util_cmd.format(log_path=shlex.quote(log_path))
 
             os.system(cmd)
             if not any(
@@ -326,17 +316,10 @@ class OldJobsScreen(ModalScreen):
             )
             return
 
-        key = "stdout_expanded" if is_std_out else "stderr_expanded"
-        if not selected_job.get(key, ""):
-            stream = "standard output" if is_std_out else "standard error"
-            self.notify(
-                f"Job {selected_job['job_id']} has no {stream}!. This may be due to slurm version being < 24.05",
-                severity="warning",
-            )
+        log_path = self._get_log_path(selected_job, is_std_out)
+        if log_path is None:
             return
 
-        log_path = selected_job[key]
-
         if not os.path.isfile(log_path):
             self.notify(
                 "Log file not created yet or not found!" f"\n{log_path}",
@@ -384,7 +367,12 @@ class OldJobsScreen(ModalScreen):
             """Print the string to the CLI."""
             self.app.exit(SlurmTUIReturn("print", {"string_to_print": string_to_print}))
 
-        self.app.push_screen(InfoScreen(selected_job), print_cli)
+        self.app.push_screen(
+            InfoScreen(
+                selected_job, job_details_loader(self.settings, selected_job, "sacct")
+            ),
+            print_cli,
+        )
 
     def action_quit(self) -> None:
         """Quit the application."""
@@ -0,0 +1,132 @@
+import time
+from typing import Callable, Dict, Optional
+
+from textual.app import App
+from textual.screen import Screen
+from textual.timer import Timer
+
+
+class _Poller:
+    __slots__ = ("refresh", "interval", "on_resume", "timer", "due", "suspended")
+
+    def __init__(
+        self,
+        refresh: Callable[[], None],
+        interval: Callable[[], float],
+        on_resume: Optional[Callable[[], None]],
+    ) -> None:
+        self.refresh = refresh
+        self.interval = interval
+        self.on_resume = on_resume
+        self.timer: Optional[Timer] = None
+        # Monotonic time of the next refresh, None while one is in flight
+        self.due: Optional[float] = None
+        self.suspended = False
+
+    def stop(self) -> None:
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer = None
+
+
+class PollingCoordinator:
+    """Runs the periodic refresh of every screen that polls Slurm.
+
+    Only the current screen polls. Screens register a ``refresh`` callback
+    that starts a fetch and an ``interval`` function giving the delay until
+    the next one, and call ``schedule`` once each fetch has been applied.
+    When another screen is pushed on top, the pending refresh is suspended;
+    when the screen becomes current again it refreshes right away if the
+    refresh came due in the meantime, otherwise it waits for the remainder.
+
+    A screen may register several pollers under different ``name``s, each
+    with its own interval (e.g. one per squeue query of a tiered view).
+    """
+
+    def __init__(self, app: App) -> None:
+        self.app = app
+        self._pollers: Dict[Screen, Dict[str, _Poller]] = {}
+        app.screen_change_signal.subscribe(app, self._on_screen_change)
+
+    def register(
+        self,
+        screen: Screen,
+        refresh: Callable[[], None],
+        interval: Callable[[], float],
+        on_resume: Optional[Callable[[], None]] = None,
+        name: str = "",
+    ) -> None:
+        """Start coordinating ``screen``. ``on_resume`` is called whenever it
+        becomes the current screen again (e.g. to restore the title)."""
+        self.unregister(screen, name)
+        poller = _Poller(refresh, interval, on_resume)
+        poller.suspended = screen is not self.app.screen
+        self._pollers.setdefault(screen, {})[name] = poller
+
+    def unregister(self, screen: Screen, name: Optional[str] = None) -> None:
+        """Stop the poller ``name`` of ``screen``, or all of them if None."""
+        pollers = self._pollers.get(screen)
+        if pollers is None:
+            return
+        for poller_name in list(pollers) if name is None else [name]:
+            poller = pollers.pop(poller_name, None)
+            if poller is not None:
+                poller.stop()
+        if not pollers:
+            del self._pollers[screen]
+
+    def is_suspended(self, screen: Screen) -> bool:
+        pollers = self._pollers.get(screen)
+        return not pollers or next(iter(pollers.values())).suspended
+
+    def schedule(self, screen: Screen, name: str = "") -> None:
+        """Plan the next refresh of ``screen`` after its current interval."""
+        poller = self._pollers.get(screen, {}).get(name)
+        if poller is None:
+            return
+        poller.stop()
+        delay = poller.interval()
+        poller.due = time.monotonic() + delay
+        if not poller.suspended:
+            poller.timer = screen.set_timer(
+                delay, lambda: self.refresh_now(screen, name)
+            )
+
+    def refresh_now(self, screen: Screen, name: Optional[str] = None) -> None:
+        """Refresh ``screen`` immediately, dropping the pending timer.
+
+        Refreshes every poller of the screen when ``name`` is None.
+        """
+        pollers = self._pollers.get(screen, {})
+        for poller_name in list(pollers) if name is None else [name]:
+            poller = pollers.get(poller_name)
+            if poller is None:
+                continue
+            poller.stop()
+            poller.due = None
+            poller.refresh()
+
+    def _on_screen_change(self, current: Screen) -> None:
+        for screen, pollers in list(self._pollers.items()):
+            for name, poller in list(pollers.items()):
+                if screen is not current:
+                    if not poller.suspended:
+                        poller.suspended = True
+                        poller.stop()
+                    continue
+                if not poller.suspended:
+                    continue
+                poller.suspended = False
+                if poller.on_resume is not None:
+                    poller.on_resume()
+                if poller.due is None:
+                    # Never scheduled yet, or a fetch is still running
+                    continue
+                remaining = poller.due - time.monotonic()
+                if remaining <= 0:
+                    self.refresh_now(screen, name)
+                else:
+                    poller.timer = screen.set_timer(
+                        remaining,
+                        lambda screen=screen, name=name: self.refresh_now(screen, name),
+                    )
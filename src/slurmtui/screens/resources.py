@@ -1,21 +1,30 @@
+import time
 from copy import deepcopy
 from typing import Any
 
 from rich.panel import Panel
+from textual import work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import VerticalScroll
 from textual.css.query import NoMatches
 from textual.events import Key
 from textual.screen import ModalScreen
-from textual.timer import Timer
 from textual.widgets import Footer, Header, Static
+from textual.worker import get_current_worker
 
+from ..controller_load import controller_monitor
+from ..offload import job_details_loader, run_fetch
 from ..slurm_utils import (
     CommandNotFoundError,
-    build_node_to_jobs,
+    NodeJobIndex,
+    NodeTable,
+    SlurmCommandError,
+    get_nodes,
     get_resources,
     get_running_jobs,
+    retry_backoff,
+    stale_marker,
 )
 from ..utils import SETTINGS
 from .sortable_data_table import SortableDataTable
@@ -91,7 +100,8 @@ class PartitionCard(Static, can_focus=True):
         name: str,
         data: dict,
         has_gpus: bool,
-        node_to_jobs: dict,
+        node_index: NodeJobIndex,
+        node_table: NodeTable,
         settings: SETTINGS,
         **kwargs: Any,
     ) -> None:
@@ -99,7 +109,8 @@ class PartitionCard(Static, can_focus=True):
         self.partition_name = name
         self.data = data
         self.has_gpus = has_gpus
-        self.node_to_jobs = node_to_jobs
+        self.node_index = node_index
+        self.node_table = node_table
         self.settings = settings
 
     def render(self) -> Panel:
@@ -171,7 +182,11 @@ class PartitionCard(Static, can_focus=True):
     def _expand(self) -> None:
         self.app.push_screen(
             PartitionDetailScreen(
-                self.partition_name, self.data, self.node_to_jobs, self.settings
+                self.partition_name,
+                self.data,
+                self.node_index,
+                self.node_table,
+                self.settings,
             )
         )
 
@@ -221,31 +236,76 @@ class PartitionDetailScreen(ModalScreen):
         self,
         name: str,
         data: dict,
-        node_to_jobs: dict,
+        node_index: NodeJobIndex,
+        node_table: NodeTable,
         settings: SETTINGS,
         **kwargs: Any,
     ) -> None:
         super().__init__(**kwargs)
         self.partition_name = name
         self.data = data
-        self.node_to_jobs = node_to_jobs
+        # Shared with the resources overview, both keep it up to date
+        self.node_index = node_index
+        # Exact per-node numbers, only filled when PER_NODE_RESOURCES is on
+        self.node_table = node_table
         self.settings = settings
         # Ordered list of node names matching table rows
         self._node_names: list[str] = []
-        self._refresh_timer: Timer | None = None
+        self._all_jobs: dict = {}
+        self._job_columns: list = []
+        self._pending_fetches: set[str] = set()
+        self._round_errors: list[SlurmCommandError] = []
+        self._last_success: float | None = time.time()
+        self._fetch_error: SlurmCommandError | None = None
+        self._fetch_failures = 0
 
     def _refresh_interval(self) -> int:
-        return self.settings.UPDATE_INTERVAL
+        return (
+            self.settings.UPDATE_INTERVAL
+            * controller_monitor.backoff_factor(self.settings)
+            * retry_backoff(self._fetch_failures, self.settings)
+        )
 
     def _refresh_content(self) -> None:
-        resources = get_resources(self.settings)
+        # sinfo and squeue run concurrently: the node columns are rendered as
+        # soon as sinfo returns and the job columns are filled in from squeue
+        self._pending_fetches = {"resources", "jobs"}
+        self._round_errors = []
+        self._fetch_resources()
+        self._fetch_jobs()
+
+    @work(thread=True, exclusive=True, group="partition_detail_sinfo")
+    def _fetch_resources(self) -> None:
+        resources = run_fetch(get_resources, self.settings)
+        nodes = None
+        if (
+            self.settings.PER_NODE_RESOURCES
+            and resources
+            and not isinstance(resources, (CommandNotFoundError, SlurmCommandError))
+        ):
+            nodes = run_fetch(get_nodes, self.settings)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._apply_resources, resources, nodes)
+
+    @work(thread=True, exclusive=True, group="partition_detail_squeue")
+    def _fetch_jobs(self) -> None:
+        all_jobs = run_fetch(get_running_jobs, self._get_all_jobs_settings())
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._apply_jobs, all_jobs)
+
+    def _apply_resources(self, resources, nodes) -> None:
+        if isinstance(resources, SlurmCommandError):
+            self._fetch_done("resources", resources)
+            return
         if isinstance(resources, CommandNotFoundError):
             self.notify(
                 f"Could not refresh resources: {resources.message}", severity="error"
             )
+            self._fetch_done("resources")
             return
         if not resources:
             self.notify("No resource information available", severity="warning")
+            self._fetch_done("resources")
             return
 
         partition_data = resources.get(self.partition_name)
@@ -257,26 +317,71 @@ class PartitionDetailScreen(ModalScreen):
             self.dismiss()
             return
 
-        all_jobs = get_running_jobs(settings=self._get_all_jobs_settings())
-        if isinstance(all_jobs, CommandNotFoundError):
-            all_jobs = None
-
         self.data = partition_data
-        self.node_to_jobs = build_node_to_jobs(all_jobs)
+        error = None
+        if isinstance(nodes, NodeTable):
+            self.node_table.replace(nodes)
+        elif isinstance(nodes, CommandNotFoundError):
+            self.notify(f"Per-node resources: {nodes.message}", severity="warning")
+        elif isinstance(nodes, SlurmCommandError):
+            error = nodes
         self._render_table()
+        self._fetch_done("resources", error)
 
-    def _update_content(self) -> None:
-        self._refresh_content()
-        self._refresh_timer = self.set_timer(
-            self._refresh_interval(), self._update_content
-        )
+    def _apply_jobs(self, all_jobs) -> None:
+        if isinstance(all_jobs, SlurmCommandError):
+            # The job columns keep the previous snapshot
+            self._fetch_done("jobs", all_jobs)
+            return
+        if isinstance(all_jobs, CommandNotFoundError):
+            all_jobs = None
+        self._all_jobs = all_jobs or {}
+        self._update_job_cells(self.node_index.update(all_jobs))
+        self._fetch_done("jobs")
+
+    def _fetch_done(self, fetch: str, error: SlurmCommandError | None = None) -> None:
+        """Join the concurrent fetches, the next round is planned once all are in."""
+        if error is not None:
+            self._round_errors.append(error)
+        self._pending_fetches.discard(fetch)
+        if self._pending_fetches:
+            return
+        if self._round_errors:
+            self._mark_stale(self._round_errors[0])
+            return
+        self._last_success = time.time()
+        self._fetch_error = None
+        self._fetch_failures = 0
+        self._update_title()
+        self.app.sub_title = controller_monitor.status(self.settings)
+        self._schedule_refresh()
+
+    def _mark_stale(self, error: SlurmCommandError) -> None:
+        self._fetch_error = error
+        self._fetch_failures += 1
+        self._update_title()
+        self._schedule_refresh()
+
+    def _update_title(self) -> None:
+        title = f"SlurmTUI: {self.partition_name}"
+        if self._fetch_error is not None:
+            title += " " + stale_marker(self._last_success, self._fetch_error)
+        self.app.title = title
+
+    def _tick_stale_marker(self) -> None:
+        if self._fetch_error is not None and self.is_current:
+            self._update_title()
+
+    def _schedule_refresh(self) -> None:
+        self.app.polling.schedule(self)
 
     def _render_table(self) -> None:
         table = self.query_one(SortableDataTable)
         table.clear(columns=True)
         table.cursor_type = "row"
 
-        has_gres = any(ng["gres"] for ng in self.data["node_groups"])
+        node_groups = self._node_rows()
+        has_gres = any(ng["gres"] for ng in node_groups)
 
         columns = [
             "Node",
@@ -292,10 +397,11 @@ class PartitionDetailScreen(ModalScreen):
         columns.append("Features")
         columns.extend(["Job ID", "User", "Job Name"])
 
-        table.add_columns(*columns)
+        column_keys = table.add_columns(*columns)
+        self._job_columns = column_keys[-3:]
 
         self._node_names = []
-        for ng in self.data["node_groups"]:
+        for ng in node_groups:
             node_name = ng["node"]
             self._node_names.append(node_name)
             cpu_pct = (
@@ -305,16 +411,6 @@ class PartitionDetailScreen(ModalScreen):
             )
             state_col = _state_color(ng["state"])
 
-            jobs_on_node = self.node_to_jobs.get(node_name, [])
-            if jobs_on_node:
-                job_ids = ", ".join(str(j["job_id"]) for j in jobs_on_node)
-                users = ", ".join(sorted(set(j["user"] for j in jobs_on_node)))
-                names = ", ".join(sorted(set(j["name"] for j in jobs_on_node)))
-            else:
-                job_ids = ""
-                users = ""
-                names = ""
-
             row = [
                 node_name,
                 f"[{state_col}]{ng['state']}[/{state_col}]",
@@ -327,35 +423,64 @@ class PartitionDetailScreen(ModalScreen):
             if has_gres:
                 row.extend([ng["gres"], ng["gres_used"]])
             row.append(ng["features"])
-            row.extend([job_ids, users, names])
+            row.extend(self._job_cells(node_name))
 
             table.add_row(*row, key=node_name)
 
         table.restore_sort()
 
+    def _job_cells(self, node_name: str) -> list[str]:
+        """Job ID, User and Job Name cells for a node."""
+        jobs_on_node = self.node_index.get(node_name)
+        if not jobs_on_node:
+            return ["", "", ""]
+        job_ids = sorted(j["job_id"] for j in jobs_on_node)
+        return [
+            ", ".join(str(job_id) for job_id in job_ids),
+            ", ".join(sorted(self.node_index.users(node_name))),
+            ", ".join(sorted(set(j["name"] for j in jobs_on_node))),
+        ]
+
+    def _update_job_cells(self, nodes: set[str]) -> None:
+        """Refresh only the job columns of the rows whose jobs changed."""
+        table = self.query_one(SortableDataTable)
+        rows = set(self._node_names)
+        for node_name in nodes & rows:
+            for key, value in zip(self._job_columns, self._job_cells(node_name)):
+                table.update_cell(node_name, key, value)
+
+    def _node_rows(self) -> list[dict]:
+        """Per-node rows: exact values from the node table when enabled,
+        otherwise the per-group averages derived from sinfo."""
+        if not self.settings.PER_NODE_RESOURCES:
+            return self.data["node_groups"]
+        return [
+            info._asdict()
+            for info in self.node_table.partition_nodes(self.partition_name)
+        ]
+
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
         yield SortableDataTable(zebra_stripes=True, id="partition_detail_table")
         yield Footer()
 
     def on_mount(self) -> None:
-        self.app.title = f"SlurmTUI: {self.partition_name}"
-        self._refresh_content()
-        self._refresh_timer = self.set_timer(
-            self._refresh_interval(), self._update_content
+        self._update_title()
+        self._render_table()
+        self.app.polling.register(
+            self, self._refresh_content, self._refresh_interval, self._update_title
         )
+        self.app.polling.refresh_now(self)
+        self.set_interval(1, self._tick_stale_marker)
 
     def on_unmount(self) -> None:
-        if self._refresh_timer is not None:
-            self._refresh_timer.stop()
+        self.app.polling.unregister(self)
 
     def action_force_refresh(self) -> None:
         self.notify(
             "Refreshing partition details...", severity="information", timeout=1.5
         )
-        if self._refresh_timer is not None:
-            self._refresh_timer.stop()
-        self._update_content()
+        self.app.polling.refresh_now(self)
 
     def action_info(self) -> None:
         """Show full job info for the job running on the selected node."""
@@ -370,26 +495,23 @@ class PartitionDetailScreen(ModalScreen):
         coord = table.cursor_coordinate
         cell_key = table.coordinate_to_cell_key(coord)
         node_name = cell_key.row_key.value
-        jobs_on_node = self.node_to_jobs.get(node_name, [])
+        jobs_on_node = self.node_index.get(node_name)
         if not jobs_on_node:
             self.notify(f"No running jobs on {node_name}", severity="warning")
             return
 
-        # Fetch the full job dict to pass to InfoScreen
-        all_jobs = get_running_jobs(settings=self._get_all_jobs_settings())
-        if not all_jobs or isinstance(all_jobs, CommandNotFoundError):
-            self.notify("Could not fetch job details", severity="error")
-            return
-
+        # The full job dict comes from the last all-jobs snapshot
         job_id = jobs_on_node[0]["job_id"]
-        job_info = all_jobs.get(job_id)
+        job_info = self._all_jobs.get(job_id)
         if not job_info:
             self.notify(f"Job {job_id} no longer in queue", severity="warning")
             return
 
         from .info import InfoScreen
 
-        self.app.push_screen(InfoScreen(job_info))
+        self.app.push_screen(
+            InfoScreen(job_info, job_details_loader(self.settings, job_info))
+        )
 
     def _get_all_jobs_settings(self) -> SETTINGS:
         """Return a copy of settings with CHECK_ALL_JOBS enabled."""
@@ -419,87 +541,188 @@ class ResourcesScreen(ModalScreen):
     def __init__(self, settings: SETTINGS, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.settings = settings
-        self._refresh_timer: Timer | None = None
+        self._node_index = NodeJobIndex()
+        self._node_table = NodeTable()
+        # Mounted cards by partition name, updated in place on every refresh
+        self._cards: dict[str, PartitionCard] = {}
+        self._pending_fetches: set[str] = set()
+        self._round_errors: list[SlurmCommandError] = []
+        self._title = "SlurmTUI Resources"
+        self._last_success: float | None = None
+        self._fetch_error: SlurmCommandError | None = None
+        self._fetch_failures = 0
 
     def _refresh_interval(self) -> int:
-        return self.settings.UPDATE_INTERVAL
+        return (
+            self.settings.UPDATE_INTERVAL
+            * controller_monitor.backoff_factor(self.settings)
+            * retry_backoff(self._fetch_failures, self.settings)
+        )
 
     def _refresh_content(self) -> None:
-        resources = get_resources(self.settings)
+        # The cards only need sinfo; the all-jobs squeue runs next to it to
+        # keep the node index current for the partition detail view
+        self._pending_fetches = {"resources", "jobs"}
+        self._round_errors = []
+        self._fetch_resources()
+        self._fetch_jobs()
+
+    @work(thread=True, exclusive=True, group="resources_sinfo")
+    def _fetch_resources(self) -> None:
+        resources = run_fetch(get_resources, self.settings)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._apply_resources, resources)
+
+    @work(thread=True, exclusive=True, group="resources_squeue")
+    def _fetch_jobs(self) -> None:
+        all_jobs_settings = deepcopy(self.settings)
+        all_jobs_settings.CHECK_ALL_JOBS = True
+        all_jobs = run_fetch(get_running_jobs, all_jobs_settings)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._apply_jobs, all_jobs)
 
+    def _apply_resources(self, resources) -> None:
         try:
             container = self.query_one("#partitions_container", VerticalScroll)
         except NoMatches:
+            # Still join the round, or the next refresh is never scheduled
+            self._fetch_done("resources")
             return
 
-        container.remove_children()
-
-        if isinstance(resources, CommandNotFoundError):
-            container.mount(Static(f"[red]Error: {resources.message}[/red]"))
-            self.app.title = "SlurmTUI Resources"
+        if isinstance(resources, SlurmCommandError):
+            if self._last_success is None and not self._cards:
+                self._show_message(f"[red]Error: {resources.message}[/red]")
+            self._fetch_done("resources", resources)
             return
 
-        if not resources:
-            container.mount(
-                Static("[yellow]No resource information available[/yellow]")
-            )
-            self.app.title = "SlurmTUI Resources"
+        if isinstance(resources, CommandNotFoundError):
+            self._show_message(f"[red]Error: {resources.message}[/red]")
+            self._title = "SlurmTUI Resources"
+        elif not resources:
+            self._show_message("[yellow]No resource information available[/yellow]")
+            self._title = "SlurmTUI Resources"
+        else:
+            self._update_cards(container, resources)
+            self._title = f"SlurmTUI Resources: {len(resources)} partitions"
+        self._update_title()
+        self._fetch_done("resources")
+
+    def _apply_jobs(self, all_jobs) -> None:
+        if isinstance(all_jobs, SlurmCommandError):
+            self._fetch_done("jobs", all_jobs)
             return
-
-        all_jobs_settings = deepcopy(self.settings)
-        all_jobs_settings.CHECK_ALL_JOBS = True
-        all_jobs = get_running_jobs(settings=all_jobs_settings)
         if isinstance(all_jobs, CommandNotFoundError):
             all_jobs = None
-        node_to_jobs = build_node_to_jobs(all_jobs)
+        self._node_index.update(all_jobs)
+        self._fetch_done("jobs")
+
+    def _fetch_done(self, fetch: str, error: SlurmCommandError | None = None) -> None:
+        """Join the concurrent fetches, the next round is planned once all are in."""
+        if error is not None:
+            self._round_errors.append(error)
+        self._pending_fetches.discard(fetch)
+        if self._pending_fetches:
+            return
+        if self._round_errors:
+            self._fetch_error = self._round_errors[0]
+            self._fetch_failures += 1
+        else:
+            self._last_success = time.time()
+            self._fetch_error = None
+            self._fetch_failures = 0
+            self.app.sub_title = controller_monitor.status(self.settings)
+        self._update_title()
+        self._schedule_refresh()
+
+    def _show_message(self, message: str) -> None:
+        """Replace the cards with a single message."""
+        container = self.query_one("#partitions_container", VerticalScroll)
+        container.remove_children()
+        self._cards = {}
+        container.mount(Static(message, classes="resources_message"))
+
+    def _update_cards(self, container: VerticalScroll, resources: dict) -> None:
+        """Sync the cards with ``resources``: refresh the ones whose numbers
+        changed, remove vanished partitions and mount new ones in order."""
+        first_load = not self._cards
+        for message in self.query(".resources_message"):
+            message.remove()
+
+        for name in list(self._cards):
+            if name not in resources:
+                self._cards.pop(name).remove()
 
         has_gpus = any(p["gpus_total"] > 0 for p in resources.values())
-        for name in sorted(resources):
-            container.mount(
-                PartitionCard(
-                    name,
-                    resources[name],
-                    has_gpus,
-                    node_to_jobs,
-                    self.settings,
-                )
+        names = sorted(resources)
+        for position, name in enumerate(names):
+            card = self._cards.get(name)
+            if card is not None:
+                if card.data != resources[name] or card.has_gpus != has_gpus:
+                    card.data = resources[name]
+                    card.has_gpus = has_gpus
+                    card.refresh()
+                continue
+            card = PartitionCard(
+                name,
+                resources[name],
+                has_gpus,
+                self._node_index,
+                self._node_table,
+                self.settings,
+            )
+            self._cards[name] = card
+            # Keep the cards sorted: mount before the next existing one
+            following = next(
+                (self._cards[n] for n in names[position + 1 :] if n in self._cards),
+                None,
             )
+            if following is not None and following.parent is container:
+                container.mount(card, before=following)
+            else:
+                container.mount(card)
 
-        self.app.title = f"SlurmTUI Resources: {len(resources)} partitions"
+        focused = self.focused
+        if (
+            first_load
+            or not isinstance(focused, PartitionCard)
+            or (focused.partition_name not in self._cards)
+        ):
+            self._cards[names[0]].focus()
 
-        cards = self.query(PartitionCard)
-        if cards:
-            cards.first().focus()
+    def _update_title(self) -> None:
+        title = self._title
+        if self._fetch_error is not None:
+            title += " " + stale_marker(self._last_success, self._fetch_error)
+        self.app.title = title
 
-    def _update_content(self) -> None:
-        self._refresh_content()
-        self._refresh_timer = self.set_timer(
-            self._refresh_interval(), self._update_content
-        )
+    def _tick_stale_marker(self) -> None:
+        if self._fetch_error is not None and self.is_current:
+            self._update_title()
+
+    def _schedule_refresh(self) -> None:
+        self.app.polling.schedule(self)
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
 
         with VerticalScroll(id="partitions_container"):
-            yield Static("[dim]Loading resources...[/dim]")
+            yield Static("[dim]Loading resources...[/dim]", classes="resources_message")
 
         yield Footer()
 
     def on_mount(self) -> None:
-        self._refresh_content()
-        self._refresh_timer = self.set_timer(
-            self._refresh_interval(), self._update_content
+        self.app.polling.register(
+            self, self._refresh_content, self._refresh_interval, self._update_title
         )
+        self.app.polling.refresh_now(self)
+        self.set_interval(1, self._tick_stale_marker)
 
     def on_unmount(self) -> None:
-        if self._refresh_timer is not None:
-            self._refresh_timer.stop()
+        self.app.polling.unregister(self)
 
     def action_force_refresh(self) -> None:
         self.notify("Refreshing resources...", severity="information", timeout=1.5)
-        if self._refresh_timer is not None:
-            self._refresh_timer.stop()
-        self._update_content()
+        self.app.polling.refresh_now(self)
 
     def action_quit(self) -> None:
         from ..slurm_utils import SlurmTUIReturn
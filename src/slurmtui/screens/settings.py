@@ -11,7 +11,7 @@ from textual.theme import BUILTIN_THEMES
 from textual.widgets import Button, Checkbox, Footer, Header, Input, Label, OptionList
 
 from .. import __version__
-from ..utils import settings
+from ..utils import settings, system_settings
 
 SCREEN_BINDINGS = [
     Binding("ctrl+s", "save_settings", "Save Settings", key_display="Ctrl+S"),
@@ -101,7 +101,16 @@ class SettingsScreen(ModalScreen[bool]):
                     str(settings.UPDATE_INTERVAL),
                     id="input_UPDATE_INTERVAL",
                     placeholder="10",
-                    tooltip="Seconds between job list refreshes (×5 when Check All Jobs is on)",
+                    tooltip="Seconds between refreshes of your own jobs",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Command Timeout (seconds)", classes="settings_label")
+                yield Input(
+                    str(settings.COMMAND_TIMEOUT),
+                    id="input_COMMAND_TIMEOUT",
+                    placeholder="30",
+                    tooltip="Seconds after which a Slurm command is killed and the previous data is kept on screen, 0 for no timeout",
                 )
 
             with Horizontal(classes="settings_row"):
@@ -113,6 +122,133 @@ class SettingsScreen(ModalScreen[bool]):
                     tooltip="Show all jobs in the queue, not just yours",
                 )
 
+            with Horizontal(classes="settings_row"):
+                yield Label("All Jobs Interval (seconds)", classes="settings_label")
+                yield Input(
+                    str(settings.ALL_JOBS_UPDATE_INTERVAL),
+                    id="input_ALL_JOBS_UPDATE_INTERVAL",
+                    placeholder="50",
+                    tooltip="Seconds between refreshes of the other users' jobs when Check All Jobs is on",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Pending Jobs Interval (seconds)", classes="settings_label")
+                yield Input(
+                    str(settings.PENDING_UPDATE_INTERVAL),
+                    id="input_PENDING_UPDATE_INTERVAL",
+                    placeholder="0",
+                    tooltip="Poll pending jobs apart from running ones, at most every this many seconds, 0 to poll them together",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Collapse Array Jobs", classes="settings_label")
+                yield Checkbox(
+                    id="input_COLLAPSE_ARRAY_JOBS",
+                    value=settings.COLLAPSE_ARRAY_JOBS,
+                    button_first=False,
+                    tooltip="Show each array job as one summary row, press Enter on it to list its tasks",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Shared Fetch", classes="settings_label")
+                yield Checkbox(
+                    id="input_SHARED_FETCH",
+                    value=settings.SHARED_FETCH,
+                    button_first=False,
+                    tooltip="Share all-jobs squeue snapshots with other SlurmTUI instances on this host",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Shared State Directory", classes="settings_label")
+                yield Input(
+                    settings.SHARED_STATE_DIR,
+                    id="input_SHARED_STATE_DIR",
+                    placeholder="/tmp/slurmtui",
+                    tooltip="Directory used to share snapshots and locks between SlurmTUI instances on this host",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Shared State Group", classes="settings_label")
+                yield Input(
+                    settings.SHARED_STATE_GROUP or "",
+                    id="input_SHARED_STATE_GROUP",
+                    placeholder="(only your own files)",
+                    tooltip="Unix group whose members' shared snapshots are trusted and who share the Slurm call budget",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Max Slurm Calls / Minute", classes="settings_label")
+                yield Input(
+                    str(settings.MAX_SLURM_CALLS_PER_MINUTE),
+                    id="input_MAX_SLURM_CALLS_PER_MINUTE",
+                    placeholder="0",
+                    disabled="MAX_SLURM_CALLS_PER_MINUTE" in system_settings,
+                    tooltip="Host-wide cap on squeue/sacct/sinfo calls per minute, 0 for no limit. Can be enforced by the admins in the system settings",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Controller Backoff", classes="settings_label")
+                yield Checkbox(
+                    id="input_CONTROLLER_BACKOFF",
+                    value=settings.CONTROLLER_BACKOFF,
+                    button_first=False,
+                    tooltip="Slow down all polling while slurmctld looks overloaded",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("sdiag Sample Interval", classes="settings_label")
+                yield Input(
+                    str(settings.CONTROLLER_SAMPLE_INTERVAL),
+                    id="input_CONTROLLER_SAMPLE_INTERVAL",
+                    placeholder="60",
+                    tooltip="Seconds between sdiag samples when Controller Backoff is on, 0 to only track squeue response times",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Backoff Latency (s)", classes="settings_label")
+                yield Input(
+                    str(settings.BACKOFF_LATENCY_THRESHOLD),
+                    id="input_BACKOFF_LATENCY_THRESHOLD",
+                    placeholder="5.0",
+                    tooltip="Average Slurm command response time above which polling backs off",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Backoff RPC Threshold", classes="settings_label")
+                yield Input(
+                    str(settings.BACKOFF_RPC_THRESHOLD),
+                    id="input_BACKOFF_RPC_THRESHOLD",
+                    placeholder="128",
+                    tooltip="sdiag server thread count or agent queue size above which polling backs off",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Per-Node Resources", classes="settings_label")
+                yield Checkbox(
+                    id="input_PER_NODE_RESOURCES",
+                    value=settings.PER_NODE_RESOURCES,
+                    button_first=False,
+                    tooltip="Show exact per-node usage in the partition view (one `scontrol show nodes` call) instead of per-group averages",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Parse in Subprocess", classes="settings_label")
+                yield Checkbox(
+                    id="input_PARSE_IN_SUBPROCESS",
+                    value=settings.PARSE_IN_SUBPROCESS,
+                    button_first=False,
+                    tooltip="Fetch and parse Slurm output in a separate process to keep the interface responsive on very large clusters",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Project Job Fields", classes="settings_label")
+                yield Checkbox(
+                    id="input_PROJECT_JOB_FIELDS",
+                    value=settings.PROJECT_JOB_FIELDS,
+                    button_first=False,
+                    tooltip="With msgspec installed, decode only the job fields the tables use (the Info view then lists only those)",
+                )
+
             with Horizontal(classes="settings_row"):
                 yield Label("Mock Mode", classes="settings_label")
                 yield Checkbox(
@@ -216,6 +352,94 @@ class SettingsScreen(ModalScreen[bool]):
                     tooltip="JSON file path to substitute for sinfo output (debug/testing)",
                 )
 
+            with Horizontal(classes="settings_row"):
+                yield Label("Debug Nodes JSON Path", classes="settings_label")
+                yield Input(
+                    settings.DEBUG_NODES_JSON_PATH or "",
+                    id="input_DEBUG_NODES_JSON_PATH",
+                    tooltip="JSON file path to substitute for scontrol show nodes output (debug/testing)",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Metrics Prometheus Path", classes="settings_label")
+                yield Input(
+                    settings.METRICS_PROMETHEUS_PATH or "",
+                    id="input_METRICS_PROMETHEUS_PATH",
+                    tooltip="Prometheus textfile to write Slurm command counters to ({user}, {pid} and {host} are expanded)",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Metrics JSONL Path", classes="settings_label")
+                yield Input(
+                    settings.METRICS_JSONL_PATH or "",
+                    id="input_METRICS_JSONL_PATH",
+                    tooltip="JSON-lines file to append one record per Slurm command to ({user}, {pid} and {host} are expanded)",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Notify Transitions", classes="settings_label")
+                yield Input(
+                    (
+                        ", ".join(settings.NOTIFY_TRANSITIONS)
+                        if settings.NOTIFY_TRANSITIONS
+                        else ""
+                    ),
+                    id="input_NOTIFY_TRANSITIONS",
+                    placeholder="PENDING>RUNNING, *>FAILED",
+                    tooltip="State transitions of your jobs to notify about (comma-separated FROM>TO, * for any state). Empty disables notifications",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Notify Bell", classes="settings_label")
+                yield Checkbox(
+                    id="input_NOTIFY_BELL",
+                    value=settings.NOTIFY_BELL,
+                    button_first=False,
+                    tooltip="Ring the terminal bell on each notification",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Notify Command", classes="settings_label")
+                yield Input(
+                    settings.NOTIFY_COMMAND or "",
+                    id="input_NOTIFY_COMMAND",
+                    placeholder="notify-send 'Job {job_id}' '{old_state} -> {new_state}'",
+                    tooltip="Command run on each notification ({job_id}, {name}, {partition}, {account}, {old_state} and {new_state} are expanded)",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Notify Job Name", classes="settings_label")
+                yield Input(
+                    settings.NOTIFY_JOB_NAME or "",
+                    id="input_NOTIFY_JOB_NAME",
+                    placeholder="train_*",
+                    tooltip="Only notify about jobs whose name matches this shell-style pattern",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Notify Partitions", classes="settings_label")
+                yield Input(
+                    (
+                        ", ".join(settings.NOTIFY_PARTITIONS)
+                        if settings.NOTIFY_PARTITIONS
+                        else ""
+                    ),
+                    id="input_NOTIFY_PARTITIONS",
+                    tooltip="Only notify about jobs in these partitions (comma-separated)",
+                )
+
+            with Horizontal(classes="settings_row"):
+                yield Label("Notify Accounts", classes="settings_label")
+                yield Input(
+                    (
+                        ", ".join(settings.NOTIFY_ACCOUNTS)
+                        if settings.NOTIFY_ACCOUNTS
+                        else ""
+                    ),
+                    id="input_NOTIFY_ACCOUNTS",
+                    tooltip="Only notify about jobs of these accounts (comma-separated)",
+                )
+
         yield Footer()
 
     def action_save_settings(self) -> None:
@@ -231,11 +455,91 @@ class SettingsScreen(ModalScreen[bool]):
         except (ValueError, TypeError):
             settings.UPDATE_INTERVAL = 10
 
+        try:
+            settings.ALL_JOBS_UPDATE_INTERVAL = max(
+                1,
+                int(
+                    self.query_one(
+                        "#input_ALL_JOBS_UPDATE_INTERVAL", Input
+                    ).value.strip()
+                ),
+            )
+        except (ValueError, TypeError):
+            settings.ALL_JOBS_UPDATE_INTERVAL = 50
+
+        pending_str = self.query_one(
+            "#input_PENDING_UPDATE_INTERVAL", Input
+        ).value.strip()
+        try:
+            settings.PENDING_UPDATE_INTERVAL = max(0, int(pending_str or 0))
+        except (ValueError, TypeError):
+            settings.PENDING_UPDATE_INTERVAL = 0
+
+        timeout_str = self.query_one("#input_COMMAND_TIMEOUT", Input).value.strip()
+        try:
+            settings.COMMAND_TIMEOUT = max(0, int(timeout_str or 0))
+        except (ValueError, TypeError):
+            settings.COMMAND_TIMEOUT = 30
+
         # Booleans — read directly from Checkbox widgets, never via __dict__ iteration
         settings.CHECK_ALL_JOBS = self.query_one(
             "#input_CHECK_ALL_JOBS", Checkbox
         ).value
+        settings.COLLAPSE_ARRAY_JOBS = self.query_one(
+            "#input_COLLAPSE_ARRAY_JOBS", Checkbox
+        ).value
         settings.MOCK = self.query_one("#input_MOCK", Checkbox).value
+        settings.SHARED_FETCH = self.query_one("#input_SHARED_FETCH", Checkbox).value
+        settings.PER_NODE_RESOURCES = self.query_one(
+            "#input_PER_NODE_RESOURCES", Checkbox
+        ).value
+        settings.PARSE_IN_SUBPROCESS = self.query_one(
+            "#input_PARSE_IN_SUBPROCESS", Checkbox
+        ).value
+        settings.PROJECT_JOB_FIELDS = self.query_one(
+            "#input_PROJECT_JOB_FIELDS", Checkbox
+        ).value
+
+        shared_dir = self.query_one("#input_SHARED_STATE_DIR", Input).value.strip()
+        settings.SHARED_STATE_DIR = shared_dir or "/tmp/slurmtui"
+        shared_group = self.query_one("#input_SHARED_STATE_GROUP", Input).value.strip()
+        settings.SHARED_STATE_GROUP = shared_group or None
+
+        settings.CONTROLLER_BACKOFF = self.query_one(
+            "#input_CONTROLLER_BACKOFF", Checkbox
+        ).value
+
+        sample_str = self.query_one(
+            "#input_CONTROLLER_SAMPLE_INTERVAL", Input
+        ).value.strip()
+        try:
+            settings.CONTROLLER_SAMPLE_INTERVAL = max(0, int(sample_str or 0))
+        except (ValueError, TypeError):
+            settings.CONTROLLER_SAMPLE_INTERVAL = 60
+
+        latency_str = self.query_one(
+            "#input_BACKOFF_LATENCY_THRESHOLD", Input
+        ).value.strip()
+        try:
+            settings.BACKOFF_LATENCY_THRESHOLD = float(latency_str)
+            if settings.BACKOFF_LATENCY_THRESHOLD <= 0:
+                raise ValueError
+        except (ValueError, TypeError):
+            settings.BACKOFF_LATENCY_THRESHOLD = 5.0
+
+        rpc_str = self.query_one("#input_BACKOFF_RPC_THRESHOLD", Input).value.strip()
+        try:
+            settings.BACKOFF_RPC_THRESHOLD = max(1, int(rpc_str))
+        except (ValueError, TypeError):
+            settings.BACKOFF_RPC_THRESHOLD = 128
+
+        max_calls_str = self.query_one(
+            "#input_MAX_SLURM_CALLS_PER_MINUTE", Input
+        ).value.strip()
+        try:
+            settings.MAX_SLURM_CALLS_PER_MINUTE = max(0, int(max_calls_str or 0))
+        except (ValueError, TypeError):
+            settings.MAX_SLURM_CALLS_PER_MINUTE = 0
 
         # List[str] space-separated → None if blank
         squeue_str = self.query_one("#input_SQUEUE_ARGS", Input).value.strip()
@@ -290,6 +594,28 @@ class SettingsScreen(ModalScreen[bool]):
         sinfo_path = self.query_one("#input_DEBUG_SINFO_JSON_PATH", Input).value.strip()
         settings.DEBUG_SINFO_JSON_PATH = sinfo_path or None
 
+        nodes_path = self.query_one("#input_DEBUG_NODES_JSON_PATH", Input).value.strip()
+        settings.DEBUG_NODES_JSON_PATH = nodes_path or None
+
+        prom_path = self.query_one(
+            "#input_METRICS_PROMETHEUS_PATH", Input
+        ).value.strip()
+        settings.METRICS_PROMETHEUS_PATH = prom_path or None
+
+        jsonl_path = self.query_one("#input_METRICS_JSONL_PATH", Input).value.strip()
+        settings.METRICS_JSONL_PATH = jsonl_path or None
+
+        settings.NOTIFY_BELL = self.query_one("#input_NOTIFY_BELL", Checkbox).value
+        notify_command = self.query_one("#input_NOTIFY_COMMAND", Input).value.strip()
+        settings.NOTIFY_COMMAND = notify_command or None
+        notify_name = self.query_one("#input_NOTIFY_JOB_NAME", Input).value.strip()
+        settings.NOTIFY_JOB_NAME = notify_name or None
+        for key in ("NOTIFY_TRANSITIONS", "NOTIFY_PARTITIONS", "NOTIFY_ACCOUNTS"):
+            value = self.query_one(f"#input_{key}", Input).value
+            items = [item.strip() for item in value.split(",") if item.strip()]
+            setattr(settings, key, items or None)
+
+        settings.apply_system_settings()
         settings.save()
         self.notify("Settings saved")
         self.dismiss(True)
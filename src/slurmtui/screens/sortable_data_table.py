@@ -15,9 +15,10 @@ except ImportError:
 
 from rich.text import Text
 from textual import on
+from textual._two_way_dict import TwoWayDict
 from textual.binding import Binding
 from textual.widgets import DataTable
-from textual.widgets.data_table import CellKey, Column, ColumnKey
+from textual.widgets.data_table import CellKey, Column, ColumnKey, RowKey
 
 SORT_INDICATOR_UP: Final[str] = ' \u25b4'
 SORT_INDICATOR_DOWN: Final[str] = ' \u25be'
@@ -97,6 +98,25 @@ class SortableDataTable(DataTable):
             self.sort_on_column(pending.label, direction=pending.direction)
             self._pending_sort = None
 
+    def resort(self) -> None:
+        """Sort again on the current column, after cells were updated in place
+        or rows were added."""
+        sort = self._sort
+        if sort.key is not None:
+            self.sort(sort.key, key=self.sort_function, reverse=sort.direction)
+
+    def order_rows(self, key: Callable[[RowKey], Any]) -> None:
+        """Order the rows by ``key`` of their row key, e.g. to put rows added
+        since the last render back in the order of an unsorted table."""
+        # DataTable.sort only passes the cells to its key, so this mirrors its
+        # body (textual 8.1.1, the pinned version) with the row keys instead
+        ordered = sorted(self.rows, key=key)
+        self._row_locations = TwoWayDict(
+            {row_key: index for index, row_key in enumerate(ordered)}
+        )
+        self._update_count += 1
+        self.refresh()
+
     def column_names(self) -> List[Column]:
         data = self.columns.copy()
         if self._sort.key:
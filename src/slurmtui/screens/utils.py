@@ -1,4 +1,7 @@
-from typing import Dict
+from typing import Dict, List
+
+from rich.cells import cell_len
+from textual.widgets import DataTable
 
 
 class ColumnManager:
@@ -23,3 +26,17 @@ class ColumnManager:
     def get_all_columns(self):
         """Return a list of all column names in order."""
         return list(self.columns.keys())
+
+
+def add_sized_columns(
+    table: DataTable, labels: List[str], widths: Dict[str, int]
+) -> None:
+    """Add columns, fixing the width of those whose widest cell is already known
+    so the table does not measure every one of their cells."""
+    for label in labels:
+        width = widths.get(label)
+        if width is None:
+            table.add_column(label)
+        else:
+            # room for the sort indicator appended to the label
+            table.add_column(label, width=max(width, cell_len(label) + 2))
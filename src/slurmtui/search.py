@@ -0,0 +1,154 @@
+"""Incremental trigram index for filtering the job table.
+
+Jobs are searched by the lowercase values of their job id, name, partition,
+account, user, state and nodes (both the compressed list and each node).
+A query is split on whitespace and every term must be a substring of one of
+a job's values.
+
+Apart from the job id, these values are shared by many jobs, so the index is
+built over the distinct values: each value has the set of jobs carrying it,
+and each trigram the set of values containing it. A term of three or more
+characters is only compared with the values having all of its trigrams;
+shorter terms are compared with every value, of which there are still far
+fewer than jobs. Job ids are only compared with terms made of digits.
+
+A new snapshot only re-indexes the jobs whose values changed, and a query
+that extends the previous one (the user typed one more character) is only
+checked against the previous matches.
+"""
+
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from .schemas import SqueueFields, squeue_fields_of
+from .slurm_utils import expand_hostlist
+
+
+def job_values(job: Dict, fields: SqueueFields) -> Tuple[str, ...]:
+    """Lowercase values a job is searched by, besides its id."""
+    nodes = job.get("nodes") or ""
+    values = [
+        str(job.get("name", "")),
+        str(job.get("partition", "")),
+        str(job.get("account", "")),
+        str(job.get("user_name", "")),
+        *fields.states(job),
+        nodes,
+    ]
+    if "[" in nodes:
+        values.extend(expand_hostlist(nodes))
+    return tuple({value.lower() for value in values if value})
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class JobSearchIndex:
+    """Trigram index over the jobs of the last snapshot passed to ``update``."""
+
+    def __init__(self) -> None:
+        self._job_values: Dict[int, Tuple[str, ...]] = {}
+        self._ids: Dict[int, str] = {}
+        # value -> ids of the jobs having it
+        self._jobs: Dict[str, Set[int]] = {}
+        # trigram -> values containing it
+        self._postings: Dict[str, Set[str]] = {}
+        self._snapshot = None
+        # Bumped whenever the index changes, invalidates the last result
+        self._version = 0
+        self._last_query: Optional[str] = None
+        self._last_version = -1
+        self._last_result: Set[int] = set()
+
+    def _add(self, job_id: int, values: Iterable[str]) -> None:
+        for value in values:
+            job_ids = self._jobs.get(value)
+            if job_ids is None:
+                job_ids = self._jobs[value] = set()
+                for trigram in _trigrams(value):
+                    self._postings.setdefault(trigram, set()).add(value)
+            job_ids.add(job_id)
+
+    def _remove(self, job_id: int, values: Iterable[str]) -> None:
+        for value in values:
+            job_ids = self._jobs[value]
+            job_ids.discard(job_id)
+            if job_ids:
+                continue
+            del self._jobs[value]
+            for trigram in _trigrams(value):
+                posting = self._postings[trigram]
+                posting.discard(value)
+                if not posting:
+                    del self._postings[trigram]
+
+    def update(self, jobs: Dict[int, Dict]) -> None:
+        """Index ``jobs``, only re-indexing the jobs whose values changed."""
+        if jobs is self._snapshot:
+            return
+        self._snapshot = jobs
+        fields = squeue_fields_of(jobs)
+        changed = False
+        for job_id in [job_id for job_id in self._job_values if job_id not in jobs]:
+            self._remove(job_id, self._job_values.pop(job_id))
+            del self._ids[job_id]
+            changed = True
+        for job_id, job in jobs.items():
+            values = job_values(job, fields)
+            old_values = self._job_values.get(job_id)
+            if old_values == values:
+                continue
+            if old_values is not None:
+                self._remove(job_id, old_values)
+            self._add(job_id, values)
+            self._job_values[job_id] = values
+            self._ids[job_id] = str(job_id)
+            changed = True
+        if changed:
+            self._version += 1
+
+    def _match(self, term: str, candidates: Optional[Set[int]]) -> Set[int]:
+        if len(term) >= 3:
+            postings = sorted(
+                (self._postings.get(trigram, set()) for trigram in _trigrams(term)),
+                key=len,
+            )
+            values = set(postings[0])
+            for posting in postings[1:]:
+                values &= posting
+        else:
+            values = self._jobs.keys()
+        ids: Set[int] = set()
+        for value in values:
+            if term in value:
+                ids |= self._jobs[value]
+        if term.isdigit():
+            searched = self._ids.keys() if candidates is None else candidates
+            ids.update(job_id for job_id in searched if term in self._ids[job_id])
+        if candidates is not None:
+            ids &= candidates
+        return ids
+
+    def search(self, query: str) -> Optional[Set[int]]:
+        """Ids of the indexed jobs matching every term of ``query``, None for
+        an empty query."""
+        query = query.lower()
+        terms = query.split()
+        if not terms:
+            return None
+        candidates = None
+        if (
+            self._last_query is not None
+            and self._last_version == self._version
+            and query.startswith(self._last_query)
+        ):
+            # Typing more can only narrow the matches down
+            candidates = self._last_result
+        for term in terms:
+            candidates = self._match(term, candidates)
+            if not candidates:
+                break
+        self._last_query = query
+        self._last_version = self._version
+        self._last_result = candidates
+        return candidates
@@ -0,0 +1,326 @@
+"""State shared between the SlurmTUI instances running on the same host.
+
+Everything lives in a single directory (``SETTINGS.SHARED_STATE_DIR``, by default
+``/tmp/slurmtui``) created sticky and world-writable like ``/tmp`` itself.
+Coordination is done with ``flock`` on small lock files, so no daemon is needed:
+whichever instance takes the lock when the shared snapshot is stale becomes the
+fetcher for that round and publishes what it got for everyone else. The same
+directory holds the host-wide token bucket limiting Slurm calls per minute.
+
+Since anyone on the host can write into the directory, only files owned by the
+current user, root or a member of the trusted group (``SHARED_STATE_GROUP``)
+are read, never through a symlink, and snapshots dated in the future are
+ignored. Without a trusted group, the token bucket is kept per user.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, FrozenSet, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+    import grp
+    import pwd
+except ImportError:  # not available on Windows, sharing is disabled there
+    fcntl = grp = pwd = None
+
+
+@lru_cache(maxsize=None)
+def _group_id(group: Optional[str]) -> Optional[int]:
+    if not group or grp is None:
+        return None
+    try:
+        return grp.getgrnam(group).gr_gid
+    except KeyError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def trusted_uids(group: Optional[str] = None) -> FrozenSet[int]:
+    """Users whose shared files are trusted: the current one, root and the
+    members of ``group``."""
+    uids = {os.getuid(), 0}
+    gid = _group_id(group)
+    if gid is None:
+        return frozenset(uids)
+    members = set(grp.getgrgid(gid).gr_mem)
+    for user in pwd.getpwall():
+        if user.pw_gid == gid or user.pw_name in members:
+            uids.add(user.pw_uid)
+    return frozenset(uids)
+
+
+def _is_trusted(st: os.stat_result, group: Optional[str]) -> bool:
+    """Whether a shared file can be trusted: a regular file owned by a trusted
+    user, only writable by its owner or the trusted group."""
+    if not stat.S_ISREG(st.st_mode) or st.st_uid not in trusted_uids(group):
+        return False
+    if st.st_mode & stat.S_IWOTH:
+        return False
+    return not st.st_mode & stat.S_IWGRP or st.st_gid == _group_id(group)
+
+
+def ensure_shared_dir(path: str) -> str:
+    """Create the shared directory (mode 1777) if needed and return its path.
+
+    Raises ``PermissionError`` for an existing directory that is a symlink, is
+    owned by another user than root or the current one, or is writable by
+    others without the sticky bit.
+    """
+    path = os.path.expanduser(path)
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    else:
+        os.chmod(path, 0o1777)
+    st = os.lstat(path)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid not in (0, os.getuid())
+        or (
+            st.st_mode & (stat.S_IWOTH | stat.S_IWGRP) and not st.st_mode & stat.S_ISVTX
+        )
+    ):
+        raise PermissionError(f"Untrusted shared state directory {path}")
+    return path
+
+
+@contextmanager
+def file_lock(
+    path: str, exclusive: bool = True, group: Optional[str] = None
+) -> Iterator[bool]:
+    """Hold an ``flock`` on ``path`` for the duration of the block.
+
+    Yields ``False`` instead of raising when the lock cannot be taken (no
+    ``fcntl``, unreadable or untrusted lock file owned by someone else, ...),
+    so callers can carry on unsynchronised.
+    """
+    if fcntl is None:
+        yield False
+        return
+    try:
+        fd = os.open(
+            path, os.O_RDONLY | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o644
+        )
+    except OSError:
+        yield False
+        return
+    try:
+        try:
+            # Other users must be able to open the lock file too
+            if os.fstat(fd).st_uid == os.getuid():
+                os.fchmod(fd, 0o644)
+            trusted = _is_trusted(os.fstat(fd), group)
+        except OSError:
+            trusted = False
+        if not trusted:
+            # Whoever owns it could hold it forever
+            yield False
+            return
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def snapshot_key(cmd: List[str]) -> str:
+    """Stable file-name friendly key for a command line."""
+    digest = hashlib.sha1("\0".join(cmd).encode("utf-8")).hexdigest()[:16]
+    return f"{os.path.basename(cmd[0])}-{digest}"
+
+
+def _latest_snapshot(
+    directory: str, key: str, group: Optional[str] = None
+) -> Tuple[Optional[str], float]:
+    """Return the freshest trusted snapshot for ``key`` and its age in seconds.
+
+    Every user publishes into their own file (``<key>.<uid>.json``) because the
+    sticky directory does not let anyone replace a file they do not own.
+    """
+    now = time.time()
+    latest_path, latest_mtime = None, 0.0
+    for path in glob.glob(os.path.join(directory, f"{key}.*.json")):
+        try:
+            st = os.lstat(path)
+        except OSError:
+            continue
+        if not _is_trusted(st, group) or st.st_mtime > now:
+            continue
+        if st.st_mtime > latest_mtime:
+            latest_path, latest_mtime = path, st.st_mtime
+    if latest_path is None:
+        return None, float("inf")
+    return latest_path, now - latest_mtime
+
+
+def _read_snapshot(
+    path: str, group: Optional[str] = None
+) -> Tuple[Optional[bytes], float]:
+    """Contents of a snapshot and its mtime, checked again on the open file."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except OSError:
+        return None, 0.0
+    with os.fdopen(fd, "rb") as f:
+        st = os.fstat(fd)
+        if not _is_trusted(st, group) or st.st_mtime > time.time():
+            return None, 0.0
+        try:
+            return f.read(), st.st_mtime
+        except OSError:
+            return None, 0.0
+
+
+def _publish_snapshot(directory: str, key: str, data: bytes) -> None:
+    path = os.path.join(directory, f"{key}.{os.getuid()}.json")
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{key}.", suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _fresh_snapshot(
+    directory: str, key: str, max_age: float, group: Optional[str]
+) -> Tuple[Optional[bytes], float]:
+    path, age = _latest_snapshot(directory, key, group)
+    if path is None or age >= max_age:
+        return None, 0.0
+    data, published_at = _read_snapshot(path, group)
+    if not data or time.time() - published_at >= max_age:
+        return None, 0.0
+    return data, published_at
+
+
+def fetch_shared(
+    cmd: List[str],
+    directory: str,
+    max_age: float,
+    fetch: Callable[[], bytes],
+    group: Optional[str] = None,
+) -> Tuple[bytes, float]:
+    """Return the output of ``cmd`` and when it was fetched, reusing a snapshot
+    published by a trusted instance on this host when it is younger than
+    ``max_age`` seconds. A reused snapshot is dated by its publish time.
+
+    Otherwise ``fetch`` is called under the host-wide lock for this command and
+    its output is published. Exceptions raised by ``fetch`` propagate.
+    """
+    if fcntl is None:
+        return fetch(), time.time()
+    try:
+        directory = ensure_shared_dir(directory)
+    except OSError:
+        return fetch(), time.time()
+
+    key = snapshot_key(cmd)
+
+    # Fast path: published snapshots are replaced atomically, no lock needed
+    data, published_at = _fresh_snapshot(directory, key, max_age, group)
+    if data:
+        return data, published_at
+
+    with file_lock(os.path.join(directory, f"{key}.lock"), group=group):
+        # Another instance may have refreshed it while we were waiting
+        data, published_at = _fresh_snapshot(directory, key, max_age, group)
+        if data:
+            return data, published_at
+
+        fetched_at = time.time()
+        data = fetch()
+        _publish_snapshot(directory, key, data)
+        return data, fetched_at
+
+
+def _open_bucket(directory: str, group: Optional[str]) -> Optional[int]:
+    """Descriptor of the token bucket state: shared with the trusted group when
+    there is one, otherwise (or when the shared file is not trusted) private
+    to the current user."""
+    flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0)
+    gid = _group_id(group)
+    candidates = []
+    if gid is not None:
+        candidates.append((f"ratelimit.{group}.state", 0o660, gid))
+    candidates.append((f"ratelimit.{os.getuid()}.state", 0o600, None))
+    for name, mode, owner_gid in candidates:
+        try:
+            fd = os.open(os.path.join(directory, name), flags, mode)
+        except OSError:
+            continue
+        try:
+            st = os.fstat(fd)
+            if st.st_uid == os.getuid():
+                if owner_gid is not None and st.st_gid != owner_gid:
+                    os.fchown(fd, -1, owner_gid)
+                os.fchmod(fd, mode)
+                st = os.fstat(fd)
+            if _is_trusted(st, group):
+                return fd
+        except OSError:
+            pass
+        os.close(fd)
+    return None
+
+
+def take_token(
+    directory: str, calls_per_minute: int, group: Optional[str] = None
+) -> bool:
+    """Take one token from the host-wide token bucket.
+
+    The bucket holds at most ``calls_per_minute`` tokens and refills at that
+    rate. Its state is kept in a small file shared by the members of the
+    trusted ``group``, so all their SlurmTUI processes on the host draw from
+    the same budget; without a group each user has their own. Returns ``True``
+    when a token was available (or when the bucket cannot be used at all).
+    """
+    if fcntl is None or calls_per_minute <= 0:
+        return True
+    try:
+        directory = ensure_shared_dir(directory)
+    except OSError:
+        return True
+    fd = _open_bucket(directory, group)
+    if fd is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        now = time.time()
+        capacity = float(calls_per_minute)
+        try:
+            state = json.loads(os.pread(fd, 256, 0))
+            tokens, updated = float(state["tokens"]), float(state["updated"])
+        except (ValueError, KeyError, TypeError):
+            tokens, updated = capacity, now
+        tokens = min(capacity, tokens + max(0.0, now - updated) * capacity / 60)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        data = json.dumps({"tokens": round(tokens, 4), "updated": now}).encode()
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, data, 0)
+        return allowed
+    except OSError:
+        return True
+    finally:
+        # closing the descriptor also releases the flock
+        os.close(fd)
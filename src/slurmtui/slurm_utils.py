@@ -4,16 +4,35 @@ import os
 import re
 import subprocess
 import sys
+import time
 from ast import literal_eval
+from dataclasses import dataclass, field
+from enum import Enum
 from functools import lru_cache
-from typing import Any, Dict, List, Tuple
-
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from rich.cells import cell_len
+
+from .controller_load import controller_monitor
+from .decoding import loads, loads_jobs
+from .hostlist import Hostlist, parse_hostlist
+from .metrics import export_call, metrics
+from .schemas import (
+    JobSnapshot,
+    SqueueFields,
+    data_parser_version,
+    sacct_fields,
+    sacct_fields_of,
+    squeue_fields,
+    squeue_fields_of,
+)
+from .shared_state import fetch_shared, take_token
 from .utils import SETTINGS, console
 
 
 def get_fake_squeue(debug_squeue_json_path: str = None):
     if debug_squeue_json_path:
-        with open(debug_squeue_json_path, "r") as f:
+        with open(debug_squeue_json_path, "rb") as f:
             return f.read()
     else:
         return json.dumps({"jobs": []})
@@ -21,7 +40,7 @@ def get_fake_squeue(debug_squeue_json_path: str = None):
 
 def get_fake_sacct(debug_sacct_json_path: str = None):
     if debug_sacct_json_path:
-        with open(debug_sacct_json_path, "r") as f:
+        with open(debug_sacct_json_path, "rb") as f:
             return f.read()
     else:
         return json.dumps({"jobs": []})
@@ -29,12 +48,20 @@ def get_fake_sacct(debug_sacct_json_path: str = None):
 
 def get_fake_sinfo(debug_sinfo_json_path: str = None):
     if debug_sinfo_json_path:
-        with open(debug_sinfo_json_path, "r") as f:
+        with open(debug_sinfo_json_path, "rb") as f:
             return f.read()
     else:
         return json.dumps({"sinfo": []})
 
 
+def get_fake_nodes(debug_nodes_json_path: str = None):
+    if debug_nodes_json_path:
+        with open(debug_nodes_json_path, "rb") as f:
+            return f.read()
+    else:
+        return json.dumps({"nodes": []})
+
+
 def get_time(time_field) -> str:
     if isinstance(time_field, int):
         return time_field
@@ -46,7 +73,7 @@ def get_time(time_field) -> str:
 
 @lru_cache
 def get_fake_latest_time(settings: SETTINGS):
-    all_jobs = json.loads(get_fake_squeue(settings.DEBUG_SQUEUE_JSON_PATH))["jobs"]
+    all_jobs = loads(get_fake_squeue(settings.DEBUG_SQUEUE_JSON_PATH))["jobs"]
     latest_job = sorted(all_jobs, key=lambda k: get_time(k["submit_time"]))[-1]
     latest_time = get_time(latest_job["submit_time"])
     return latest_time
@@ -73,100 +100,679 @@ class CommandNotFoundError(Exception):
         self.message = message
 
 
-def get_running_jobs(
-    settings: SETTINGS,
-    no_jobs_msg: str = "[yellow]No Jobs are running![/yellow]",
-) -> Dict[int, Dict]:
+class SlurmCommandError(Exception):
+    """Returned when a Slurm command failed, timed out or produced invalid output.
+
+    Views keep showing their previous snapshot (marked as stale) when they get
+    one of these instead of a fresh result.
+    """
+
+    def __init__(self, message="Slurm command failed."):
+        super().__init__()
+        self.message = message
+
+
+class SlurmThrottled(Exception):
+    """Raised when the host-wide rate limit refuses a Slurm call."""
+
+
+# Last successful result of each fetch, served while the rate limiter throttles
+_last_results: Dict[Tuple, Any] = {}
+
+# Set in a parse worker process (see ``offload``): finished calls are collected
+# here and recorded by the parent process instead
+deferred_calls: Optional[List[Dict]] = None
+
+
+def record_call(event: Dict, settings: SETTINGS) -> None:
+    """Count a finished Slurm call in the metrics and the controller load."""
+    metrics.record(
+        event["command"],
+        event["duration"],
+        event["status"],
+        event["bytes"],
+        event["records"],
+    )
+    controller_monitor.observe_call(event["command"], event["duration"], settings)
+    if settings.METRICS_JSONL_PATH or settings.METRICS_PROMETHEUS_PATH:
+        export_call(
+            settings.METRICS_JSONL_PATH,
+            settings.METRICS_PROMETHEUS_PATH,
+            get_user(),
+            dict(event, duration=round(event["duration"], 4)),
+        )
+
+
+class SlurmCall:
+    """A single Slurm command invocation, timed and recorded in the metrics.
+
+    ``run`` executes the command; ``record`` must be called once the output has
+    been parsed so the number of returned records can be counted. Calls that
+    were never executed (e.g. served from a shared snapshot) are not recorded.
+
+    Every call takes a token from the host-wide rate limiter. When ``throttle``
+    is set and no token is left, ``run`` raises ``SlurmThrottled`` instead of
+    executing. Only set it when the caller has a previous result to fall back on.
+    """
+
+    def __init__(
+        self, cmd: List[str], settings: SETTINGS, throttle: bool = False
+    ) -> None:
+        self.cmd = cmd
+        self.settings = settings
+        self.throttle = throttle
+        self.command = os.path.basename(cmd[0])
+        self.executed = False
+        self.status = "0"
+        self.bytes_read = 0
+        self.duration = 0.0
+
+    def run(self) -> bytes:
+        if self.settings.MAX_SLURM_CALLS_PER_MINUTE > 0:
+            allowed = take_token(
+                self.settings.SHARED_STATE_DIR,
+                self.settings.MAX_SLURM_CALLS_PER_MINUTE,
+                self.settings.SHARED_STATE_GROUP,
+            )
+            if self.throttle and not allowed:
+                raise SlurmThrottled(f"`{self.command}` call throttled")
+        self.executed = True
+        start = time.monotonic()
+        try:
+            output = subprocess.check_output(
+                self.cmd,
+                stderr=subprocess.DEVNULL,
+                timeout=self.settings.COMMAND_TIMEOUT or None,
+            )
+        except subprocess.TimeoutExpired:
+            self.status = "timeout"
+            raise
+        except subprocess.CalledProcessError as e:
+            self.status = str(e.returncode)
+            raise
+        except FileNotFoundError:
+            self.status = "not_found"
+            raise
+        finally:
+            self.duration = time.monotonic() - start
+        self.bytes_read = len(output)
+        return output
+
+    def record(self, records: int = 0) -> None:
+        if not self.executed:
+            return
+        event = {
+            "time": round(time.time(), 3),
+            "user": get_user(),
+            "pid": os.getpid(),
+            "command": self.command,
+            "argv": self.cmd,
+            "status": self.status,
+            "duration": self.duration,
+            "bytes": self.bytes_read,
+            "records": records,
+        }
+        if deferred_calls is not None:
+            deferred_calls.append(event)
+            return
+        record_call(event, self.settings)
+
+    def error(self, exc: Exception) -> SlurmCommandError:
+        """Record the failed call and describe it as a ``SlurmCommandError``."""
+        self.record()
+        if isinstance(exc, subprocess.TimeoutExpired):
+            return SlurmCommandError(
+                f"`{self.command}` timed out after {exc.timeout:g}s"
+            )
+        if isinstance(exc, subprocess.CalledProcessError):
+            return SlurmCommandError(
+                f"`{self.command}` failed with exit code {exc.returncode}"
+            )
+        return SlurmCommandError(f"`{self.command}` returned invalid output")
+
+
+class JobQuery(NamedTuple):
+    """One squeue query of the job table, refreshed every ``interval`` seconds.
+
+    ``all_users`` queries the jobs of every user instead of only the current
+    user's; ``states`` restricts the query to jobs in one of those states.
+    """
+
+    name: str
+    all_users: bool
+    interval: int
+    states: Optional[Tuple[str, ...]] = None
+
+    def covers(self, job: Dict, fields: SqueueFields) -> bool:
+        """Whether squeue would report ``job`` for this query."""
+        if not self.all_users and job.get("user_name") != get_user():
+            return False
+        if self.states is None:
+            return True
+        return any(state in self.states for state in fields.states(job))
+
+
+# States of the two halves of the queue when pending jobs are polled apart
+ACTIVE_STATES = ("RUNNING", "COMPLETING", "CONFIGURING", "SUSPENDED")
+PENDING_STATES = ("PENDING",)
+
+
+def job_queries(settings: SETTINGS) -> List[JobQuery]:
+    """Queries the main job table is built from, the cheapest first.
+
+    The current user's jobs are always polled every ``UPDATE_INTERVAL``; with
+    ``CHECK_ALL_JOBS`` the whole queue is polled less often on top of that.
+    With ``PENDING_UPDATE_INTERVAL`` set, each of them is split into its
+    running and pending jobs, and the pending ones are polled at most that
+    often.
+    """
+    tiers = [("own", False, settings.UPDATE_INTERVAL)]
+    if settings.CHECK_ALL_JOBS:
+        tiers.append(("all", True, settings.ALL_JOBS_UPDATE_INTERVAL))
+    if not settings.PENDING_UPDATE_INTERVAL:
+        return [JobQuery(*tier) for tier in tiers]
+    queries = []
+    for name, all_users, interval in tiers:
+        queries.append(JobQuery(f"{name} running", all_users, interval, ACTIVE_STATES))
+        queries.append(
+            JobQuery(
+                f"{name} pending",
+                all_users,
+                max(interval, settings.PENDING_UPDATE_INTERVAL),
+                PENDING_STATES,
+            )
+        )
+    return queries
+
+
+def _squeue_command(settings: SETTINGS, query: JobQuery) -> List[str]:
+    if query.all_users:
+        cmd = ["squeue", "--json"]
+    else:
+        cmd = ["squeue", "-u", get_user(), "--json"]
+    if query.states:
+        cmd.append("--states=" + ",".join(query.states))
+    if settings.SQUEUE_ARGS:
+        cmd.extend(settings.SQUEUE_ARGS)
+    return cmd
+
+
+def fetch_running_jobs(settings: SETTINGS, query: Optional[JobQuery] = None):
+    """Decoded squeue jobs for ``query``, in squeue's order and filtered by
+    ``ACCOUNTS``, as ``(fields, jobs, fetched_at)``.
+
+    A throttled call returns the cached ``JobSnapshot`` of the command
+    instead, a failed one its ``SlurmCommandError`` or
+    ``CommandNotFoundError``.
+    """
+    if query is None:
+        query = JobQuery("", settings.CHECK_ALL_JOBS, settings.UPDATE_INTERVAL)
+    call = None
+    fetched_at = time.time()
     if settings.MOCK:
         running_jobs = get_fake_squeue(settings.DEBUG_SQUEUE_JSON_PATH)
     else:
+        cmd = _squeue_command(settings, query)
+        cache_key = tuple(cmd)
+        call = SlurmCall(cmd, settings, throttle=cache_key in _last_results)
         try:
-            if settings.CHECK_ALL_JOBS:
-                cmd = ["squeue", "--json"]
-                if settings.SQUEUE_ARGS:
-                    cmd.extend(settings.SQUEUE_ARGS)
-                running_jobs = subprocess.check_output(
-                    cmd, stderr=subprocess.DEVNULL
-                ).decode("utf-8")
-            else:
-                cmd = ["squeue", "-u", get_user(), "--json"]
-                if settings.SQUEUE_ARGS:
-                    cmd.extend(settings.SQUEUE_ARGS)
-                running_jobs = subprocess.check_output(
+            if settings.SHARED_FETCH and query.all_users:
+                # Whole-cluster snapshots are identical for everyone on the host
+                raw, fetched_at = fetch_shared(
                     cmd,
-                    stderr=subprocess.DEVNULL,
-                ).decode("utf-8")
-        except subprocess.CalledProcessError as e:
-            console.print(no_jobs_msg)
-            return None
+                    settings.SHARED_STATE_DIR,
+                    query.interval,
+                    call.run,
+                    settings.SHARED_STATE_GROUP,
+                )
+            else:
+                raw = call.run()
+            running_jobs = raw
+        except SlurmThrottled:
+            return _last_results[cache_key]
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            return call.error(e)
         except FileNotFoundError as e:
+            call.record()
             console.print(
                 "squeue command not found. Please make sure Slurm is installed and configured correctly."
             )
             return CommandNotFoundError("`squeue` command not found")
 
-    squeue_load = json.loads(running_jobs)
+    try:
+        squeue_load = loads_jobs(running_jobs, "squeue", settings.PROJECT_JOB_FIELDS)
+    except ValueError as e:
+        if call is None:
+            raise
+        return call.error(e)
+    if call is not None:
+        call.record(records=len(squeue_load["jobs"]))
+    fields = squeue_fields(data_parser_version(squeue_load))
 
+    running_jobs = squeue_load["jobs"]
     if settings.ACCOUNTS:
-        squeue_load["jobs"] = [
-            job for job in squeue_load["jobs"] if job["account"] in settings.ACCOUNTS
+        running_jobs = [
+            job for job in running_jobs if job["account"] in settings.ACCOUNTS
         ]
-    running_jobs = squeue_load["jobs"]
+    if settings.MOCK and query.states:
+        # Mock data keeps every user's jobs, but is split by state like squeue
+        running_jobs = [
+            job
+            for job in running_jobs
+            if any(state in query.states for state in fields.states(job))
+        ]
+    return fields, running_jobs, fetched_at
+
+
+def get_running_jobs(
+    settings: SETTINGS, query: Optional[JobQuery] = None
+) -> Dict[int, Dict]:
+    """squeue snapshot for ``query``, by default the jobs selected by
+    ``CHECK_ALL_JOBS``."""
+    if query is None:
+        query = JobQuery("", settings.CHECK_ALL_JOBS, settings.UPDATE_INTERVAL)
+    result = fetch_running_jobs(settings, query)
+    if not isinstance(result, tuple):
+        return result
+    fields, running_jobs, fetched_at = result
     # sort by job id
     running_jobs = sorted(running_jobs, key=lambda k: k["job_id"])
-    running_jobs_dict = {item["job_id"]: item for item in running_jobs}
+    running_jobs_dict = JobSnapshot(
+        fields, ((item["job_id"], item) for item in running_jobs)
+    )
+    running_jobs_dict.fetched_at = fetched_at
+    if not settings.MOCK:
+        _last_results[tuple(_squeue_command(settings, query))] = running_jobs_dict
     return running_jobs_dict
 
 
-def get_old_jobs(
+class SnapshotMerger:
+    """Combines the snapshots of several ``JobQuery`` into one job table.
+
+    Snapshots are applied from the oldest to the most recent. Each one
+    replaces the jobs its query covers, so a job seen by several queries
+    shows the row of the freshest one, and a job that left the queue
+    disappears as soon as any query covering it is refreshed.
+    """
+
+    def __init__(self) -> None:
+        self._parts: Dict[str, Tuple[JobQuery, JobSnapshot, float]] = {}
+
+    def update(
+        self,
+        query: JobQuery,
+        snapshot: JobSnapshot,
+        refreshed_at: Optional[float] = None,
+    ) -> None:
+        if refreshed_at is None:
+            # A shared snapshot is as old as its publish time, not its arrival
+            refreshed_at = getattr(snapshot, "fetched_at", None) or time.time()
+        self._parts[query.name] = (query, snapshot, refreshed_at)
+
+    def refreshed_at(self, name: str) -> Optional[float]:
+        """When the snapshot of the query ``name`` was fetched, if it was."""
+        part = self._parts.get(name)
+        return part[2] if part is not None else None
+
+    def freshness(self, queries: List[JobQuery]) -> str:
+        """When the snapshot of each of ``queries`` was last refreshed, e.g.
+        ``own running 5 secs ago, own pending 1.2 mins ago``."""
+        now = time.time()
+        ages = []
+        for query in queries:
+            refreshed_at = self.refreshed_at(query.name)
+            if refreshed_at is None:
+                ages.append(f"{query.name} loading")
+                continue
+            age = datetime.timedelta(seconds=max(0.0, now - refreshed_at))
+            ages.append(f"{query.name} {format_time_string(age) or '0 secs'} ago")
+        return ", ".join(ages)
+
+    def retain(self, queries: List[JobQuery]) -> None:
+        """Forget the snapshots of queries that are no longer polled."""
+        names = {query.name for query in queries}
+        for name in list(self._parts):
+            if name not in names:
+                del self._parts[name]
+
+    def merged(self) -> Optional[JobSnapshot]:
+        """The combined snapshot sorted by job id, None before any update."""
+        if not self._parts:
+            return None
+        parts = sorted(self._parts.values(), key=lambda part: part[2])
+        if len(parts) == 1:
+            return parts[0][1]
+        jobs: Dict[int, Dict] = {}
+        for query, snapshot, _ in parts:
+            fields = squeue_fields_of(snapshot)
+            if query.all_users and query.states is None:
+                jobs.clear()
+            else:
+                for job_id in [
+                    job_id for job_id, job in jobs.items() if query.covers(job, fields)
+                ]:
+                    del jobs[job_id]
+            jobs.update(snapshot)
+        return JobSnapshot(squeue_fields_of(parts[-1][1]), sorted(jobs.items()))
+
+
+class JobEventKind(Enum):
+    SUBMITTED = "submitted"
+    STARTED = "started"
+    STATE_CHANGED = "state_changed"
+    NODES_CHANGED = "nodes_changed"
+    END_TIME_CHANGED = "end_time_changed"
+    FINISHED = "finished"
+    VANISHED = "vanished"
+
+
+class JobEvent(NamedTuple):
+    """One change of a job between two squeue snapshots.
+
+    ``job`` is the new row, or the last one seen for a job that vanished.
+    ``old`` and ``new`` are the values that changed (states, nodes or end
+    time). A job that appears only has ``new`` states, one that vanished
+    only ``old`` ones.
+    """
+
+    kind: JobEventKind
+    job_id: int
+    job: Dict
+    old: Any = None
+    new: Any = None
+
+
+# States in which squeue still lists a job for a while after it ended
+FINISHED_STATES = frozenset(
+    (
+        "BOOT_FAIL",
+        "CANCELLED",
+        "COMPLETED",
+        "DEADLINE",
+        "FAILED",
+        "NODE_FAIL",
+        "OUT_OF_MEMORY",
+        "PREEMPTED",
+        "TIMEOUT",
+    )
+)
+
+
+def _is_finished(states: Tuple[str, ...]) -> bool:
+    return any(state in FINISHED_STATES for state in states)
+
+
+def diff_snapshots(
+    old: Optional[Dict[int, Dict]], new: Optional[Dict[int, Dict]]
+) -> List[JobEvent]:
+    """Lifecycle events between two snapshots of the queue, by job id.
+
+    Each job is looked up once in the other snapshot, so this is linear in
+    their sizes. A first snapshot (``old`` is None) is a baseline and gives
+    no events. A job that changes state gives one of STARTED, FINISHED or
+    STATE_CHANGED; node and end time changes are only reported for jobs that
+    neither started nor finished, and end times only outside of PENDING,
+    where they are estimates that move on every scheduling pass. Jobs that
+    leave the queue give VANISHED, unless they were already seen finished.
+    """
+    if old is None or new is None:
+        return []
+    old_fields = squeue_fields_of(old)
+    new_fields = squeue_fields_of(new)
+    events: List[JobEvent] = []
+    for job_id, job in new.items():
+        states = new_fields.states(job)
+        previous = old.get(job_id)
+        if previous is None:
+            events.append(JobEvent(JobEventKind.SUBMITTED, job_id, job, None, states))
+            if "RUNNING" in states:
+                events.append(JobEvent(JobEventKind.STARTED, job_id, job, None, states))
+            elif _is_finished(states):
+                events.append(
+                    JobEvent(JobEventKind.FINISHED, job_id, job, None, states)
+                )
+            continue
+
+        old_states = old_fields.states(previous)
+        if states != old_states:
+            if "RUNNING" in states and "RUNNING" not in old_states:
+                kind = JobEventKind.STARTED
+            elif _is_finished(states) and not _is_finished(old_states):
+                kind = JobEventKind.FINISHED
+            else:
+                kind = JobEventKind.STATE_CHANGED
+            events.append(JobEvent(kind, job_id, job, old_states, states))
+            if kind is not JobEventKind.STATE_CHANGED:
+                continue
+
+        if job.get("nodes") != previous.get("nodes"):
+            events.append(
+                JobEvent(
+                    JobEventKind.NODES_CHANGED,
+                    job_id,
+                    job,
+                    previous.get("nodes"),
+                    job.get("nodes"),
+                )
+            )
+        if "PENDING" not in states and "PENDING" not in old_states:
+            end_time = new_fields.end_time(job)
+            old_end_time = old_fields.end_time(previous)
+            if end_time != old_end_time:
+                events.append(
+                    JobEvent(
+                        JobEventKind.END_TIME_CHANGED,
+                        job_id,
+                        job,
+                        old_end_time,
+                        end_time,
+                    )
+                )
+
+    for job_id, previous in old.items():
+        if job_id in new:
+            continue
+        old_states = old_fields.states(previous)
+        if not _is_finished(old_states):
+            events.append(JobEvent(JobEventKind.VANISHED, job_id, previous, old_states))
+    return events
+
+
+def _sacct_command(
     settings: SETTINGS,
     start_time: datetime.datetime = None,
     end_time: datetime.datetime = None,
-    no_jobs_msg: str = "[yellow]No Jobs are running![/yellow]",
-) -> Dict[int, Dict]:
+) -> List[str]:
+    start_time = start_time or settings.OLD_JOBS_START_TIME or "now-7days"
+    end_time = end_time or settings.OLD_JOBS_END_TIME or "now"
+
+    cmd = [
+        "sacct",
+        "--json",
+        "--starttime",
+        start_time,
+        "--endtime",
+        end_time,
+    ]
+    if settings.SQUEUE_ARGS:
+        cmd.extend(settings.SQUEUE_ARGS)
+    return cmd
+
+
+def fetch_old_jobs(
+    settings: SETTINGS,
+    start_time: datetime.datetime = None,
+    end_time: datetime.datetime = None,
+):
+    """Decoded sacct jobs, in sacct's order and filtered by ``ACCOUNTS``, as
+    ``(fields, jobs)``. Throttled and failed calls return like
+    ``fetch_running_jobs``."""
+    call = None
     if settings.MOCK:
         old_jobs = get_fake_sacct(settings.DEBUG_SACCT_JSON_PATH)
     else:
+        cmd = _sacct_command(settings, start_time, end_time)
+        cache_key = tuple(cmd)
+        call = SlurmCall(cmd, settings, throttle=cache_key in _last_results)
         try:
-            start_time = start_time or settings.OLD_JOB_START_TIME or "now-7days"
-            end_time = end_time or settings.OLD_JOB_END_TIME or "now"
-
-            cmd = [
-                "sacct",
-                "--json",
-                "--starttime",
-                start_time,
-                "--endtime",
-                end_time,
-            ]
-            if settings.SQUEUE_ARGS:
-                cmd.extend(settings.SQUEUE_ARGS)
-            old_jobs = subprocess.check_output(
-                cmd,
-                stderr=subprocess.DEVNULL,
-            ).decode("utf-8")
-        except subprocess.CalledProcessError as e:
-            console.print(no_jobs_msg)
-            return None
+            old_jobs = call.run()
+        except SlurmThrottled:
+            return _last_results[cache_key]
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            return call.error(e)
         except FileNotFoundError as e:
+            call.record()
             console.print(
                 "sacct command not found. Please make sure Slurm is installed and configured correctly."
             )
             return CommandNotFoundError("`sacct` command not found")
 
-    sacct_load = json.loads(old_jobs)
-    if settings.ACCOUNTS:
-        sacct_load["jobs"] = [
-            job for job in sacct_load["jobs"] if job["account"] in settings.ACCOUNTS
-        ]
+    try:
+        sacct_load = loads_jobs(old_jobs, "sacct", settings.PROJECT_JOB_FIELDS)
+    except ValueError as e:
+        if call is None:
+            raise
+        return call.error(e)
+    if call is not None:
+        call.record(records=len(sacct_load["jobs"]))
     old_jobs = sacct_load["jobs"]
+    if settings.ACCOUNTS:
+        old_jobs = [job for job in old_jobs if job["account"] in settings.ACCOUNTS]
+    return sacct_fields(data_parser_version(sacct_load)), old_jobs
+
+
+def get_old_jobs(
+    settings: SETTINGS,
+    start_time: datetime.datetime = None,
+    end_time: datetime.datetime = None,
+) -> Dict[int, Dict]:
+    result = fetch_old_jobs(settings, start_time, end_time)
+    if not isinstance(result, tuple):
+        return result
+    fields, old_jobs = result
     # sort inversely by job id
     old_jobs = sorted(old_jobs, key=lambda k: k["job_id"], reverse=True)
 
-    old_jobs = {item["job_id"]: item for item in old_jobs}
+    old_jobs = JobSnapshot(fields, ((item["job_id"], item) for item in old_jobs))
+    if not settings.MOCK:
+        _last_results[tuple(_sacct_command(settings, start_time, end_time))] = old_jobs
     return old_jobs
 
 
+# sdiag text output labels, used when `sdiag --json` is not supported
+_SDIAG_TEXT_FIELDS = {
+    "server_thread_count": "Server thread count",
+    "agent_queue_size": "Agent queue size",
+}
+
+
+def get_controller_stats(settings: SETTINGS) -> Optional[Dict[str, int]]:
+    """Sample the slurmctld RPC load from sdiag. Returns None when unavailable."""
+    if settings.MOCK:
+        return None
+    for cmd in (["sdiag", "--json"], ["sdiag"]):
+        call = SlurmCall(cmd, settings, throttle=True)
+        try:
+            raw = call.run().decode("utf-8", errors="replace")
+        except SlurmThrottled:
+            return None
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            call.record()
+            return None
+        except subprocess.CalledProcessError:
+            call.record()
+            continue
+        call.record(records=1)
+
+        if "--json" in cmd:
+            try:
+                statistics = loads(raw).get("statistics", {})
+            except ValueError:
+                continue
+            return {
+                key: int(statistics[key])
+                for key in _SDIAG_TEXT_FIELDS
+                if isinstance(statistics.get(key), int)
+            }
+
+        stats = {}
+        for key, label in _SDIAG_TEXT_FIELDS.items():
+            match = re.search(rf"^\s*{label}:\s*(\d+)", raw, re.MULTILINE)
+            if match:
+                stats[key] = int(match.group(1))
+        return stats
+    return None
+
+
+def cancel_job(job_spec: str, settings: SETTINGS) -> bool:
+    """Cancel a job (``<job_id>`` or ``<array_job_id>_<task_id>``) with scancel."""
+    if settings.MOCK:
+        return True
+    call = SlurmCall(["scancel", str(job_spec)], settings)
+    try:
+        call.run()
+    except (
+        subprocess.CalledProcessError,
+        subprocess.TimeoutExpired,
+        FileNotFoundError,
+    ):
+        return False
+    finally:
+        call.record()
+    return True
+
+
+def get_job_details(
+    settings: SETTINGS, job_id: int, command: str = "squeue"
+) -> Optional[Dict]:
+    """Every field of one job, for the Info view when the fetched jobs only
+    hold the fields the tables use. Queued jobs (``command`` squeue) come from
+    ``scontrol show job``, old ones (sacct) from ``sacct -j``. None when the
+    job could not be fetched."""
+    if settings.MOCK:
+        if command == "sacct":
+            output = get_fake_sacct(settings.DEBUG_SACCT_JSON_PATH)
+        else:
+            output = get_fake_squeue(settings.DEBUG_SQUEUE_JSON_PATH)
+    else:
+        if command == "sacct":
+            cmd = ["sacct", "--json", "-j", str(job_id)]
+        else:
+            cmd = ["scontrol", "--json", "show", "job", str(job_id)]
+        call = SlurmCall(cmd, settings)
+        try:
+            output = call.run()
+        except (
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            FileNotFoundError,
+        ):
+            return None
+        finally:
+            call.record()
+    try:
+        jobs = loads(output).get("jobs") or []
+    except (ValueError, AttributeError):
+        return None
+    # scontrol lists every task of an array for the id of the array job
+    return next((job for job in jobs if job.get("job_id") == job_id), None)
+
+
+def stale_marker(last_success: Optional[float], error: SlurmCommandError) -> str:
+    """Describe how old the data on screen is after a failed refresh."""
+    if last_success is None:
+        return f"[{error.message}]"
+    age = datetime.timedelta(seconds=max(0.0, time.time() - last_success))
+    return f"[stale {format_time_string(age) or '0 secs'}: {error.message}]"
+
+
+def retry_backoff(failures: int, settings: SETTINGS) -> int:
+    """Exponential multiplier for the refresh interval after consecutive failures."""
+    if failures <= 0:
+        return 1
+    return min(2**failures, settings.BACKOFF_MAX_FACTOR)
+
+
 def get_rich_state(state: str):
     if "To be Deleted" in state:
         actual_state = get_rich_state(state.replace("(To be Deleted)", "").strip())
@@ -230,102 +836,188 @@ def format_time_string(time_delta: datetime.timedelta) -> str:
     return time_string
 
 
-def get_start_and_end_time_string(
-    submit_time, start_time, end_time, job_state, settings: SETTINGS
-) -> str:
-    submit_time = get_time(submit_time)
-    start_time = get_time(start_time)
-    end_time = get_time(end_time)
+@dataclass
+class JobTableStats:
+    """Everything a job table needs to know about a snapshot, gathered in one pass.
 
-    submit_time_string = ""
-    start_time_string = ""
-    end_time_string = ""
+    ``state_counts`` counts each job once per state it is in; ``max_widths``
+    holds the widest cell of the plain-text columns, by column label.
+    """
 
-    if submit_time:
-        # submit_time_string = str(datetime.datetime.fromtimestamp(submit_time))
-        submit_time_string = datetime.datetime.fromtimestamp(submit_time).strftime(
-            "%y-%m-%d %H:%M:%S"
-        )
-    if start_time:
-        start_time_string = datetime.datetime.fromtimestamp(start_time).strftime(
-            "%y-%m-%d %H:%M:%S"
-        )
-    if end_time:
-        end_time_string = datetime.datetime.fromtimestamp(end_time).strftime(
-            "%y-%m-%d %H:%M:%S"
-        )
+    total: int = 0
+    state_counts: Dict[str, int] = field(default_factory=dict)
+    has_arrays: bool = False
+    has_reasons: bool = False
+    users_vary: bool = False
+    max_widths: Dict[str, int] = field(default_factory=dict)
 
-    if not check_for_state(job_state, "PENDING") and end_time:
-        time_remaining = datetime.datetime.fromtimestamp(end_time) - get_datetime_now(
-            settings
-        )
-        # check if time remaining is positive
-        # TypeError: '>' not supported between instances of 'datetime.timedelta' and 'int'
-        if time_remaining.days >= 0:
-            formatted_time_remaining = format_time_string(time_remaining)
-            end_time_string += (
-                " (in " + formatted_time_remaining + ")"
-                if formatted_time_remaining
-                else " (Instant)"
-            )
+    def count(self, state: str) -> int:
+        return self.state_counts.get(state, 0)
 
-    if check_for_state(job_state, "PENDING"):
-        if start_time:
-            time_till_start = datetime.datetime.fromtimestamp(
-                start_time
-            ) - get_datetime_now(settings)
-            if time_till_start.days >= 0:
-                formatted_time_till_start = format_time_string(time_till_start)
-                start_time_string += (
-                    " (in " + formatted_time_till_start + ")"
-                    if formatted_time_till_start
-                    else " (Instant)"
-                )
-        elif submit_time:
-            time_since_submit = get_datetime_now(
-                settings
-            ) - datetime.datetime.fromtimestamp(submit_time)
-            if time_since_submit.days >= 0:
-                formatted_time_since_submit = format_time_string(time_since_submit)
-                submit_time_string += (
-                    (" (sub. " + formatted_time_since_submit + " ago)")
-                    if formatted_time_since_submit
-                    else " (just now)"
-                )
-                start_time_string = submit_time_string
-        else:
-            pass
 
-    return start_time_string, end_time_string
+def _count_states(state_counts: Dict[str, int], states: Tuple[str, ...]) -> None:
+    for state in states:
+        state_counts[state] = state_counts.get(state, 0) + 1
 
 
-def check_for_any_job_array(jobs_dict):
-    if not jobs_dict or jobs_dict is None:
-        return False
-    return any(
-        [
-            (job["array_job_id"]["set"] and job["array_job_id"]["number"] != 0)
-            or job["array_task_id"]["set"]
-            for job in jobs_dict.values()
-        ]
-    )
+def _widen(widths: Dict[str, int], column: str, value: Any, limit: int = 0) -> None:
+    width = cell_len(str(value))
+    if limit:
+        width = min(width, limit)
+    if width > widths.get(column, 0):
+        widths[column] = width
 
 
-def check_for_any_old_job_array(jobs_dict):
-    if not jobs_dict or jobs_dict is None:
-        return False
-    return any(
-        [
-            (job["array"]["task_id"]["set"] and job["array"]["task_id"]["number"] != 0)
-            for job in jobs_dict.values()
-        ]
-    )
+def compute_job_stats(jobs_dict: Optional[Dict[int, Dict]]) -> JobTableStats:
+    """Single pass over a squeue snapshot for the live job table."""
+    stats = JobTableStats(total=len(jobs_dict or ()))
+    if not jobs_dict:
+        return stats
+    fields = squeue_fields_of(jobs_dict)
+    widths = stats.max_widths
+    first_user = None
+    for job in jobs_dict.values():
+        _count_states(stats.state_counts, fields.states(job))
+        if not stats.has_arrays and (
+            fields.array_job_id(job) is not None
+            or fields.array_task_id(job) is not None
+        ):
+            stats.has_arrays = True
+        if not stats.has_reasons and job["state_reason"] != "None":
+            stats.has_reasons = True
+        user = job.get("user_name", "")
+        if first_user is None:
+            first_user = user
+        elif user != first_user:
+            stats.users_vary = True
+        _widen(widths, "Name", job["name"], 50)
+        _widen(widths, "Partition", job["partition"])
+        _widen(widths, "Account", job["account"])
+        _widen(widths, "User", user)
+    return stats
+
+
+def compute_old_job_stats(jobs_dict: Optional[Dict[int, Dict]]) -> JobTableStats:
+    """Single pass over a sacct snapshot for the old jobs table."""
+    stats = JobTableStats(total=len(jobs_dict or ()))
+    if not jobs_dict:
+        return stats
+    fields = sacct_fields_of(jobs_dict)
+    widths = stats.max_widths
+    for job in jobs_dict.values():
+        _count_states(stats.state_counts, fields.states(job))
+        if not stats.has_arrays and fields.array_task_id(job):
+            stats.has_arrays = True
+        _widen(widths, "Name", job["name"], 50)
+        _widen(widths, "Partition", job["partition"])
+        _widen(widths, "Account", job["account"])
+    return stats
 
 
-def check_for_job_state_reason(jobs_dict):
-    if not jobs_dict or jobs_dict is None:
-        return False
-    return any([job["state_reason"] != "None" for job in jobs_dict.values()])
+ARRAY_ROW_PREFIX = "array:"
+
+
+def array_row_key(array_job_id: int) -> str:
+    """Row key of the collapsed summary row of an array job."""
+    return f"{ARRAY_ROW_PREFIX}{array_job_id}"
+
+
+def _task_ranges(job: Dict, fields: SqueueFields) -> List[Tuple[int, int]]:
+    """Task id ranges covered by one squeue entry.
+
+    Pending tasks are often reported as a single entry whose ``array_task_string``
+    holds the compressed range (e.g. ``5-9999%10``).
+    """
+    task_string = job.get("array_task_string") or ""
+    if task_string:
+        ranges = []
+        for part in task_string.split("%")[0].split(","):
+            part = part.split(":")[0]
+            lo, _, hi = part.partition("-")
+            if lo.isdigit() and (not hi or hi.isdigit()):
+                ranges.append((int(lo), int(hi or lo)))
+        if ranges:
+            return ranges
+    task_id = fields.array_task_id(job)
+    if task_id is not None:
+        return [(task_id, task_id)]
+    return []
+
+
+def task_job_spec(job: Dict, fields: SqueueFields) -> Optional[str]:
+    """scancel spec of the tasks of one squeue array entry.
+
+    ``<array id>_<task id>`` for a single task, ``<array id>_[<tasks>]`` for
+    the pending remainder reported through ``array_task_string``. None when
+    the tasks are unknown or use a step (``1-99:2``), which scancel does not
+    take.
+    """
+    array_job_id = fields.array_job_id(job)
+    task_id = fields.array_task_id(job)
+    if task_id is not None:
+        return f"{array_job_id}_{task_id}"
+    task_string = (job.get("array_task_string") or "").split("%")[0]
+    if not task_string or ":" in task_string or not _task_ranges(job, fields):
+        return None
+    return f"{array_job_id}_[{task_string}]"
+
+
+def _format_ranges(ranges: List[Tuple[int, int]]) -> str:
+    merged: List[List[int]] = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return ",".join(str(lo) if lo == hi else f"{lo}-{hi}" for lo, hi in merged)
+
+
+def summarize_array_jobs(jobs_dict: Dict[int, Dict]) -> Dict[int, Dict]:
+    """One summary per array job that has several entries in ``jobs_dict``.
+
+    Each summary holds the job ids of its entries, the number of tasks per
+    state, the earliest and latest start time and the compressed range of task
+    ids, so the job table can show a single row until the array is expanded.
+    """
+    fields = squeue_fields_of(jobs_dict)
+    groups: Dict[int, List[Dict]] = {}
+    for job in jobs_dict.values():
+        array_job_id = fields.array_job_id(job)
+        if array_job_id is not None:
+            groups.setdefault(array_job_id, []).append(job)
+
+    summaries = {}
+    for array_job_id, jobs in groups.items():
+        if len(jobs) < 2:
+            continue
+        state_counts: Dict[str, int] = {}
+        ranges: List[Tuple[int, int]] = []
+        starts = []
+        for job in jobs:
+            job_ranges = _task_ranges(job, fields)
+            ranges.extend(job_ranges)
+            state = " ".join(fields.states(job))
+            tasks = sum(hi - lo + 1 for lo, hi in job_ranges) or 1
+            state_counts[state] = state_counts.get(state, 0) + tasks
+            start_time = fields.start_time(job)
+            if start_time:
+                starts.append(start_time)
+        first = jobs[0]
+        summaries[array_job_id] = {
+            "job_id": array_job_id,
+            "array_job_id": array_job_id,
+            "name": first["name"],
+            "partition": first["partition"],
+            "account": first["account"],
+            "user_name": first.get("user_name", ""),
+            "tasks": sum(state_counts.values()),
+            "task_ids": _format_ranges(ranges),
+            "state_counts": state_counts,
+            "min_start_time": min(starts) if starts else 0,
+            "max_start_time": max(starts) if starts else 0,
+            "job_ids": [job["job_id"] for job in jobs],
+        }
+    return summaries
 
 
 def get_job_resources(job_dict):
@@ -349,21 +1041,167 @@ def parse_gres_count(gres_str: str) -> Tuple[str, int]:
     return ("", 0)
 
 
+class JobTres(NamedTuple):
+    cpus: int
+    gpus: int
+    nodes: int
+
+
+@lru_cache(maxsize=4096)
+def parse_tres(tres: str) -> JobTres:
+    """Parse a TRES string like 'cpu=8,mem=64G,node=2,billing=8,gres/gpu=4'.
+
+    GPUs are taken from ``gres/gpu``, or summed over the typed
+    ``gres/gpu:<type>`` entries when Slurm only reports those.
+    """
+    cpus = nodes = 0
+    gpus = typed_gpus = None
+    for item in tres.split(","):
+        key, _, value = item.partition("=")
+        if not value.isdigit():
+            continue
+        if key == "cpu":
+            cpus = int(value)
+        elif key == "node":
+            nodes = int(value)
+        elif key == "gres/gpu":
+            gpus = int(value)
+        elif key.startswith("gres/gpu:"):
+            typed_gpus = (typed_gpus or 0) + int(value)
+    return JobTres(cpus, gpus if gpus is not None else typed_gpus or 0, nodes)
+
+
+def get_job_tres(job: Dict) -> JobTres:
+    """CPUs, GPUs and nodes of a squeue job: allocated once it runs, requested
+    while it is pending. Falls back to ``job_resources`` without TRES."""
+    tres = job.get("tres_alloc_str") or job.get("tres_req_str")
+    if tres:
+        return parse_tres(tres)
+    resources = get_job_resources(job)
+    # v0.0.41 reports "cpus" and a node dict, older versions "allocated_*"
+    cpus = get_time(resources.get("cpus", resources.get("allocated_cores")))
+    nodes = resources.get("nodes")
+    if isinstance(nodes, dict):
+        nodes = nodes.get("count")
+    else:
+        nodes = resources.get("allocated_hosts")
+    return JobTres(cpus or 0, 0, get_time(nodes) or 0)
+
+
+GROUP_BY = ("user", "account", "partition", "state")
+
+# Aggregates of a group: jobs, running, pending, allocated CPUs and GPUs
+# (jobs past PENDING), pending CPUs and GPUs
+GROUP_COLUMNS = (
+    "Jobs",
+    "Running",
+    "Pending",
+    "CPUs Alloc.",
+    "GPUs Alloc.",
+    "CPUs Pend.",
+    "GPUs Pend.",
+)
+
+
+class JobGroupIndex:
+    """Aggregates of a squeue snapshot grouped by user, account, partition or
+    state, kept across refreshes.
+
+    Like ``NodeJobIndex``, ``update`` compares the contribution of each job
+    with the one it made last time and only adjusts the groups of jobs that
+    appeared, disappeared or changed.
+    """
+
+    def __init__(self, by: str) -> None:
+        if by not in GROUP_BY:
+            raise ValueError(f"Cannot group jobs by {by!r}")
+        self.by = by
+        self.totals: Dict[str, List[int]] = {}
+        self.members: Dict[str, Set[int]] = {}
+        self._contributions: Dict[int, Tuple[str, Tuple[int, ...]]] = {}
+
+    def _key(self, job: Dict, fields: SqueueFields) -> str:
+        if self.by == "state":
+            return "+".join(fields.states(job))
+        return str(job.get("user_name" if self.by == "user" else self.by, ""))
+
+    @staticmethod
+    def _contribution(job: Dict, fields: SqueueFields) -> Tuple[int, ...]:
+        states = fields.states(job)
+        cpus, gpus, _ = get_job_tres(job)
+        if "PENDING" in states:
+            return (1, 0, 1, 0, 0, cpus, gpus)
+        return (1, int("RUNNING" in states), 0, cpus, gpus, 0, 0)
+
+    def _add(self, job_id: int, key: str, contribution: Tuple[int, ...]) -> None:
+        totals = self.totals.get(key)
+        if totals is None:
+            totals = self.totals[key] = [0] * len(contribution)
+            self.members[key] = set()
+        for i, value in enumerate(contribution):
+            totals[i] += value
+        self.members[key].add(job_id)
+        self._contributions[job_id] = (key, contribution)
+
+    def _remove(self, job_id: int) -> str:
+        key, contribution = self._contributions.pop(job_id)
+        totals = self.totals[key]
+        for i, value in enumerate(contribution):
+            totals[i] -= value
+        members = self.members[key]
+        members.discard(job_id)
+        if not members:
+            del self.totals[key]
+            del self.members[key]
+        return key
+
+    def update(self, jobs_dict: Optional[Dict[int, Dict]]) -> Set[str]:
+        """Bring the groups in line with a new snapshot, return the groups
+        that changed (including the ones that are gone)."""
+        jobs_dict = jobs_dict or {}
+        fields = squeue_fields_of(jobs_dict)
+        touched: Set[str] = set()
+        for job_id in self._contributions.keys() - jobs_dict.keys():
+            touched.add(self._remove(job_id))
+        for job_id, job in jobs_dict.items():
+            entry = (self._key(job, fields), self._contribution(job, fields))
+            previous = self._contributions.get(job_id)
+            if previous == entry:
+                continue
+            if previous is not None:
+                touched.add(self._remove(job_id))
+            self._add(job_id, *entry)
+            touched.add(entry[0])
+        return touched
+
+
 def get_resources(settings: SETTINGS) -> Dict[str, Dict]:
     """Get cluster resource information from sinfo --json, aggregated by partition."""
+    call = None
     if settings.MOCK:
         raw = get_fake_sinfo(settings.DEBUG_SINFO_JSON_PATH)
     else:
+        cmd = ["sinfo", "--json"]
+        cache_key = tuple(cmd)
+        call = SlurmCall(cmd, settings, throttle=cache_key in _last_results)
         try:
-            raw = subprocess.check_output(
-                ["sinfo", "--json"], stderr=subprocess.DEVNULL
-            ).decode("utf-8")
-        except subprocess.CalledProcessError:
-            return None
+            raw = call.run()
+        except SlurmThrottled:
+            return _last_results[cache_key]
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            return call.error(e)
         except FileNotFoundError:
+            call.record()
             return CommandNotFoundError("`sinfo` command not found")
 
-    data = json.loads(raw)
+    try:
+        data = loads(raw)
+    except ValueError as e:
+        if call is None:
+            raise
+        return call.error(e)
+    if call is not None:
+        call.record(records=len(data.get("sinfo", [])))
 
     partitions = {}
     for entry in data.get("sinfo", []):
@@ -419,6 +1257,10 @@ def get_resources(settings: SETTINGS) -> Dict[str, Dict]:
         if features_total and not p["features"]:
             p["features"] = features_total
 
+        if settings.PER_NODE_RESOURCES:
+            # The detail view reads exact numbers from get_nodes() instead
+            continue
+
         # Collect per-node-group details for the detail view
         memory = entry.get("memory", {})
         mem_total = memory.get("maximum", 0)
@@ -442,80 +1284,250 @@ def get_resources(settings: SETTINGS) -> Dict[str, Dict]:
                 }
             )
 
+    if call is not None:
+        _last_results[cache_key] = partitions
     return partitions
 
 
+class NodeInfo(NamedTuple):
+    node: str
+    state: str
+    cpus_total: int
+    cpus_allocated: int
+    mem_total_mb: int
+    mem_alloc_mb: int
+    gres: str
+    gres_used: str
+    features: str
+
+
+class NodeTable:
+    """Exact per-node resources from a single bulk node query.
+
+    Each node is stored once, keyed by name, even when it belongs to several
+    partitions; ``partitions`` only maps a partition to its node names. The
+    resources screens share one instance and ``replace`` its content in place.
+    """
+
+    def __init__(
+        self,
+        nodes: Optional[Dict[str, NodeInfo]] = None,
+        partitions: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        self.nodes: Dict[str, NodeInfo] = nodes or {}
+        self.partitions: Dict[str, List[str]] = partitions or {}
+
+    def replace(self, other: "NodeTable") -> None:
+        self.nodes = other.nodes
+        self.partitions = other.partitions
+
+    def partition_nodes(self, partition: str) -> List[NodeInfo]:
+        nodes = self.nodes
+        return [nodes[name] for name in self.partitions.get(partition, ())]
+
+    def get(self, node: str) -> Optional[NodeInfo]:
+        return self.nodes.get(node)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+def _join_field(value: Any) -> str:
+    """Slurm returns some node fields as lists in newer data_parser versions."""
+    if isinstance(value, list):
+        return ",".join(str(v) for v in value)
+    return str(value or "")
+
+
+def get_nodes(settings: SETTINGS) -> NodeTable:
+    """Get exact per-node resources for every node with one ``scontrol`` call."""
+    call = None
+    if settings.MOCK:
+        raw = get_fake_nodes(settings.DEBUG_NODES_JSON_PATH)
+    else:
+        cmd = ["scontrol", "--json", "show", "nodes"]
+        cache_key = tuple(cmd)
+        call = SlurmCall(cmd, settings, throttle=cache_key in _last_results)
+        try:
+            raw = call.run()
+        except SlurmThrottled:
+            return _last_results[cache_key]
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            return call.error(e)
+        except FileNotFoundError:
+            call.record()
+            return CommandNotFoundError("`scontrol` command not found")
+
+    try:
+        data = loads(raw)
+    except ValueError as e:
+        if call is None:
+            raise
+        return call.error(e)
+    if call is not None:
+        call.record(records=len(data.get("nodes", [])))
+
+    nodes: Dict[str, NodeInfo] = {}
+    partitions: Dict[str, List[str]] = {}
+    for entry in data.get("nodes", []):
+        name = entry.get("name", "")
+        if not name:
+            continue
+        state = entry.get("state", "")
+        state = ", ".join(state) if isinstance(state, list) else str(state).upper()
+        nodes[name] = NodeInfo(
+            node=name,
+            state=state,
+            cpus_total=get_time(entry.get("cpus", 0)),
+            cpus_allocated=get_time(entry.get("alloc_cpus", 0)),
+            mem_total_mb=get_time(entry.get("real_memory", 0)),
+            mem_alloc_mb=get_time(entry.get("alloc_memory", 0)),
+            gres=_join_field(entry.get("gres")),
+            gres_used=_join_field(entry.get("gres_used")),
+            features=_join_field(entry.get("features")),
+        )
+        for partition in entry.get("partitions", None) or []:
+            partitions.setdefault(partition, []).append(name)
+
+    table = NodeTable(nodes, partitions)
+    if call is not None:
+        _last_results[cache_key] = table
+    return table
+
+
 def expand_hostlist(hostlist: str) -> List[str]:
     """Expand a Slurm compressed hostlist like 'node[1-3,5]' into individual names.
 
     Handles formats: 'node1', 'node[1-3]', 'node[01-03,05]', 'r1i0n[0-35],r2i0n[0-35]',
-    and comma-separated bare names like 'node1,node2'.
+    and comma-separated bare names like 'node1,node2'. Use ``parse_hostlist``
+    directly when only the node count or a membership test is needed.
     """
-    if not hostlist or not hostlist.strip():
-        return []
+    return list(parse_hostlist(hostlist).expand())
 
-    results = []
-    # Tokenise: split on commas that are NOT inside brackets
-    depth = 0
-    current = []
-    for ch in hostlist:
-        if ch == "[":
-            depth += 1
-            current.append(ch)
-        elif ch == "]":
-            depth -= 1
-            current.append(ch)
-        elif ch == "," and depth == 0:
-            results.append("".join(current))
-            current = []
-        else:
-            current.append(ch)
-    if current:
-        results.append("".join(current))
-
-    expanded = []
-    for token in results:
-        m = re.match(r"^(.*?)\[([^\]]+)\](.*)$", token)
-        if not m:
-            expanded.append(token)
-            continue
-        prefix, range_spec, suffix = m.group(1), m.group(2), m.group(3)
-        for part in range_spec.split(","):
-            if "-" in part:
-                lo, hi = part.split("-", 1)
-                width = len(lo)
-                for i in range(int(lo), int(hi) + 1):
-                    expanded.append(f"{prefix}{str(i).zfill(width)}{suffix}")
-            else:
-                expanded.append(f"{prefix}{part}{suffix}")
 
-    return expanded
+class NodeJobIndex:
+    """Mapping from node name to the jobs running on it, kept across refreshes.
 
+    ``update`` compares each job with what was indexed last time and only
+    touches the nodes of jobs that started, ended or changed, instead of
+    rebuilding the whole mapping. Besides the node -> jobs lookup (``get``,
+    compatible with the plain dict it replaces) it keeps the reverse job ->
+    nodes mapping and per-node aggregates.
+    """
 
-def build_node_to_jobs(jobs_dict: Dict[int, Dict]) -> Dict[str, List[Dict]]:
-    """Build a mapping from node name to list of jobs running on it."""
-    node_to_jobs: Dict[str, List[Dict]] = {}
-    if not jobs_dict:
-        return node_to_jobs
-    for job in jobs_dict.values():
+    def __init__(self) -> None:
+        self._node_jobs: Dict[str, Dict[int, Dict]] = {}
+        self._node_users: Dict[str, Dict[str, int]] = {}
+        self._job_nodes: Dict[int, Hostlist] = {}
+        self._job_signatures: Dict[int, Tuple] = {}
+
+    @staticmethod
+    def _signature(job: Dict, fields: SqueueFields) -> Tuple:
+        return (
+            str(job.get("nodes", "")),
+            fields.states(job),
+            job.get("user_name", ""),
+            job.get("name", ""),
+            job.get("partition", ""),
+        )
+
+    def update(self, jobs_dict: Optional[Dict[int, Dict]]) -> Set[str]:
+        """Bring the index in line with a new snapshot, return the nodes that changed."""
+        jobs_dict = jobs_dict or {}
+        fields = squeue_fields_of(jobs_dict)
+        added, removed, changed = set(), set(), set()
+        for job_id in self._job_signatures.keys() - jobs_dict.keys():
+            removed.add(job_id)
+        for job_id, job in jobs_dict.items():
+            previous = self._job_signatures.get(job_id)
+            if previous is None:
+                added.add(job_id)
+            elif previous != self._signature(job, fields):
+                changed.add(job_id)
+        return self.apply(jobs_dict, added, removed, changed)
+
+    def apply(
+        self,
+        jobs_dict: Dict[int, Dict],
+        added: Set[int],
+        removed: Set[int],
+        changed: Set[int],
+    ) -> Set[str]:
+        """Re-index only the given job ids, return the nodes that changed."""
+        fields = squeue_fields_of(jobs_dict)
+        touched: Set[str] = set()
+        for job_id in removed | changed:
+            touched.update(self._remove(job_id))
+        for job_id in added | changed:
+            job = jobs_dict.get(job_id)
+            if job is not None:
+                touched.update(self._add(job_id, job, fields))
+        return touched
+
+    def _add(self, job_id: int, job: Dict, fields: SqueueFields) -> Hostlist:
+        self._job_signatures[job_id] = self._signature(job, fields)
         job_state = job.get("job_state", "")
-        if isinstance(job_state, list):
-            if not any(s == "RUNNING" for s in job_state):
+        if "RUNNING" not in fields.states(job):
+            return Hostlist(())
+        nodes = parse_hostlist(str(job.get("nodes", "")))
+        summary = {
+            "job_id": job.get("job_id", ""),
+            "user": job.get("user_name", ""),
+            "name": str(job.get("name", ""))[:40],
+            "partition": job.get("partition", ""),
+            "job_state": job_state,
+        }
+        self._job_nodes[job_id] = nodes
+        for node in nodes.expand():
+            self._node_jobs.setdefault(node, {})[job_id] = summary
+            users = self._node_users.setdefault(node, {})
+            users[summary["user"]] = users.get(summary["user"], 0) + 1
+        return nodes
+
+    def _remove(self, job_id: int) -> Hostlist:
+        self._job_signatures.pop(job_id, None)
+        nodes = self._job_nodes.pop(job_id, None)
+        if nodes is None:
+            return Hostlist(())
+        for node in nodes.expand():
+            node_jobs = self._node_jobs.get(node)
+            if not node_jobs or job_id not in node_jobs:
                 continue
-        elif job_state != "RUNNING":
-            continue
-        nodes_str = str(job.get("nodes", ""))
-        for node in expand_hostlist(nodes_str):
-            node_to_jobs.setdefault(node, []).append(
-                {
-                    "job_id": job.get("job_id", ""),
-                    "user": job.get("user_name", ""),
-                    "name": str(job.get("name", ""))[:40],
-                    "partition": job.get("partition", ""),
-                    "job_state": job_state,
-                }
-            )
-    return node_to_jobs
+            user = node_jobs.pop(job_id)["user"]
+            users = self._node_users[node]
+            users[user] -= 1
+            if not users[user]:
+                del users[user]
+            if not node_jobs:
+                del self._node_jobs[node]
+                del self._node_users[node]
+        return nodes
+
+    def get(self, node: str, default: Optional[List[Dict]] = None) -> List[Dict]:
+        """Jobs running on ``node``, like ``dict.get`` on the old mapping."""
+        node_jobs = self._node_jobs.get(node)
+        if not node_jobs:
+            return [] if default is None else default
+        return list(node_jobs.values())
+
+    def nodes_of(self, job_id: int) -> Hostlist:
+        """Nodes the running job ``job_id`` is on."""
+        return self._job_nodes.get(job_id, Hostlist(()))
+
+    def job_count(self, node: str) -> int:
+        return len(self._node_jobs.get(node, ()))
+
+    def users(self, node: str) -> Set[str]:
+        return set(self._node_users.get(node, ()))
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._node_jobs
+
+    def __len__(self) -> int:
+        return len(self._node_jobs)
 
 
 class SlurmTUIReturn:
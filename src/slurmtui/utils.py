@@ -5,16 +5,35 @@ from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
 from typing import List, Optional
 
-from rich.console import Console
-from textual.theme import BUILTIN_THEMES
 
-console = Console(stderr=True)
+class _StderrConsole:
+    """Rich console on stderr, created on first use.
+
+    rich.console is the largest import of the settings, and the headless
+    watcher only needs it to report errors.
+    """
+
+    _console = None
+
+    def __getattr__(self, name: str):
+        if _StderrConsole._console is None:
+            from rich.console import Console
+
+            _StderrConsole._console = Console(stderr=True)
+        return getattr(_StderrConsole._console, name)
+
+
+console = _StderrConsole()
 
 _default_config_dir = Path.home() / ".config" / "slurmtui"
 SETTINGS_FILE = Path(
     os.environ.get("SLURMTUI_SETTINGS", _default_config_dir / "settings.json")
 )
 _UPDATE_STATE_FILE = _default_config_dir / "update_check.json"
+# Settings enforced by the admins for every user of the host
+SYSTEM_SETTINGS_FILE = Path(
+    os.environ.get("SLURMTUI_SYSTEM_SETTINGS", "/etc/slurmtui/settings.json")
+)
 
 
 def get_last_update_check() -> Optional[datetime.date]:
@@ -37,13 +56,25 @@ class SETTINGS:
     MOCK: bool = field(default=False, metadata="Use mock data for testing")
     THEME: str = field(
         default="textual-dark",
-        metadata=f"Theme name. One of {list(BUILTIN_THEMES.keys())}",
+        metadata="Theme name. One of the Textual built-in themes, e.g. textual-dark, textual-light, nord, gruvbox, dracula",
     )
     UPDATE_INTERVAL: int = field(
         default=10,
-        metadata="Update interval in seconds (multiplied by 5 when CHECK_ALL_JOBS is enabled)",
+        metadata="Update interval in seconds of your own jobs",
     )
     CHECK_ALL_JOBS: bool = field(default=False, metadata="Show all jobs in the queue")
+    ALL_JOBS_UPDATE_INTERVAL: int = field(
+        default=50,
+        metadata="Update interval in seconds of the other users' jobs when CHECK_ALL_JOBS is enabled. Your own jobs keep refreshing every UPDATE_INTERVAL",
+    )
+    PENDING_UPDATE_INTERVAL: int = field(
+        default=0,
+        metadata="Poll pending jobs apart from running ones, at most every this many seconds. 0 polls them together",
+    )
+    COLLAPSE_ARRAY_JOBS: bool = field(
+        default=True,
+        metadata="Show array jobs as one summary row, expanded with Enter",
+    )
     SQUEUE_ARGS: Optional[List[str]] = field(
         default=None, metadata="Additional squeue arguments (space-separated on input)"
     )
@@ -53,11 +84,11 @@ class SETTINGS:
     )
     PRIMARY_TEXT_UTIL_CMD: str = field(
         default="tail",
-        metadata="Command to use to open the logs file. Should have a placeholder for the file path, e.g. 'less +F {log_path}' or 'tail -f {log_path}'. ",
+        metadata="Command to use to open the logs file. Should have a placeholder for the file path, e.g. 'less +F {log_path}' or 'tail -f {log_path}'. The path is substituted shell-quoted",
     )
     SECONDARY_TEXT_UTIL_CMD: str = field(
         default="less",
-        metadata="Command to use to open the secondary logs file (e.g. STDERR). Should have a placeholder for the file path, e.g. 'less +F {log_path}' or 'tail -f {log_path}'. ",
+        metadata="Command to use to open the secondary logs file (e.g. STDERR). Should have a placeholder for the file path, e.g. 'less +F {log_path}' or 'tail -f {log_path}'. The path is substituted shell-quoted",
     )
     TAIL_LINES: int = field(
         default=10000,
@@ -84,11 +115,110 @@ class SETTINGS:
     DEBUG_SINFO_JSON_PATH: Optional[str] = field(
         default=None, metadata="JSON file to substitute for sinfo output"
     )
+    DEBUG_NODES_JSON_PATH: Optional[str] = field(
+        default=None, metadata="JSON file to substitute for scontrol show nodes output"
+    )
+    PER_NODE_RESOURCES: bool = field(
+        default=False,
+        metadata="Show exact per-node CPU/memory usage in the partition view, fetched with one `scontrol show nodes` call, instead of per-group averages from sinfo",
+    )
+    PARSE_IN_SUBPROCESS: bool = field(
+        default=False,
+        metadata="Fetch and parse squeue/sacct/sinfo output in a separate process so that very large clusters do not make the interface stutter",
+    )
+    PROJECT_JOB_FIELDS: bool = field(
+        default=False,
+        metadata="With msgspec installed, decode only the squeue/sacct job fields the tables use. The Info view then fetches the full job on demand",
+    )
+
+    COMMAND_TIMEOUT: int = field(
+        default=30,
+        metadata="Seconds after which a Slurm command is killed and the previous data is kept on screen. 0 disables the timeout",
+    )
+    METRICS_PROMETHEUS_PATH: Optional[str] = field(
+        default=None,
+        metadata="Prometheus textfile to write Slurm command counters to. Supports {user}, {pid} and {host} placeholders",
+    )
+    METRICS_JSONL_PATH: Optional[str] = field(
+        default=None,
+        metadata="JSON-lines file to append one record per Slurm command to. Supports {user}, {pid} and {host} placeholders",
+    )
+
+    SHARED_FETCH: bool = field(
+        default=False,
+        metadata="Share all-jobs squeue snapshots with the other SlurmTUI instances on this host. Only enable it if every user can see every job (no PrivateData=jobs)",
+    )
+    SHARED_STATE_DIR: str = field(
+        default="/tmp/slurmtui",
+        metadata="Directory used to share snapshots and locks between SlurmTUI instances on this host",
+    )
+    SHARED_STATE_GROUP: Optional[str] = field(
+        default=None,
+        metadata="Unix group whose members' shared snapshots are trusted and who share the Slurm call budget. Without it only your own and root's files are used",
+    )
+    MAX_SLURM_CALLS_PER_MINUTE: int = field(
+        default=0,
+        metadata="Host-wide cap on squeue/sacct/sinfo calls per minute, shared by all SlurmTUI instances. The last result is shown while throttled. 0 disables the limit",
+    )
+
+    CONTROLLER_BACKOFF: bool = field(
+        default=False,
+        metadata="Slow down all polling while slurmctld looks overloaded (slow squeue responses or high sdiag RPC load)",
+    )
+    CONTROLLER_SAMPLE_INTERVAL: int = field(
+        default=60,
+        metadata="Seconds between sdiag samples when CONTROLLER_BACKOFF is enabled. 0 only tracks squeue response times",
+    )
+    BACKOFF_LATENCY_THRESHOLD: float = field(
+        default=5.0,
+        metadata="Average Slurm command response time (seconds) above which polling backs off",
+    )
+    BACKOFF_RPC_THRESHOLD: int = field(
+        default=128,
+        metadata="sdiag server thread count or agent queue size above which polling backs off",
+    )
+    BACKOFF_MAX_FACTOR: int = field(
+        default=8,
+        metadata="Maximum multiplier applied to the polling intervals while backing off",
+    )
+
+    NOTIFY_TRANSITIONS: Optional[List[str]] = field(
+        default=None,
+        metadata="State transitions of your jobs to notify about, as FROM>TO with * for any state (comma-separated on input), e.g. PENDING>RUNNING,*>FAILED. Empty disables notifications",
+    )
+    NOTIFY_BELL: bool = field(
+        default=False, metadata="Ring the terminal bell on each notification"
+    )
+    NOTIFY_COMMAND: Optional[str] = field(
+        default=None,
+        metadata="Command run on each notification. Supports {job_id}, {name}, {partition}, {account}, {old_state} and {new_state} placeholders, e.g. notify-send 'Job {job_id}' '{old_state} -> {new_state}'",
+    )
+    NOTIFY_JOB_NAME: Optional[str] = field(
+        default=None,
+        metadata="Only notify about jobs whose name matches this shell-style pattern, e.g. train_*",
+    )
+    NOTIFY_PARTITIONS: Optional[List[str]] = field(
+        default=None,
+        metadata="Only notify about jobs in these partitions (comma-separated on input)",
+    )
+    NOTIFY_ACCOUNTS: Optional[List[str]] = field(
+        default=None,
+        metadata="Only notify about jobs of these accounts (comma-separated on input)",
+    )
 
     def save(self) -> None:
+        data = asdict(self)
+        # Values enforced by the system settings are not the user's to keep
+        for key in system_settings:
+            data.pop(key, None)
         SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
         with open(SETTINGS_FILE, "w") as f:
-            json.dump(asdict(self), f, indent=4)
+            json.dump(data, f, indent=4)
+
+    def apply_system_settings(self) -> None:
+        """Re-apply the admin-enforced values over whatever the user set."""
+        for key, value in system_settings.items():
+            setattr(self, key, value)
 
     def __hash__(self) -> int:
         def _hashable(v):
@@ -111,22 +241,30 @@ class SETTINGS:
             data[key] = _defaults[key]
 
         # Booleans
-        for key in ("MOCK", "CHECK_ALL_JOBS"):
+        for key in (
+            "MOCK",
+            "CHECK_ALL_JOBS",
+            "COLLAPSE_ARRAY_JOBS",
+            "SHARED_FETCH",
+            "CONTROLLER_BACKOFF",
+            "PER_NODE_RESOURCES",
+            "PARSE_IN_SUBPROCESS",
+            "PROJECT_JOB_FIELDS",
+            "NOTIFY_BELL",
+        ):
             if not isinstance(data.get(key), bool):
                 data[key] = bool(data.get(key, _defaults[key]))
 
-        # Integer with minimum bound
-        try:
-            data["UPDATE_INTERVAL"] = max(1, int(data["UPDATE_INTERVAL"]))
-        except (TypeError, ValueError):
-            data["UPDATE_INTERVAL"] = _defaults["UPDATE_INTERVAL"]
+        # Integers with minimum bound
+        for key in ("UPDATE_INTERVAL", "ALL_JOBS_UPDATE_INTERVAL"):
+            try:
+                data[key] = max(1, int(data[key]))
+            except (TypeError, ValueError):
+                data[key] = _defaults[key]
 
-        # Theme validity
-        if data.get("THEME") not in BUILTIN_THEMES:
-            console.print(
-                f"Invalid theme '{data.get('THEME')}', reverting to 'textual-dark'",
-                style="yellow",
-            )
+        # Theme: the app checks that it exists, the headless mode never
+        # imports Textual
+        if not isinstance(data.get("THEME"), str) or not data["THEME"].strip():
             data["THEME"] = _defaults["THEME"]
 
         if data.get("PRIMARY_TEXT_UTIL_CMD") is not None and not isinstance(
@@ -165,19 +303,51 @@ class SETTINGS:
                 f"{data['SECONDARY_TEXT_UTIL_CMD']} {{log_path}}"
             )
 
-        for key in ("TAIL_LINES", "PEEK_LINES"):
+        for key in (
+            "TAIL_LINES",
+            "PEEK_LINES",
+            "BACKOFF_RPC_THRESHOLD",
+            "BACKOFF_MAX_FACTOR",
+        ):
             try:
                 data[key] = max(1, int(data[key]))
             except (TypeError, ValueError):
                 data[key] = _defaults[key]
 
+        # Positive floats
+        for key in ("BACKOFF_LATENCY_THRESHOLD",):
+            try:
+                data[key] = float(data[key])
+                if data[key] <= 0:
+                    raise ValueError
+            except (TypeError, ValueError):
+                data[key] = _defaults[key]
+
+        # Integers where 0 means disabled
+        for key in (
+            "MAX_SLURM_CALLS_PER_MINUTE",
+            "CONTROLLER_SAMPLE_INTERVAL",
+            "COMMAND_TIMEOUT",
+            "PENDING_UPDATE_INTERVAL",
+        ):
+            try:
+                data[key] = max(0, int(data[key]))
+            except (TypeError, ValueError):
+                data[key] = _defaults[key]
+
         # Non-empty strings with fallback to defaults
-        for key in ("OLD_JOBS_START_TIME", "OLD_JOBS_END_TIME"):
+        for key in ("OLD_JOBS_START_TIME", "OLD_JOBS_END_TIME", "SHARED_STATE_DIR"):
             if not isinstance(data.get(key), str) or not data[key].strip():
                 data[key] = _defaults[key]
 
         # Optional List[str]: keep as list or None, never other types
-        for key in ("SQUEUE_ARGS", "ACCOUNTS"):
+        for key in (
+            "SQUEUE_ARGS",
+            "ACCOUNTS",
+            "NOTIFY_TRANSITIONS",
+            "NOTIFY_PARTITIONS",
+            "NOTIFY_ACCOUNTS",
+        ):
             v = data.get(key)
             if v is None:
                 pass
@@ -191,6 +361,12 @@ class SETTINGS:
             "DEBUG_SQUEUE_JSON_PATH",
             "DEBUG_SACCT_JSON_PATH",
             "DEBUG_SINFO_JSON_PATH",
+            "DEBUG_NODES_JSON_PATH",
+            "METRICS_PROMETHEUS_PATH",
+            "METRICS_JSONL_PATH",
+            "NOTIFY_COMMAND",
+            "NOTIFY_JOB_NAME",
+            "SHARED_STATE_GROUP",
         ):
             v = data.get(key)
             if v is not None and not isinstance(v, str):
@@ -207,6 +383,7 @@ class SETTINGS:
                 data = SETTINGS.validate(data)
                 instance = SETTINGS(**data)
                 instance.save()
+                instance.apply_system_settings()
                 return instance
             except (json.JSONDecodeError, TypeError) as e:
                 console.print(
@@ -219,6 +396,7 @@ class SETTINGS:
             )
         instance = SETTINGS()
         instance.save()
+        instance.apply_system_settings()
         return instance
 
     @staticmethod
@@ -226,4 +404,22 @@ class SETTINGS:
         return {f.name: f.metadata for f in fields(SETTINGS)}
 
 
+def load_system_settings() -> dict:
+    """Load the admin-enforced settings, keeping only the keys present in the file."""
+    if not SYSTEM_SETTINGS_FILE.exists():
+        return {}
+    try:
+        with open(SYSTEM_SETTINGS_FILE) as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        console.print(f"Failed to load system settings ({e}).", style="red")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    enforced = set(data.keys())
+    data = SETTINGS.validate(data)
+    return {key: data[key] for key in enforced if key in data}
+
+
+system_settings = load_system_settings()
 settings = SETTINGS.load()
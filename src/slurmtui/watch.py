@@ -0,0 +1,108 @@
+"""Headless watcher started by ``sui --watch``.
+
+Polls the user's own jobs with ``get_running_jobs`` every ``UPDATE_INTERVAL``
+and diffs consecutive snapshots. Every event is printed as one line, or, when
+``NOTIFY_TRANSITIONS`` is set, only the matching notifications, which also
+go to the bell and ``NOTIFY_COMMAND`` sinks like in the TUI.
+
+Textual is never imported, only the last snapshot is kept and the process
+sleeps between polls, so it can run for days in a tmux pane.
+"""
+
+import datetime
+import sys
+import time
+from typing import Any, TextIO
+
+from .controller_load import controller_monitor
+from .notifications import JobNotifier, Notification, bell_sink, command_sink
+from .slurm_utils import (
+    CommandNotFoundError,
+    JobEvent,
+    JobEventKind,
+    JobQuery,
+    SlurmCommandError,
+    diff_snapshots,
+    get_running_jobs,
+    get_user,
+    retry_backoff,
+)
+from .utils import SETTINGS
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _write(stream: TextIO, line: str) -> None:
+    stream.write(f"{datetime.datetime.now().strftime(TIME_FORMAT)} {line}\n")
+    stream.flush()
+
+
+def _format_value(kind: JobEventKind, value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, tuple):
+        return "+".join(value)
+    if kind is JobEventKind.END_TIME_CHANGED:
+        return (
+            datetime.datetime.fromtimestamp(value).strftime(TIME_FORMAT)
+            if value
+            else "-"
+        )
+    return str(value)
+
+
+def format_event(event: JobEvent) -> str:
+    """One line describing ``event``, e.g. ``started 1234 train: PENDING -> RUNNING``."""
+    line = f"{event.kind.value} {event.job_id} {event.job.get('name', '')}"
+    if event.old is not None or event.new is not None:
+        line += (
+            f": {_format_value(event.kind, event.old)}"
+            f" -> {_format_value(event.kind, event.new)}"
+        )
+    return line
+
+
+def watch(settings: SETTINGS, stream: TextIO = sys.stdout) -> int:
+    """Watch until interrupted. Returns the exit code."""
+    query = JobQuery("own", False, settings.UPDATE_INTERVAL)
+
+    def print_notification(notification: Notification) -> None:
+        _write(stream, notification.message)
+
+    sinks = [print_notification]
+    if settings.NOTIFY_BELL:
+        sinks.append(bell_sink(stream))
+    if settings.NOTIFY_COMMAND:
+        sinks.append(command_sink(settings.NOTIFY_COMMAND))
+    notifier = JobNotifier(settings, sinks)
+
+    previous = None
+    failures = 0
+    try:
+        while True:
+            result = get_running_jobs(settings, query)
+            if isinstance(result, CommandNotFoundError):
+                print(result.message, file=sys.stderr)
+                return 1
+            if isinstance(result, SlurmCommandError):
+                # Keep the last snapshot, so nothing is reported twice
+                failures += 1
+                _write(sys.stderr, result.message)
+            else:
+                failures = 0
+                if previous is None:
+                    _write(stream, f"watching {len(result)} jobs of {get_user()}")
+                events = diff_snapshots(previous, result)
+                previous = result
+                if notifier.enabled:
+                    notifier.handle(events)
+                else:
+                    for event in events:
+                        _write(stream, format_event(event))
+            time.sleep(
+                query.interval
+                * controller_monitor.backoff_factor(settings)
+                * retry_backoff(failures, settings)
+            )
+    except KeyboardInterrupt:
+        return 0
@@ -0,0 +1,29 @@
+"""Hostlist intersections, which count and list every common node once."""
+
+import pytest
+
+from slurmtui.hostlist import parse_hostlist
+
+
+@pytest.mark.parametrize(
+    "left, right, expected",
+    [
+        ("n[1-5]", "n[2-3],n[3-4]", ["n2", "n3", "n4"]),
+        ("n[1-2],n[2-3]", "n[1-3]", ["n1", "n2", "n3"]),
+        ("n[1-5]", "n3,n[3-4]", ["n3", "n4"]),
+        ("n[1-3],n2", "n2,n[2-4]", ["n2", "n3"]),
+        ("n[01-12]", "n[1-12]", ["n10", "n11", "n12"]),
+        ("a[1-3]", "b[1-3]", []),
+    ],
+)
+def test_intersection_overlapping_segments(left, right, expected):
+    common = parse_hostlist(left) & parse_hostlist(right)
+    assert sorted(common) == expected
+    assert len(common) == len(expected)
+
+
+def test_intersection_by_name():
+    # Segments that cannot be intersected numerically are matched name by name
+    common = parse_hostlist("gpu[1-3]x,cpu1") & parse_hostlist("gpu2x,gpu[2-3]x,cpu1")
+    assert sorted(common) == ["cpu1", "gpu2x", "gpu3x"]
+    assert len(common) == 3
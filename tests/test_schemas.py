@@ -0,0 +1,129 @@
+"""Field extractors against small squeue/sacct payloads of each data_parser
+version (``fixtures/``), plus the inspecting fallback for unknown versions."""
+
+import os
+
+import pytest
+
+from slurmtui.decoding import loads
+from slurmtui.schemas import data_parser_version, sacct_fields, squeue_fields
+from slurmtui.slurm_utils import get_old_jobs, get_running_jobs
+from slurmtui.utils import SETTINGS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+VERSIONS = (38, 39, 40, 41)
+
+SUBMIT, START, END = 1700000000, 1700000100, 1700003700
+
+
+def _fixture_path(command: str, version: int) -> str:
+    return os.path.join(FIXTURES, f"{command}_v0.0.{version}.json")
+
+
+def _payload(command: str, version: int) -> dict:
+    with open(_fixture_path(command, version), "rb") as f:
+        return loads(f.read())
+
+
+def _check_squeue(jobs: dict, fields) -> None:
+    array_task, plain = jobs[101], jobs[102]
+    assert fields.submit_time(array_task) == SUBMIT
+    assert fields.start_time(array_task) == START
+    assert fields.end_time(array_task) == END
+    assert fields.array_job_id(array_task) == 100
+    assert fields.array_task_id(array_task) == 1
+    assert fields.states(array_task) == ("RUNNING",)
+
+    assert fields.submit_time(plain) == SUBMIT
+    assert fields.start_time(plain) == 0
+    assert fields.end_time(plain) == 0
+    assert fields.array_job_id(plain) is None
+    assert fields.array_task_id(plain) is None
+    assert fields.states(plain) == ("PENDING",)
+
+
+def _check_sacct(jobs: dict, fields, with_paths: bool) -> None:
+    array_task, plain = jobs[101], jobs[103]
+    assert fields.submit_time(array_task) == SUBMIT
+    assert fields.start_time(array_task) == START
+    assert fields.end_time(array_task) == END
+    assert fields.array_job_id(array_task) == 100
+    assert fields.array_task_id(array_task) == 1
+    assert fields.states(array_task) == ("COMPLETED",)
+
+    assert fields.end_time(plain) == START + 60
+    assert fields.array_job_id(plain) is None
+    assert fields.array_task_id(plain) is None
+    assert fields.states(plain) == ("FAILED",)
+
+    assert fields.has_output_paths is with_paths
+    if with_paths:
+        assert fields.stdout(array_task) == "/home/alice/train_100_1.out"
+        assert fields.stderr(array_task) == "/home/alice/train_100_1.err"
+        assert fields.stdout(plain) == "/home/alice/prep.out"
+    else:
+        assert fields.stdout(array_task) == ""
+        assert fields.stderr(array_task) == ""
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_data_parser_version(version):
+    assert data_parser_version(_payload("squeue", version)) == version
+    assert data_parser_version(_payload("sacct", version)) == version
+
+
+def test_data_parser_version_unknown():
+    assert data_parser_version({"jobs": []}) is None
+    assert data_parser_version({"meta": {"plugin": {"type": "x"}}}) is None
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_squeue_fields(version):
+    payload = _payload("squeue", version)
+    jobs = {job["job_id"]: job for job in payload["jobs"]}
+    fields = squeue_fields(version)
+    assert fields.version == version
+    _check_squeue(jobs, fields)
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_sacct_fields(version):
+    payload = _payload("sacct", version)
+    jobs = {job["job_id"]: job for job in payload["jobs"]}
+    fields = sacct_fields(version)
+    assert fields.version == version
+    _check_sacct(jobs, fields, with_paths=version >= 41)
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_unknown_version_fallback(version):
+    # Every shape is handled when the version cannot be read from the payload
+    squeue_jobs = {job["job_id"]: job for job in _payload("squeue", version)["jobs"]}
+    _check_squeue(squeue_jobs, squeue_fields(None))
+
+    sacct_jobs = {job["job_id"]: job for job in _payload("sacct", version)["jobs"]}
+    fields = sacct_fields(None)
+    if version >= 41:
+        _check_sacct(sacct_jobs, fields, with_paths=True)
+    else:
+        # The paths are looked for, older payloads just do not have them
+        assert fields.states(sacct_jobs[101]) == ("COMPLETED",)
+        assert fields.array_task_id(sacct_jobs[101]) == 1
+        assert fields.stdout(sacct_jobs[101]) == ""
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_snapshots_carry_version_fields(version):
+    settings = SETTINGS(
+        MOCK=True,
+        DEBUG_SQUEUE_JSON_PATH=_fixture_path("squeue", version),
+        DEBUG_SACCT_JSON_PATH=_fixture_path("sacct", version),
+    )
+    running = get_running_jobs(settings)
+    assert running.fields.version == version
+    assert list(running) == [101, 102]
+    _check_squeue(running, running.fields)
+
+    old = get_old_jobs(settings)
+    assert old.fields.version == version
+    _check_sacct(old, old.fields, with_paths=version >= 41)